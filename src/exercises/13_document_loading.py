@@ -33,8 +33,16 @@ HINTS:
 - Preserve source information in metadata
 """
 
-from typing import Any, Dict, List, Optional
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Type
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
+import csv
+import logging
+import os
+import re
+import time
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -60,19 +68,50 @@ class LoaderConfig:
     )
 
 
+@dataclass
+class LoadError:
+    """A file or directory that load_directory could not load."""
+    path: str
+    error: str  # "ExceptionType: message"
+
+
+@dataclass
+class DirectoryLoadStats:
+    """Loading statistics, filled in by load_directory as files complete."""
+    files_found: int = 0  # files matching the pattern
+    files_loaded: int = 0
+    files_skipped: int = 0  # unsupported extensions
+    documents: int = 0
+    errors: List[LoadError] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+
+def _clean_text(text: str) -> str:
+    """Strip trailing spaces from lines and collapse runs of blank lines."""
+    text = re.sub(r"[ \t]+\n", "\n", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+
+def _check_file_size(file_path: str, config: LoaderConfig) -> int:
+    size = os.path.getsize(file_path)
+    if size > config.max_file_size_mb * 1024 * 1024:
+        raise ValueError(
+            f"{file_path} is {size / (1024 * 1024):.1f} MB, over the "
+            f"{config.max_file_size_mb} MB limit"
+        )
+    return size
+
+
 def load_pdf_document(
     file_path: str,
     config: Optional[LoaderConfig] = None
 ) -> List[Document]:
     """
-    TODO: Load a PDF file and extract text content.
+    Load a PDF file and extract text content.
     
-    Requirements:
-    - Extract text from all pages
-    - Preserve page numbers in metadata
-    - Handle multi-column layouts
-    - Clean extracted text (remove artifacts)
-    - Include source file path in metadata
+    Text is extracted page by page with pypdf, an optional dependency that
+    is imported on first use.
     
     Args:
         file_path: Path to the PDF file
@@ -88,7 +127,24 @@ def load_pdf_document(
         >>> print(docs[0].metadata)
         {"source": "report.pdf", "page": 1, "total_pages": 10}
     """
-    pass
+    config = config or LoaderConfig()
+    try:
+        from pypdf import PdfReader
+    except ImportError as error:
+        raise ImportError("load_pdf_document requires pypdf: pip install pypdf") from error
+    _check_file_size(file_path, config)
+    reader = PdfReader(file_path)
+    total_pages = len(reader.pages)
+    documents = []
+    for number, page in enumerate(reader.pages, start=1):
+        text = page.extract_text() or ""
+        if config.clean_whitespace:
+            text = _clean_text(text)
+        documents.append(Document(
+            page_content=text,
+            metadata={"source": file_path, "page": number, "total_pages": total_pages},
+        ))
+    return documents
 
 
 def load_web_page(
@@ -121,6 +177,22 @@ def load_web_page(
     pass
 
 
+def _sniff_csv_dialect(file: IO[str]) -> Type[csv.Dialect]:
+    """Detect the column separator from the start of an open CSV file."""
+    sample = file.read(64 * 1024)
+    file.seek(0)
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",;\t|")
+    except csv.Error:
+        return csv.excel
+
+
+def _csv_columns(file_path: str, config: LoaderConfig) -> List[str]:
+    """Header row of a CSV file."""
+    with open(file_path, encoding=config.encoding, newline="") as file:
+        return next(csv.reader(file, _sniff_csv_dialect(file)), [])
+
+
 def load_csv_documents(
     file_path: str,
     content_columns: List[str],
@@ -128,14 +200,11 @@ def load_csv_documents(
     config: Optional[LoaderConfig] = None
 ) -> List[Document]:
     """
-    TODO: Load CSV file and convert rows to documents.
+    Load CSV file and convert rows to documents.
     
-    Requirements:
-    - Read CSV with proper encoding handling
-    - Combine specified columns into page_content
-    - Use other columns as metadata
-    - Handle missing values gracefully
-    - Support custom column separators
+    The column separator (comma, semicolon, tab or pipe) is detected from
+    the start of the file. Non-empty content values are joined with ": ";
+    missing values are treated as empty strings.
     
     Args:
         file_path: Path to CSV file
@@ -155,9 +224,29 @@ def load_csv_documents(
         >>> print(docs[0].page_content)
         "Widget Pro: A professional-grade widget..."
         >>> print(docs[0].metadata)
-        {"category": "tools", "price": "29.99", "row": 0}
+        {"source": "products.csv", "category": "tools", "price": "29.99", "row": 0}
     """
-    pass
+    config = config or LoaderConfig()
+    _check_file_size(file_path, config)
+    with open(file_path, encoding=config.encoding, newline="") as file:
+        reader = csv.DictReader(file, dialect=_sniff_csv_dialect(file))
+        fieldnames = list(reader.fieldnames or [])
+        metadata_columns = metadata_columns or []
+        missing = [c for c in content_columns + metadata_columns if c not in fieldnames]
+        if missing:
+            raise ValueError(f"Columns {missing} not found in {file_path}; available: {fieldnames}")
+        documents = []
+        for row_number, row in enumerate(reader):
+            values = [(row.get(column) or "").strip() for column in content_columns]
+            metadata: Dict[str, Any] = {"source": file_path}
+            for column in metadata_columns:
+                metadata[column] = (row.get(column) or "").strip()
+            metadata["row"] = row_number
+            documents.append(Document(
+                page_content=": ".join(value for value in values if value),
+                metadata=metadata,
+            ))
+    return documents
 
 
 def load_text_file(
@@ -165,13 +254,11 @@ def load_text_file(
     config: Optional[LoaderConfig] = None
 ) -> Document:
     """
-    TODO: Load a plain text or markdown file.
+    Load a plain text or markdown file.
     
-    Requirements:
-    - Read file with proper encoding
-    - Detect and handle different line endings
-    - Optionally preserve markdown formatting
-    - Include file stats in metadata
+    Windows and old Mac line endings are normalized to "\\n". With
+    config.clean_whitespace, trailing spaces and runs of blank lines are
+    removed; indentation and markdown syntax are kept.
     
     Args:
         file_path: Path to text file
@@ -185,28 +272,186 @@ def load_text_file(
         >>> print(doc.metadata)
         {"source": "readme.md", "size_bytes": 1234, "encoding": "utf-8"}
     """
-    pass
+    config = config or LoaderConfig()
+    size = _check_file_size(file_path, config)
+    with open(file_path, encoding=config.encoding) as file:
+        text = file.read()
+    if config.clean_whitespace:
+        text = _clean_text(text)
+    return Document(
+        page_content=text,
+        metadata={"source": file_path, "size_bytes": size, "encoding": config.encoding},
+    )
+
+
+_FILE_LOADERS: Dict[str, Callable[[str, LoaderConfig], List[Document]]] = {
+    ".pdf": load_pdf_document,
+    # A directory load has no column choice to make, so every column is content.
+    ".csv": lambda path, config: load_csv_documents(
+        path, _csv_columns(path, config), config=config
+    ),
+    ".txt": lambda path, config: [load_text_file(path, config)],
+    ".md": lambda path, config: [load_text_file(path, config)],
+    # No ".html": loading it as text would index raw markup. It needs the
+    # HTML-to-text extraction of load_web_page, so such files are skipped.
+}
+
+
+def _glob_regex(pattern: str) -> "re.Pattern":
+    """Compile a glob where "**/" matches any number of directories."""
+    parts = []
+    for token in re.split(r"(\*\*/|\*|\?)", pattern.replace(os.sep, "/")):
+        if token == "**/":
+            parts.append("(?:.*/)?")
+        elif token == "*":
+            parts.append("[^/]*")
+        elif token == "?":
+            parts.append("[^/]")
+        else:
+            parts.append(re.escape(token))
+    return re.compile("".join(parts) + r"\Z")
+
+
+def _scan_files(directory_path: str, glob_pattern: str, errors: List[LoadError]) -> Iterator[str]:
+    """
+    Lazily walk directory_path with os.scandir, yielding paths matching the
+    glob. A directory that cannot be read is logged and appended to errors,
+    and the walk goes on with the rest of the tree.
+    """
+    matcher = _glob_regex(glob_pattern)
+    max_depth = None if "**" in glob_pattern else glob_pattern.count("/")
+    stack = [(directory_path, "", 0)]
+    while stack:
+        directory, prefix, depth = stack.pop()
+        subdirectories = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    relative = prefix + entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        if max_depth is None or depth < max_depth:
+                            subdirectories.append((entry.path, relative + "/", depth + 1))
+                    elif entry.is_file() and matcher.match(relative):
+                        yield entry.path
+        except OSError as error:
+            logger.warning("Failed to scan %s: %s", directory, error)
+            errors.append(LoadError(directory, f"{type(error).__name__}: {error}"))
+        stack.extend(reversed(subdirectories))
+
+
+def _load_file(file_path: str, config: LoaderConfig) -> List[Document]:
+    """Worker: load one file with the loader for its extension."""
+    extension = os.path.splitext(file_path)[1].lower()
+    return _FILE_LOADERS[extension](file_path, config)
+
+
+def load_directory_stream(
+    directory_path: str,
+    glob_pattern: str = "**/*",
+    config: Optional[LoaderConfig] = None,
+    max_workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    stats: Optional[DirectoryLoadStats] = None
+) -> Iterator[Document]:
+    """
+    Load supported documents from a directory concurrently, yielding
+    documents as their files finish loading.
+    
+    The directory is walked lazily with os.scandir while a bounded pool
+    loads files, at most twice as many as it has workers at a time, so
+    the first documents arrive before the walk completes. Files are
+    yielded in completion order, each file's documents together. A file
+    or directory that fails to load is logged and recorded in
+    ``stats.errors`` without stopping the run.
+    
+    Args:
+        directory_path: Path to directory
+        glob_pattern: Pattern to match files, relative to directory_path
+        config: Optional loader configuration
+        max_workers: Worker threads; defaults to ThreadPoolExecutor's default
+        executor: Optional executor to use instead, e.g. a ProcessPoolExecutor
+        stats: Optional DirectoryLoadStats updated as files complete
+        
+    Yields:
+        Documents from each loaded file
+        
+    Example:
+        >>> stats = DirectoryLoadStats()
+        >>> for doc in load_directory_stream("/mnt/share/docs", stats=stats):
+        ...     index(doc)
+        >>> print(stats.files_loaded, stats.errors)
+    """
+    config = config or LoaderConfig()
+    if not os.path.isdir(directory_path):
+        raise ValueError(f"{directory_path} is not a directory")
+    if max_workers is not None and max_workers < 1:
+        raise ValueError(f"max_workers must be positive, got {max_workers}")
+    stats = stats if stats is not None else DirectoryLoadStats()
+    extensions = {extension.lower() for extension in config.supported_extensions}
+    supported = extensions & set(_FILE_LOADERS)
+    started = time.perf_counter()
+    owned = executor is None
+    pool = ThreadPoolExecutor(max_workers=max_workers) if executor is None else executor
+    in_flight = 2 * (max_workers or min(32, (os.cpu_count() or 1) + 4))
+    pending: Dict[Future, str] = {}
+
+    def completed(futures) -> Iterator[Document]:
+        for future in futures:
+            path = pending.pop(future)
+            try:
+                documents = future.result()
+            except Exception as error:
+                logger.warning("Failed to load %s: %s", path, error)
+                stats.errors.append(LoadError(path, f"{type(error).__name__}: {error}"))
+                continue
+            stats.files_loaded += 1
+            stats.documents += len(documents)
+            yield from documents
+        stats.elapsed_seconds = time.perf_counter() - started
+
+    try:
+        for path in _scan_files(directory_path, glob_pattern, stats.errors):
+            stats.files_found += 1
+            if os.path.splitext(path)[1].lower() not in supported:
+                stats.files_skipped += 1
+                continue
+            if len(pending) >= in_flight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                yield from completed(done)
+            pending[pool.submit(_load_file, path, config)] = path
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            yield from completed(done)
+    finally:
+        for future in pending:
+            future.cancel()
+        if owned:
+            pool.shutdown(wait=True)
+        stats.elapsed_seconds = time.perf_counter() - started
 
 
 def load_directory(
     directory_path: str,
     glob_pattern: str = "**/*",
-    config: Optional[LoaderConfig] = None
+    config: Optional[LoaderConfig] = None,
+    max_workers: Optional[int] = None,
+    stats: Optional[DirectoryLoadStats] = None
 ) -> List[Document]:
     """
-    TODO: Load all supported documents from a directory.
+    Load all supported documents from a directory.
     
-    Requirements:
-    - Recursively find files matching pattern
-    - Use appropriate loader for each file type
-    - Skip unsupported file types
-    - Handle errors gracefully (don't fail on one bad file)
-    - Track loading statistics
+    Collects load_directory_stream: files are loaded concurrently, files
+    with unsupported extensions are skipped, and a file or directory that
+    fails to load is recorded in ``stats.errors`` instead of aborting the
+    run.
+    Documents are in completion order.
     
     Args:
         directory_path: Path to directory
         glob_pattern: Pattern to match files
         config: Optional loader configuration
+        max_workers: Worker threads for loading files
+        stats: Optional DirectoryLoadStats to fill in
         
     Returns:
         List of all loaded documents
@@ -215,7 +460,9 @@ def load_directory(
         >>> docs = load_directory("./documents", "**/*.pdf")
         >>> print(f"Loaded {len(docs)} documents")
     """
-    pass
+    return list(load_directory_stream(
+        directory_path, glob_pattern, config, max_workers=max_workers, stats=stats
+    ))
 
 
 def extract_metadata(
@@ -33,8 +33,22 @@ HINTS:
 - Different content types need different strategies
 """
 
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
 from dataclasses import dataclass, field
+from functools import lru_cache
+import hashlib
+import inspect
+import os
+import random
+import re
+import time
+import tracemalloc
+import warnings
+import numpy as np
 
 
 @dataclass
@@ -44,6 +58,57 @@ class Document:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+class ChunkView(Document):
+    """
+    Chunk stored as ``(start, end)`` offsets into a shared source text.
+    
+    ``page_content`` is sliced from the source on access, so overlapping
+    chunks of one document share a single copy of its text instead of
+    each holding a substring. A view compares equal to any Document with
+    the same content and metadata. Keeping a view alive keeps its whole
+    source alive; use materialize() for chunks that outlive the document.
+    """
+
+    def __init__(
+        self, source: str, start: int, end: int, metadata: Optional[Dict[str, Any]] = None
+    ):
+        self.source = source
+        self.start = start
+        self.end = end
+        self.metadata = {} if metadata is None else metadata
+
+    @property
+    def page_content(self) -> str:
+        return self.source[self.start:self.end]
+
+    @page_content.setter
+    def page_content(self, value: str) -> None:
+        self.source, self.start, self.end = value, 0, len(value)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Document):
+            return NotImplemented
+        return self.page_content == other.page_content and self.metadata == other.metadata
+
+    def __repr__(self) -> str:
+        return f"ChunkView(start={self.start}, end={self.end}, metadata={self.metadata!r})"
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # Views of one source pickled together share a single copy of it.
+        return ChunkView, (self.source, self.start, self.end, self.metadata)
+
+    def materialize(self) -> Document:
+        """Copy the chunk text into a standalone Document."""
+        return Document(page_content=self.page_content, metadata=dict(self.metadata))
+
+
+def _with_metadata(chunk: Document, metadata: Dict[str, Any]) -> Document:
+    """Copy of chunk with new metadata; views keep pointing at their source."""
+    if isinstance(chunk, ChunkView):
+        return ChunkView(chunk.source, chunk.start, chunk.end, metadata)
+    return Document(page_content=chunk.page_content, metadata=metadata)
+
+
 @dataclass
 class ChunkingConfig:
     """Configuration for text chunking."""
@@ -56,19 +121,548 @@ class ChunkingConfig:
     keep_separator: bool = True
 
 
+# Words in pieces of up to four letters, numbers in groups of three digits,
+# single punctuation characters; leading whitespace joins the next token.
+_APPROXIMATE_TOKEN = re.compile(r"\s*(?:[^\W\d_]{1,4}|\d{1,3}|[^\w\s]|_)|\s+")
+
+
+class ApproximateTokenizer:
+    """
+    Offline GPT-style token estimate from a single regex scan.
+    
+    Counts are close to cl100k_base for English prose and need no
+    downloads or optional dependencies.
+    """
+
+    name = "approximate"
+
+    def token_offsets(self, text: str) -> List[int]:
+        return [match.start() for match in _APPROXIMATE_TOKEN.finditer(text)]
+
+    def count(self, text: str) -> int:
+        return sum(1 for _ in _APPROXIMATE_TOKEN.finditer(text))
+
+
+class TiktokenTokenizer:
+    """Exact token offsets from a tiktoken encoding (requires tiktoken)."""
+
+    def __init__(self, encoding_name: str):
+        import tiktoken
+        self.name = encoding_name
+        self.encoding = tiktoken.get_encoding(encoding_name)
+
+    def token_offsets(self, text: str) -> List[int]:
+        tokens = self.encoding.encode(text, disallowed_special=())
+        return self.encoding.decode_with_offsets(tokens)[1]
+
+    def count(self, text: str) -> int:
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+
+_TOKENIZER_FACTORIES: Dict[str, Callable[[], Any]] = {"approximate": ApproximateTokenizer}
+_TOKENIZERS: Dict[str, Any] = {}
+
+
+def register_tokenizer(name: str, factory: Callable[[], Any]) -> None:
+    """
+    Register a tokenizer under an encoding name.
+    
+    A tokenizer provides ``token_offsets(text)``, the character offset at
+    which each token starts, and ``count(text)``. The factory is called
+    once, on first use.
+    
+    Args:
+        name: Encoding name used by chunk_by_tokens and TokenCounter
+        factory: Zero-argument callable creating the tokenizer
+    """
+    _TOKENIZER_FACTORIES[name] = factory
+    _TOKENIZERS.pop(name, None)
+
+
+def get_tokenizer(encoding_name: str = "cl100k_base") -> Any:
+    """
+    Return the cached tokenizer for an encoding name.
+    
+    Registered names are used first. Any other name is loaded with
+    tiktoken. If tiktoken is not installed, the approximate tokenizer is
+    used instead, with a warning.
+    """
+    tokenizer = _TOKENIZERS.get(encoding_name)
+    if tokenizer is None:
+        factory = _TOKENIZER_FACTORIES.get(encoding_name)
+        if factory is not None:
+            tokenizer = factory()
+        else:
+            try:
+                tokenizer = TiktokenTokenizer(encoding_name)
+            except ImportError:
+                warnings.warn(
+                    f"tiktoken is not installed; approximating {encoding_name!r} token counts",
+                    RuntimeWarning,
+                )
+                tokenizer = ApproximateTokenizer()
+        _TOKENIZERS[encoding_name] = tokenizer
+    return tokenizer
+
+
+class TokenCounter:
+    """
+    Token-counting length_function for ChunkingConfig.
+    
+    recursive_chunk recognizes it and tokenizes each document once, then
+    measures splits by their token offsets instead of calling the
+    tokenizer on every candidate chunk.
+    
+    Example:
+        >>> config = ChunkingConfig(
+        ...     chunk_size=256, chunk_overlap=32, length_function=TokenCounter()
+        ... )
+    """
+
+    def __init__(self, encoding_name: str = "cl100k_base"):
+        self.encoding_name = encoding_name
+
+    @property
+    def tokenizer(self) -> Any:
+        return get_tokenizer(self.encoding_name)
+
+    def __call__(self, text: str) -> int:
+        return self.tokenizer.count(text)
+
+    def __repr__(self) -> str:
+        return f"TokenCounter({self.encoding_name!r})"
+
+
+def _token_positions(text: str, tokenizer: Any) -> Sequence[int]:
+    """Token start offsets of text, packed compactly for bisecting."""
+    return array("q", tokenizer.token_offsets(text))
+
+
+def _token_measure(
+    text: str, length_function: Callable[[str], int]
+) -> Optional[Callable[[int], int]]:
+    """
+    Map a character offset to the number of tokens starting before it, so
+    the token length of text[a:z] is measure(z) - measure(a). None unless
+    length_function is a TokenCounter.
+    """
+    if not isinstance(length_function, TokenCounter):
+        return None
+    positions = _token_positions(text, length_function.tokenizer)
+    return lambda offset: bisect_left(positions, offset)
+
+
+def _validate_chunk_params(chunk_size: int, chunk_overlap: int) -> None:
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    if chunk_overlap < 0 or chunk_overlap >= chunk_size:
+        raise ValueError(
+            f"chunk_overlap must be in [0, chunk_size), got {chunk_overlap} "
+            f"for chunk_size {chunk_size}"
+        )
+
+
+Span = Tuple[int, int]
+
+
+def _chunk_views(source: str, spans: List[Span], metadata: Dict[str, Any]) -> List[Document]:
+    return [
+        ChunkView(
+            source, start, end, {**metadata, "chunk_index": index, "total_chunks": len(spans)}
+        )
+        for index, (start, end) in enumerate(spans)
+    ]
+
+
+def _stream_documents(
+    chunks: Iterable[str], metadata: Optional[Dict[str, Any]]
+) -> Iterator[Document]:
+    for index, chunk in enumerate(chunks):
+        yield Document(page_content=chunk, metadata={**(metadata or {}), "chunk_index": index})
+
+
+def _strip_span(text: str, start: int, end: int) -> Span:
+    """Offsets of text[start:end].strip() within text."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+class _SplitMerger:
+    """
+    Greedily pack consecutive splits into chunks of at most chunk_size.
+    
+    add() and flush() return the groups of splits forming each finished
+    chunk; the caller decides how to join them (strings or offsets). When a
+    chunk is emitted, its trailing splits totalling at most chunk_overlap
+    are carried over to start the next one. Only the splits of the chunk
+    being built are held, so this works on unbounded streams.
+    """
+
+    def __init__(self, separator_length: int, config: ChunkingConfig):
+        self.separator_length = separator_length
+        self.chunk_size = config.chunk_size
+        self.chunk_overlap = config.chunk_overlap
+        self.current: deque = deque()
+        self.total = 0
+
+    def add(self, split: Any, length: int) -> List[List[Any]]:
+        emitted = []
+        if self.current and self.total + length + self.separator_length > self.chunk_size:
+            emitted = self.flush(keep_overlap=True)
+            while self.current and (
+                self.total > self.chunk_overlap
+                or self.total + length + self.separator_length > self.chunk_size
+            ):
+                _, removed = self.current.popleft()
+                self.total -= removed + (self.separator_length if self.current else 0)
+        if self.current:
+            self.total += self.separator_length
+        self.current.append((split, length))
+        self.total += length
+        return emitted
+
+    def flush(self, keep_overlap: bool = False) -> List[List[Any]]:
+        group = [split for split, _ in self.current]
+        if not keep_overlap:
+            self.current.clear()
+            self.total = 0
+        return [group] if group else []
+
+
+def _separator_length(separator: str, config: ChunkingConfig) -> int:
+    if config.keep_separator or not separator:
+        return 0
+    return config.length_function(separator)
+
+
+@lru_cache(maxsize=64)
+def _separator_pattern(separator: str) -> "re.Pattern":
+    return re.compile(re.escape(separator))
+
+
+def _split_bounds(
+    text: str,
+    start: int,
+    end: int,
+    separator: str,
+    keep_separator: bool
+) -> Tuple[Sequence[int], Sequence[int]]:
+    """
+    Start and end offsets of the splits of text[start:end] at separator.
+    
+    Found in one scan with a precompiled pattern. A kept separator stays at
+    the end of its split. Dropped separators leave empty splits in place,
+    so merged splits always cover a contiguous stretch of the source. The
+    empty separator splits into characters, returned as ranges rather than
+    one entry per character.
+    """
+    if not separator:
+        return range(start, end), range(start + 1, end + 1)
+    starts, ends = [], []
+    head = start
+    for match in _separator_pattern(separator).finditer(text, start, end):
+        starts.append(head)
+        ends.append(match.end() if keep_separator else match.start())
+        head = match.end()
+    if head < end or not keep_separator:
+        starts.append(head)
+        ends.append(end)
+    return starts, ends
+
+
+def _split_spans(
+    text: str, start: int, end: int, separator: str, keep_separator: bool
+) -> List[Span]:
+    return list(zip(*_split_bounds(text, start, end, separator, keep_separator)))
+
+
+def _append_stripped(chunks: List[Span], text: str, start: int, end: int) -> None:
+    start, end = _strip_span(text, start, end)
+    if start < end:
+        chunks.append((start, end))
+
+
+def _pack_spans(
+    text: str,
+    starts: Sequence[int],
+    ends: Sequence[int],
+    lo: int,
+    hi: int,
+    config: ChunkingConfig,
+    measure: Optional[Callable[[int], int]] = None
+) -> List[Span]:
+    """
+    Greedy packing of splits lo..hi-1, all of which fit.
+    
+    Equivalent to feeding them through _SplitMerger, but each chunk costs
+    two binary searches over the split offsets instead of a step per
+    split. A merged group always covers text[starts[first]:ends[last]], so
+    its length is a difference of offsets: characters, or token positions
+    when ``measure`` maps offsets to tokens.
+    """
+    size, overlap = config.chunk_size, config.chunk_overlap
+    position = measure or _offset
+    chunks: List[Span] = []
+    first = lo
+    while True:
+        # First split that no longer fits in a chunk starting at `first`.
+        stop = bisect_right(ends, position(starts[first]) + size, first, hi, key=measure)
+        if stop >= hi:
+            _append_stripped(chunks, text, starts[first], ends[hi - 1])
+            return chunks
+        _append_stripped(chunks, text, starts[first], ends[stop - 1])
+        # Carry over the trailing splits that fit in the overlap and leave
+        # room for split `stop`.
+        bound = max(position(ends[stop - 1]) - overlap, position(ends[stop]) - size)
+        first = bisect_left(starts, bound, first + 1, stop, key=measure)
+
+
+def _offset(offset: int) -> int:
+    return offset
+
+
+def _merge_spans(
+    text: str,
+    splits: List[Tuple[Span, int]],
+    separator_length: int,
+    config: ChunkingConfig
+) -> List[Span]:
+    merger = _SplitMerger(separator_length, config)
+    groups = []
+    for span, length in splits:
+        groups.extend(merger.add(span, length))
+    groups.extend(merger.flush())
+    chunks: List[Span] = []
+    for group in groups:
+        _append_stripped(chunks, text, group[0][0], group[-1][1])
+    return chunks
+
+
+def _recursive_spans(
+    text: str,
+    start: int,
+    end: int,
+    separators: List[str],
+    config: ChunkingConfig,
+    measure: Optional[Callable[[int], int]] = None
+) -> List[Span]:
+    """
+    Split text[start:end] at the first separator, merge splits that fit,
+    and descend into oversized splits with the remaining separators.
+    
+    Each level scans only the oversized splits of the level above, so every
+    character is scanned at most once per separator and the total work is
+    linear in the text length. Lengths are characters, or tokens when
+    ``measure`` is given (see _token_measure). Returns chunk offsets into
+    text.
+    """
+    separator, remaining = separators[0], separators[1:]
+    starts, ends = _split_bounds(text, start, end, separator, config.keep_separator)
+    if measure is None and config.length_function is not len:
+        return _recursive_spans_measured(text, starts, ends, separator, remaining, config)
+    size = config.chunk_size
+    if not separator:
+        oversized = []
+    elif measure is None:
+        oversized = [index for index, (a, z) in enumerate(zip(starts, ends)) if z - a > size]
+    else:
+        oversized = [
+            index for index, (a, z) in enumerate(zip(starts, ends))
+            if measure(z) - measure(a) > size
+        ]
+
+    def descend(a: int, z: int) -> List[Span]:
+        if remaining:
+            return _recursive_spans(text, a, z, remaining, config, measure)
+        return [(a, z)]
+
+    return _pack_around(text, starts, ends, oversized, descend, config, measure)
+
+
+def _pack_around(
+    text: str,
+    starts: Sequence[int],
+    ends: Sequence[int],
+    oversized: List[int],
+    descend: Callable[[int, int], List[Span]],
+    config: ChunkingConfig,
+    measure: Optional[Callable[[int], int]] = None
+) -> List[Span]:
+    """Pack the runs of fitting splits between oversized ones, which go to descend()."""
+    chunks: List[Span] = []
+    first = 0
+    for index in oversized + [len(starts)]:
+        if index > first:
+            chunks.extend(_pack_spans(text, starts, ends, first, index, config, measure))
+        if index == len(starts):
+            break
+        chunks.extend(descend(starts[index], ends[index]))
+        first = index + 1
+    return chunks
+
+
+def _recursive_spans_measured(
+    text: str,
+    starts: Sequence[int],
+    ends: Sequence[int],
+    separator: str,
+    remaining: List[str],
+    config: ChunkingConfig
+) -> List[Span]:
+    """_recursive_spans for a custom length_function, measuring every split."""
+    separator_length = _separator_length(separator, config)
+    chunks: List[Span] = []
+    fitting: List[Tuple[Span, int]] = []
+    for span in zip(starts, ends):
+        length = config.length_function(text[span[0]:span[1]])
+        if length <= config.chunk_size:
+            fitting.append((span, length))
+            continue
+        if fitting:
+            chunks.extend(_merge_spans(text, fitting, separator_length, config))
+            fitting = []
+        if remaining:
+            chunks.extend(_recursive_spans(text, span[0], span[1], remaining, config))
+        else:
+            chunks.append(span)
+    if fitting:
+        chunks.extend(_merge_spans(text, fitting, separator_length, config))
+    return chunks
+
+
+class _SplitReader:
+    """
+    Split a stream of text pieces at a separator without joining the stream.
+    
+    Splits that fit are yielded as strings. A split that outgrows the size
+    limit before its separator arrives is yielded as an iterator over its
+    text instead; it must be consumed before the reader advances. Only the
+    unread tail of the current split is ever buffered.
+    """
+
+    def __init__(self, pieces: Iterable[str], separator: str, keep_separator: bool):
+        self.pieces = iter(pieces)
+        self.separator = separator
+        self.keep_separator = keep_separator
+        self.buffer = ""
+        self.head = 0
+        self.search = 0
+        self.done = False
+
+    def splits(self, fits: Callable[[str], bool]) -> Iterator[Union[str, Iterator[str]]]:
+        if not self.separator:
+            for piece in self.pieces:
+                yield from piece
+            return
+        while True:
+            index = self._find()
+            if index != -1:
+                split = self._cut(index)
+            elif self.done:
+                split, self.head = self.buffer[self.head:], len(self.buffer)
+            elif self.head < self.search and not fits(self.buffer[self.head:self.search]):
+                oversized = self._oversized()
+                yield oversized
+                for _ in oversized:
+                    pass
+                continue
+            else:
+                self._read()
+                continue
+            if split or not self.keep_separator:
+                yield split if fits(split) else iter((split,))
+            if index == -1:
+                return
+
+    def _oversized(self) -> Iterator[str]:
+        while True:
+            index = self._find()
+            if index != -1:
+                split = self._cut(index)
+                if split:
+                    yield split
+                return
+            if self.done:
+                if self.head < len(self.buffer):
+                    yield self.buffer[self.head:]
+                    self.head = len(self.buffer)
+                return
+            # Text before `search` cannot be part of a separator any more.
+            if self.search > self.head:
+                yield self.buffer[self.head:self.search]
+                self.head = self.search
+            self._read()
+
+    def _find(self) -> int:
+        index = self.buffer.find(self.separator, self.search)
+        if index == -1:
+            self.search = max(self.search, len(self.buffer) - len(self.separator) + 1)
+        return index
+
+    def _cut(self, index: int) -> str:
+        end = index + len(self.separator)
+        split = self.buffer[self.head:end if self.keep_separator else index]
+        self.head = self.search = end
+        return split
+
+    def _read(self) -> None:
+        piece = next(self.pieces, None)
+        if piece is None:
+            self.done = True
+            return
+        self.buffer = self.buffer[self.head:] + piece
+        self.search -= self.head
+        self.head = 0
+
+
+def _recursive_split_stream(
+    pieces: Iterable[str],
+    separators: List[str],
+    config: ChunkingConfig
+) -> Iterator[str]:
+    """Streaming counterpart of _recursive_spans; yields the same chunk texts."""
+    separator, remaining = separators[0], separators[1:]
+    joiner = "" if config.keep_separator else separator
+    merger = _SplitMerger(_separator_length(separator, config), config)
+
+    def fits(text: str) -> bool:
+        return config.length_function(text) <= config.chunk_size
+
+    groups: List[List[str]] = []
+    for split in _SplitReader(pieces, separator, config.keep_separator).splits(fits):
+        if isinstance(split, str):
+            groups = merger.add(split, config.length_function(split))
+        else:
+            yield from _joined(merger.flush(), joiner)
+            if remaining:
+                yield from _recursive_split_stream(split, remaining, config)
+            else:
+                yield "".join(split)
+            continue
+        yield from _joined(groups, joiner)
+    yield from _joined(merger.flush(), joiner)
+
+
+def _joined(groups: List[List[str]], joiner: str) -> Iterator[str]:
+    for group in groups:
+        chunk = joiner.join(group).strip()
+        if chunk:
+            yield chunk
+
+
 def chunk_by_character(
     document: Document,
     chunk_size: int = 1000,
     chunk_overlap: int = 200
 ) -> List[Document]:
     """
-    TODO: Split document into fixed-size character chunks.
+    Split document into fixed-size character chunks.
     
-    Requirements:
-    - Split text into chunks of chunk_size characters
-    - Apply chunk_overlap characters of overlap
-    - Preserve and propagate document metadata
-    - Add chunk index to metadata
+    Chunks are ChunkView objects: offsets into the document text rather
+    than copies, so overlap costs no extra memory.
     
     Args:
         document: Document to chunk
@@ -86,7 +680,15 @@ def chunk_by_character(
         >>> chunks[0].metadata
         {"source": "test", "chunk_index": 0, "total_chunks": 3}
     """
-    pass
+    _validate_chunk_params(chunk_size, chunk_overlap)
+    text = document.page_content
+    step = chunk_size - chunk_overlap
+    spans = []
+    for start in range(0, len(text), step):
+        spans.append((start, min(start + chunk_size, len(text))))
+        if start + chunk_size >= len(text):
+            break
+    return _chunk_views(text, spans, document.metadata)
 
 
 def chunk_by_separator(
@@ -96,13 +698,12 @@ def chunk_by_separator(
     chunk_overlap: int = 200
 ) -> List[Document]:
     """
-    TODO: Split document at natural boundaries (paragraphs, sentences).
+    Split document at natural boundaries (paragraphs, sentences).
     
-    Requirements:
-    - Try separators in order (most to least preferred)
-    - Keep chunks under chunk_size when possible
-    - Apply overlap for context preservation
-    - Don't break in the middle of sentences
+    Every split at the first separator becomes its own chunk. Splits longer
+    than chunk_size are broken up with the remaining separators, merging
+    the pieces with overlap. There is no character-level fallback, so a
+    single sentence longer than chunk_size stays whole.
     
     Args:
         document: Document to chunk
@@ -119,7 +720,33 @@ def chunk_by_separator(
         >>> [c.page_content for c in chunks]
         ["Para 1.", "Para 2.", "Para 3."]
     """
-    pass
+    config = _separator_config(separators, chunk_size, chunk_overlap)
+    separator, remaining = config.separators[0], config.separators[1:]
+    text = document.page_content
+    spans = []
+    for start, end in _split_spans(text, 0, len(text), separator, config.keep_separator):
+        if end - start > chunk_size and remaining:
+            spans.extend(_recursive_spans(text, start, end, remaining, config))
+            continue
+        start, end = _strip_span(text, start, end)
+        if start < end:
+            spans.append((start, end))
+    return _chunk_views(text, spans, document.metadata)
+
+
+def _separator_config(
+    separators: Optional[List[str]],
+    chunk_size: int,
+    chunk_overlap: int
+) -> ChunkingConfig:
+    _validate_chunk_params(chunk_size, chunk_overlap)
+    if separators is None:
+        separators = ["\n\n", "\n", ". "]
+    if not separators:
+        raise ValueError("At least one separator is required")
+    return ChunkingConfig(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap, separators=list(separators)
+    )
 
 
 def recursive_chunk(
@@ -127,16 +754,18 @@ def recursive_chunk(
     config: Optional[ChunkingConfig] = None
 ) -> List[Document]:
     """
-    TODO: Recursively split using hierarchy of separators.
+    Recursively split using hierarchy of separators.
     
-    This is the most commonly used strategy in RAG systems.
+    This is the most commonly used strategy in RAG systems. The text is
+    split at the first separator (paragraphs) and the splits are merged
+    greedily up to chunk_size. Splits that are still too big are split
+    again with the next separator (lines, sentences, words), down to
+    single characters with the default separators. Chunks are ChunkView
+    offsets into the document text, stripped of surrounding whitespace.
     
-    Requirements:
-    - Try to split by paragraphs first (\\n\\n)
-    - If chunks too big, split by sentences (. )
-    - If still too big, split by words ( )
-    - Finally split by characters if needed
-    - Maintain overlap between chunks
+    With a TokenCounter as length_function, sizes are in tokens and the
+    document is tokenized once; other custom length functions are called
+    for every split.
     
     Args:
         document: Document to chunk
@@ -151,7 +780,132 @@ def recursive_chunk(
         >>> all(len(c.page_content) <= config.chunk_size for c in chunks)
         True
     """
-    pass
+    config = config or ChunkingConfig()
+    _validate_chunk_params(config.chunk_size, config.chunk_overlap)
+    if not config.separators:
+        raise ValueError("At least one separator is required")
+    text = document.page_content
+    measure = _token_measure(text, config.length_function)
+    spans = _recursive_spans(text, 0, len(text), config.separators, config, measure)
+    return _chunk_views(text, spans, document.metadata)
+
+
+def chunk_by_character_stream(
+    pieces: Iterable[str],
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+    metadata: Optional[Dict[str, Any]] = None
+) -> Iterator[Document]:
+    """
+    Streaming variant of chunk_by_character.
+    
+    ``pieces`` is any iterable of text (pages, file blocks) whose
+    concatenation is the document; chunks may span piece boundaries and
+    are identical to chunking the joined text. Only the text from the
+    start of the next chunk onwards is buffered.
+    
+    Args:
+        pieces: Consecutive pieces of the document text
+        chunk_size: Target size of each chunk in characters
+        chunk_overlap: Number of overlapping characters
+        metadata: Metadata copied into every chunk
+        
+    Yields:
+        Document chunks with ``chunk_index`` in metadata. The total is not
+        known up front, so ``total_chunks`` is omitted.
+    """
+    _validate_chunk_params(chunk_size, chunk_overlap)
+    return _stream_documents(_character_windows(pieces, chunk_size, chunk_overlap), metadata)
+
+
+def _character_windows(pieces: Iterable[str], chunk_size: int, chunk_overlap: int) -> Iterator[str]:
+    step = chunk_size - chunk_overlap
+    # `buffer` starts at absolute offset `offset`; `start` is the next window.
+    buffer, offset, start, covered = "", 0, 0, 0
+    for piece in pieces:
+        buffer += piece
+        while start + chunk_size <= offset + len(buffer):
+            yield buffer[start - offset:start - offset + chunk_size]
+            covered = start + chunk_size
+            start += step
+        buffer = buffer[start - offset:]
+        offset = start
+    if offset + len(buffer) > covered:
+        yield buffer
+
+
+def chunk_by_separator_stream(
+    pieces: Iterable[str],
+    separators: List[str] = None,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+    metadata: Optional[Dict[str, Any]] = None
+) -> Iterator[Document]:
+    """
+    Streaming variant of chunk_by_separator.
+    
+    Yields the same chunks as chunk_by_separator on the joined text, while
+    buffering at most one split (plus one chunk being merged) at a time.
+    A split too long for chunk_size is broken up as it streams in.
+    
+    Args:
+        pieces: Consecutive pieces of the document text
+        separators: List of separators in preference order
+        chunk_size: Maximum chunk size
+        chunk_overlap: Overlap between chunks
+        metadata: Metadata copied into every chunk
+        
+    Yields:
+        Document chunks with ``chunk_index`` in metadata
+    """
+    config = _separator_config(separators, chunk_size, chunk_overlap)
+    return _stream_documents(_separator_chunks_stream(pieces, config), metadata)
+
+
+def _separator_chunks_stream(pieces: Iterable[str], config: ChunkingConfig) -> Iterator[str]:
+    separator, remaining = config.separators[0], config.separators[1:]
+
+    def fits(text: str) -> bool:
+        return len(text) <= config.chunk_size or not remaining
+
+    for split in _SplitReader(pieces, separator, config.keep_separator).splits(fits):
+        if not isinstance(split, str):
+            yield from _recursive_split_stream(split, remaining, config)
+        elif split.strip():
+            yield split.strip()
+
+
+def recursive_chunk_stream(
+    pieces: Iterable[str],
+    config: Optional[ChunkingConfig] = None,
+    metadata: Optional[Dict[str, Any]] = None
+) -> Iterator[Document]:
+    """
+    Streaming variant of recursive_chunk.
+    
+    Consumes the document as an iterable of text pieces and yields the same
+    chunks as recursive_chunk on the joined text, with overlap carried
+    across piece boundaries. Memory is bounded by a few chunks per
+    separator level rather than by document size.
+    
+    Args:
+        pieces: Consecutive pieces of the document text
+        config: Chunking configuration
+        metadata: Metadata copied into every chunk
+        
+    Yields:
+        Document chunks with ``chunk_index`` in metadata
+        
+    Example:
+        >>> with open("export.txt") as f:
+        ...     for chunk in recursive_chunk_stream(iter(lambda: f.read(65536), "")):
+        ...         index(chunk)
+    """
+    config = config or ChunkingConfig()
+    _validate_chunk_params(config.chunk_size, config.chunk_overlap)
+    if not config.separators:
+        raise ValueError("At least one separator is required")
+    return _stream_documents(_recursive_split_stream(pieces, config.separators, config), metadata)
 
 
 def chunk_by_tokens(
@@ -161,13 +915,13 @@ def chunk_by_tokens(
     encoding_name: str = "cl100k_base"
 ) -> List[Document]:
     """
-    TODO: Split document by token count (for LLM context limits).
+    Split document by token count (for LLM context limits).
     
-    Requirements:
-    - Use tiktoken to count tokens accurately
-    - Ensure chunks fit in LLM context window
-    - Maintain token-based overlap
-    - Handle different tokenizer encodings
+    The document is tokenized once; chunks are windows of max_tokens
+    tokens, stepping by max_tokens - overlap_tokens, cut at the character
+    offsets where their first and next-after-last tokens start. The
+    tokenizer comes from get_tokenizer, so registered tokenizers and the
+    offline "approximate" encoding work as well as tiktoken encodings.
     
     Args:
         document: Document to chunk
@@ -176,63 +930,317 @@ def chunk_by_tokens(
         encoding_name: Tiktoken encoding name
         
     Returns:
-        List of Document chunks with guaranteed token limits
+        List of Document chunks with guaranteed token limits, with the
+        window's ``token_count`` in metadata
         
     Example:
         >>> chunks = chunk_by_tokens(doc, max_tokens=500)
         >>> # Each chunk guaranteed to be <= 500 tokens
     """
-    pass
+    _validate_chunk_params(max_tokens, overlap_tokens)
+    text = document.page_content
+    positions = _token_positions(text, get_tokenizer(encoding_name))
+    step = max_tokens - overlap_tokens
+    spans, counts = [], []
+    for first in range(0, len(positions), step):
+        last = min(first + max_tokens, len(positions))
+        spans.append((positions[first], positions[last] if last < len(positions) else len(text)))
+        counts.append(last - first)
+        if last == len(positions):
+            break
+    chunks = _chunk_views(text, spans, document.metadata)
+    for chunk, count in zip(chunks, counts):
+        chunk.metadata["token_count"] = count
+    return chunks
+
+
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+
+
+def _sentence_spans(text: str) -> List[Span]:
+    spans: List[Span] = []
+    head = 0
+    for match in _SENTENCE_BREAK.finditer(text):
+        _append_stripped(spans, text, head, match.start())
+        head = match.end()
+    _append_stripped(spans, text, head, len(text))
+    return spans
+
+
+def _sentence_windows(text: str, spans: List[Span], buffer_size: int) -> List[str]:
+    """Each sentence with buffer_size neighbors on either side, as one source slice."""
+    last = len(spans) - 1
+    return [
+        text[spans[max(0, index - buffer_size)][0]:spans[min(last, index + buffer_size)][1]]
+        for index in range(len(spans))
+    ]
+
+
+def _semantic_breakpoints(
+    embeddings: np.ndarray,
+    similarity_threshold: float,
+    breakpoint_percentile: Optional[float]
+) -> np.ndarray:
+    """
+    Indexes of the sentences that start a new group.
+    
+    Cosine distances between all adjacent windows are computed at once;
+    a break follows every distance above the threshold, which is either
+    1 - similarity_threshold or the given percentile of the distances.
+    """
+    if len(embeddings) < 2:
+        return np.empty(0, dtype=np.int64)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    unit = embeddings / np.where(norms > 0, norms, 1.0)
+    distances = 1.0 - np.einsum("ij,ij->i", unit[:-1], unit[1:])
+    if breakpoint_percentile is None:
+        threshold = 1.0 - similarity_threshold
+    else:
+        threshold = np.percentile(distances, breakpoint_percentile)
+    return np.flatnonzero(distances > threshold) + 1
+
+
+def _semantic_documents(
+    document: Document,
+    spans: List[Span],
+    embeddings: np.ndarray,
+    similarity_threshold: float,
+    breakpoint_percentile: Optional[float],
+    max_chunk_size: int
+) -> List[Document]:
+    text = document.page_content
+    breaks = _semantic_breakpoints(embeddings, similarity_threshold, breakpoint_percentile)
+    config = ChunkingConfig(chunk_size=max_chunk_size, chunk_overlap=0)
+
+    def descend(a: int, z: int) -> List[Span]:
+        return _recursive_spans(text, a, z, config.separators, config)
+
+    bounds = [0, *breaks.tolist(), len(spans)]
+    chunks: List[Span] = []
+    for lo, hi in zip(bounds, bounds[1:]):
+        starts = [start for start, _ in spans[lo:hi]]
+        ends = [end for _, end in spans[lo:hi]]
+        oversized = [
+            index for index, (a, z) in enumerate(zip(starts, ends)) if z - a > max_chunk_size
+        ]
+        chunks.extend(_pack_around(text, starts, ends, oversized, descend, config))
+    return _chunk_views(text, chunks, document.metadata)
+
+
+def _validate_semantic_params(
+    embedding_model: Any,
+    similarity_threshold: float,
+    breakpoint_percentile: Optional[float],
+    buffer_size: int,
+    max_chunk_size: int
+) -> None:
+    if embedding_model is None:
+        raise ValueError("An embedding model is required for semantic chunking")
+    if not -1.0 <= similarity_threshold <= 1.0:
+        raise ValueError(f"similarity_threshold must be in [-1, 1], got {similarity_threshold}")
+    if breakpoint_percentile is not None and not 0 <= breakpoint_percentile <= 100:
+        raise ValueError(f"breakpoint_percentile must be in [0, 100], got {breakpoint_percentile}")
+    if buffer_size < 0:
+        raise ValueError(f"buffer_size must be non-negative, got {buffer_size}")
+    if max_chunk_size <= 0:
+        raise ValueError(f"max_chunk_size must be positive, got {max_chunk_size}")
 
 
 def semantic_chunk(
     document: Document,
     embedding_model: Any = None,
-    similarity_threshold: float = 0.5
+    similarity_threshold: float = 0.5,
+    breakpoint_percentile: Optional[float] = None,
+    buffer_size: int = 1,
+    max_chunk_size: int = 1000
 ) -> List[Document]:
     """
-    TODO: Split document at semantic boundaries.
+    Split document at semantic boundaries.
     
     This creates more coherent chunks by finding natural topic changes.
-    
-    Requirements:
-    - Split into sentences first
-    - Compute embeddings for each sentence
-    - Find breakpoints where similarity drops
-    - Group similar sentences into chunks
-    - Respect maximum chunk size
+    Each sentence is embedded together with buffer_size neighbors on either
+    side, all in one embed_documents call. A chunk ends wherever the cosine
+    similarity of adjacent windows drops below similarity_threshold, or,
+    if breakpoint_percentile is given, wherever their distance is above
+    that percentile of all distances in the document. Groups longer than
+    max_chunk_size are packed into several chunks at sentence boundaries.
     
     Args:
         document: Document to chunk
         embedding_model: Model to compute embeddings
         similarity_threshold: Threshold for grouping sentences
+        breakpoint_percentile: Distance percentile (0-100) used instead of
+            similarity_threshold
+        buffer_size: Neighboring sentences embedded with each sentence
+        max_chunk_size: Maximum chunk size in characters
         
     Returns:
         List of semantically coherent Document chunks
         
     Example:
-        >>> chunks = semantic_chunk(doc, model, threshold=0.5)
+        >>> chunks = semantic_chunk(doc, model, similarity_threshold=0.5)
         >>> # Each chunk contains semantically related content
     """
-    pass
+    _validate_semantic_params(
+        embedding_model, similarity_threshold, breakpoint_percentile, buffer_size, max_chunk_size
+    )
+    spans = _sentence_spans(document.page_content)
+    if len(spans) < 2:
+        embeddings = np.empty((0, 0))
+    else:
+        windows = _sentence_windows(document.page_content, spans, buffer_size)
+        embeddings = np.asarray(embedding_model.embed_documents(windows), dtype=np.float64)
+    return _semantic_documents(
+        document, spans, embeddings, similarity_threshold, breakpoint_percentile, max_chunk_size
+    )
+
+
+def semantic_chunk_documents(
+    documents: Iterable[Document],
+    embedding_model: Any = None,
+    similarity_threshold: float = 0.5,
+    breakpoint_percentile: Optional[float] = None,
+    buffer_size: int = 1,
+    max_chunk_size: int = 1000,
+    batch_size: int = 512
+) -> List[Document]:
+    """
+    Semantic chunking of many documents with shared embedding calls.
+    
+    Sentence windows of consecutive documents are pooled and embedded in
+    calls of batch_size texts, so short documents share a call and long
+    ones span several. Breakpoints are still chosen per document, and the
+    result is the same as calling semantic_chunk on each document.
+    
+    Args:
+        documents: Documents to chunk
+        embedding_model: Model to compute embeddings
+        similarity_threshold: Threshold for grouping sentences
+        breakpoint_percentile: Distance percentile (0-100) used instead of
+            similarity_threshold
+        buffer_size: Neighboring sentences embedded with each sentence
+        max_chunk_size: Maximum chunk size in characters
+        batch_size: Maximum texts per embed_documents call
+        
+    Returns:
+        Chunks of all documents, in input order
+    """
+    _validate_semantic_params(
+        embedding_model, similarity_threshold, breakpoint_percentile, buffer_size, max_chunk_size
+    )
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be positive, got {batch_size}")
+    chunks: List[Document] = []
+    pending: List[Tuple[Document, List[Span], List[str]]] = []
+    pending_windows = 0
+
+    def flush() -> None:
+        texts = [window for _, _, windows in pending for window in windows]
+        vectors = [
+            np.asarray(
+                embedding_model.embed_documents(texts[start:start + batch_size]),
+                dtype=np.float64,
+            )
+            for start in range(0, len(texts), batch_size)
+        ]
+        embeddings = np.concatenate(vectors) if vectors else np.empty((0, 0))
+        offset = 0
+        for document, spans, windows in pending:
+            rows = embeddings[offset:offset + len(windows)]
+            offset += len(windows)
+            chunks.extend(_semantic_documents(
+                document, spans, rows, similarity_threshold, breakpoint_percentile, max_chunk_size
+            ))
+
+    for document in documents:
+        spans = _sentence_spans(document.page_content)
+        windows = (
+            _sentence_windows(document.page_content, spans, buffer_size) if len(spans) > 1 else []
+        )
+        pending.append((document, spans, windows))
+        pending_windows += len(windows)
+        if pending_windows >= batch_size:
+            flush()
+            pending, pending_windows = [], 0
+    flush()
+    return chunks
+
+
+_MARKDOWN_HEADER = re.compile(r"^(#{1,6})[ \t]+(.+?)[ \t#]*$", re.MULTILINE)
+
+
+def _header_matches(
+    text: str, header_patterns: Optional[List[str]]
+) -> List[Tuple[int, int, int, str]]:
+    """(start, level, end, title) of every header line, in document order."""
+    if header_patterns is None:
+        return [
+            (match.start(), len(match.group(1)), match.end(), match.group(2).strip())
+            for match in _MARKDOWN_HEADER.finditer(text)
+        ]
+    matches = []
+    for level, pattern in enumerate(header_patterns, start=1):
+        for match in re.finditer(pattern, text, re.MULTILINE):
+            title = match.group(1) if match.re.groups else match.group(0)
+            matches.append((match.start(), level, match.end(), title.strip()))
+    return sorted(matches)
+
+
+def _header_sections(
+    text: str, header_patterns: Optional[List[str]] = None
+) -> List[Tuple[Span, List[str]]]:
+    """
+    Body spans of the sections between header lines, with the titles of
+    the enclosing headers (outermost first).
+    
+    Pattern i matches headers of level i + 1; its first group, if any, is
+    the title. Without patterns, Markdown "#" headers are found in one scan.
+    """
+    sections: List[Tuple[Span, List[str]]] = []
+    stack: List[Tuple[int, str]] = []
+    head = 0
+    for start, level, end, title in _header_matches(text, header_patterns):
+        if start < head:
+            continue
+        sections.append(((head, start), [t for _, t in stack]))
+        stack = [(depth, t) for depth, t in stack if depth < level] + [(level, title)]
+        head = end
+    sections.append(((head, len(text)), [t for _, t in stack]))
+    return sections
+
+
+def _section_spans(text: str, start: int, end: int, config: ChunkingConfig) -> List[Span]:
+    """Chunk offsets of one section, tokenizing only that section."""
+    if not isinstance(config.length_function, TokenCounter):
+        return _recursive_spans(text, start, end, config.separators, config)
+    positions = _token_positions(text[start:end], config.length_function.tokenizer)
+
+    def measure(offset: int) -> int:
+        return bisect_left(positions, offset - start)
+
+    return _recursive_spans(text, start, end, config.separators, config, measure)
 
 
 def chunk_with_headers(
     document: Document,
-    header_patterns: List[str] = None
+    header_patterns: List[str] = None,
+    config: Optional[ChunkingConfig] = None
 ) -> List[Document]:
     """
-    TODO: Split document preserving header context.
+    Split document preserving header context.
     
-    Requirements:
-    - Identify headers in the document
-    - Include relevant headers in each chunk
-    - Maintain document hierarchy in metadata
-    - Useful for structured documents
+    The document is cut into sections at header lines, and each section is
+    chunked with recursive_chunk's splitter, so chunks never span two
+    sections. Every chunk carries the titles of its enclosing headers,
+    outermost first, in ``metadata["headers"]``. Sections without content
+    are dropped.
     
     Args:
         document: Document to chunk
-        header_patterns: Regex patterns for headers
+        header_patterns: Regex patterns for headers, one per level from the
+            top; the first group is the title. Defaults to Markdown "#"
+            through "######" headers.
+        config: Chunking configuration for long sections
         
     Returns:
         List of Document chunks with header context
@@ -243,7 +1251,126 @@ def chunk_with_headers(
         >>> chunks[0].metadata["headers"]
         ["Main", "Sub"]
     """
-    pass
+    config = config or ChunkingConfig()
+    _validate_chunk_params(config.chunk_size, config.chunk_overlap)
+    text = document.page_content
+    spans: List[Tuple[Span, List[str]]] = []
+    for (start, end), headers in _header_sections(text, header_patterns):
+        for span in _section_spans(text, start, end, config):
+            spans.append((span, headers))
+    return [
+        ChunkView(text, start, end, {
+            **document.metadata,
+            "headers": list(headers),
+            "chunk_index": index,
+            "total_chunks": len(spans),
+        })
+        for index, ((start, end), headers) in enumerate(spans)
+    ]
+
+
+@dataclass
+class ChunkDiff:
+    """Changes between two chunkings of a document, from chunk_incrementally."""
+    added: List[Document] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    sections: Dict[str, List[str]] = field(default_factory=dict)
+
+
+def _config_fingerprint(config: ChunkingConfig, header_patterns: Optional[List[str]]) -> bytes:
+    """Everything besides the text that decides how a section is chunked."""
+    length_function = config.length_function
+    if isinstance(length_function, TokenCounter) or not hasattr(length_function, "__qualname__"):
+        length_name = repr(length_function)
+    else:
+        length_name = f"{length_function.__module__}.{length_function.__qualname__}"
+    return repr((
+        config.chunk_size,
+        config.chunk_overlap,
+        config.separators,
+        config.keep_separator,
+        length_name,
+        header_patterns,
+    )).encode("utf-8")
+
+
+def chunk_incrementally(
+    document: Document,
+    previous: Optional[Dict[str, List[str]]] = None,
+    header_patterns: List[str] = None,
+    config: Optional[ChunkingConfig] = None
+) -> ChunkDiff:
+    """
+    Re-chunk only the header sections that changed since a previous run.
+    
+    The document is cut into sections as in chunk_with_headers, and each
+    section is identified by a hash of its headers, its text and the
+    chunking configuration. Sections whose id appears in ``previous`` are
+    skipped; only new sections are chunked and returned. Chunk ids are
+    ``"<section id>-<n>"``, so an unchanged section keeps its chunk ids
+    and the ids of a removed section can be deleted downstream.
+    
+    Added chunks carry ``chunk_id``, ``section_id`` and ``headers`` in
+    their metadata instead of document-wide chunk indexes, which would
+    shift for unchanged chunks that are not re-emitted.
+    
+    Args:
+        document: Current version of the document
+        previous: ``sections`` of the last ChunkDiff for this document, or
+            None to chunk everything
+        header_patterns: Regex patterns for headers (see chunk_with_headers)
+        config: Chunking configuration for long sections
+        
+    Returns:
+        ChunkDiff with the added chunks, removed and unchanged chunk ids,
+        and the section manifest to pass as ``previous`` next time
+        
+    Example:
+        >>> diff = chunk_incrementally(doc)
+        >>> store.add(diff.added)
+        >>> diff = chunk_incrementally(edited_doc, previous=diff.sections)
+        >>> store.delete(diff.removed)
+        >>> store.add(diff.added)
+    """
+    config = config or ChunkingConfig()
+    _validate_chunk_params(config.chunk_size, config.chunk_overlap)
+    previous = previous or {}
+    text = document.page_content
+    configured = hashlib.blake2b(_config_fingerprint(config, header_patterns), digest_size=16)
+    diff = ChunkDiff()
+    for (start, end), headers in _header_sections(text, header_patterns):
+        digest = configured.copy()
+        digest.update("\x00".join(headers).encode("utf-8"))
+        digest.update(b"\x01")
+        digest.update(text[start:end].encode("utf-8"))
+        content_id = section_id = digest.hexdigest()
+        occurrence = 1
+        while section_id in diff.sections:
+            occurrence += 1
+            section_id = f"{content_id}.{occurrence}"
+        if section_id in previous:
+            diff.sections[section_id] = previous[section_id]
+            diff.unchanged.extend(previous[section_id])
+            continue
+        chunk_ids = []
+        for index, (chunk_start, chunk_end) in enumerate(_section_spans(text, start, end, config)):
+            chunk_id = f"{section_id}-{index}"
+            chunk_ids.append(chunk_id)
+            diff.added.append(ChunkView(text, chunk_start, chunk_end, {
+                **document.metadata,
+                "headers": list(headers),
+                "section_id": section_id,
+                "chunk_id": chunk_id,
+            }))
+        diff.sections[section_id] = chunk_ids
+    diff.removed = [
+        chunk_id
+        for section_id, chunk_ids in previous.items()
+        if section_id not in diff.sections
+        for chunk_id in chunk_ids
+    ]
+    return diff
 
 
 def merge_small_chunks(
@@ -252,12 +1379,18 @@ def merge_small_chunks(
     max_chunk_size: int = 1000
 ) -> List[Document]:
     """
-    TODO: Merge chunks that are too small.
+    Merge chunks that are too small.
     
-    Requirements:
-    - Combine adjacent chunks below min_chunk_size
-    - Don't exceed max_chunk_size when merging
-    - Update metadata appropriately
+    A single pass over the chunks: while the current chunk or the next
+    one is below min_chunk_size, the next one is merged in, as long as the
+    result stays within max_chunk_size. Views of the same source that
+    touch or overlap merge into one view spanning both, with no text
+    copied. Other chunks, including views separated by a gap such as a
+    header line, merge only with chunks of the same ``source`` metadata and
+    are joined by a space, so text between them is never pulled in.
+    A merged chunk keeps the metadata of its first chunk, and
+    ``chunk_index``/``total_chunks`` are renumbered when present. The
+    input chunks are left unchanged.
     
     Args:
         chunks: List of chunks to potentially merge
@@ -267,24 +1400,109 @@ def merge_small_chunks(
     Returns:
         List of chunks with small ones merged
     """
-    pass
+    if min_chunk_size < 0 or min_chunk_size > max_chunk_size:
+        raise ValueError(
+            f"min_chunk_size must be in [0, max_chunk_size], got {min_chunk_size} "
+            f"for max_chunk_size {max_chunk_size}"
+        )
+    groups: List[List[Document]] = []
+    size = 0
+    for chunk in chunks:
+        length = _chunk_length(chunk)
+        if groups and (size < min_chunk_size or length < min_chunk_size):
+            merged = _merged_length(groups[-1], size, chunk, length)
+            if merged is not None and merged <= max_chunk_size:
+                groups[-1].append(chunk)
+                size = merged
+                continue
+        groups.append([chunk])
+        size = length
+    merged_chunks = []
+    for index, group in enumerate(groups):
+        first, last = group[0], group[-1]
+        metadata = dict(first.metadata)
+        if "chunk_index" in metadata:
+            metadata["chunk_index"] = index
+        if "total_chunks" in metadata:
+            metadata["total_chunks"] = len(groups)
+        runs = _contiguous_runs(group)
+        if len(group) == 1:
+            merged_chunks.append(_with_metadata(first, metadata))
+        elif len(runs) == 1 and isinstance(first, ChunkView) and isinstance(last, ChunkView):
+            merged_chunks.append(ChunkView(first.source, first.start, last.end, metadata))
+        else:
+            merged_chunks.append(Document(
+                page_content=" ".join(_run_text(run) for run in runs), metadata=metadata
+            ))
+    return merged_chunks
+
+
+def _chunk_length(chunk: Document) -> int:
+    if isinstance(chunk, ChunkView):
+        return chunk.end - chunk.start
+    return len(chunk.page_content)
+
+
+def _continues(last: Document, chunk: Document) -> bool:
+    """Whether chunk is a view extending last with no gap between them."""
+    return (
+        isinstance(last, ChunkView)
+        and isinstance(chunk, ChunkView)
+        and last.source is chunk.source
+        and last.start <= chunk.start <= last.end
+        and chunk.end >= last.end
+    )
+
+
+def _merged_length(
+    group: List[Document], size: int, chunk: Document, length: int
+) -> Optional[int]:
+    """Length of group with chunk appended, or None if they cannot merge."""
+    last = group[-1]
+    if isinstance(last, ChunkView) and isinstance(chunk, ChunkView) and _continues(last, chunk):
+        return size + chunk.end - last.end
+    if group[0].metadata.get("source") != chunk.metadata.get("source"):
+        return None
+    return size + 1 + length
+
+
+def _contiguous_runs(group: List[Document]) -> List[List[Document]]:
+    """Split a merge group where consecutive chunks do not continue each other."""
+    runs = [[group[0]]]
+    for chunk in group[1:]:
+        if _continues(runs[-1][-1], chunk):
+            runs[-1].append(chunk)
+        else:
+            runs.append([chunk])
+    return runs
+
+
+def _run_text(run: List[Document]) -> str:
+    first, last = run[0], run[-1]
+    if isinstance(first, ChunkView) and isinstance(last, ChunkView):
+        return first.source[first.start:last.end]
+    return first.page_content
 
 
 def add_chunk_context(
     chunks: List[Document],
-    context_size: int = 1
+    context_size: int = 1,
+    max_context_chars: int = 200
 ) -> List[Document]:
     """
-    TODO: Add context from neighboring chunks to each chunk.
+    Add context from neighboring chunks to each chunk.
     
-    Requirements:
-    - Add summary or beginning of adjacent chunks
-    - Store context in metadata, not page_content
-    - Helps with retrieval of boundary content
+    ``prev_context`` is the text just before the chunk (from up to
+    context_size preceding chunks) and ``next_context`` the text just after
+    it, each at most max_context_chars long. For chunk views of the same
+    source this is a slice of the source between chunk offsets, so overlap
+    already inside the chunk is not repeated; other chunks fall back to
+    joining the neighbors' text. The input chunks are left unchanged.
     
     Args:
         chunks: List of ordered chunks
         context_size: Number of neighboring chunks to include
+        max_context_chars: Maximum characters of context on each side
         
     Returns:
         Chunks with added context in metadata
@@ -296,20 +1514,43 @@ def add_chunk_context(
         >>> enhanced[1].metadata["next_context"]
         "Start of next chunk..."
     """
-    pass
+    if context_size < 1:
+        raise ValueError(f"context_size must be positive, got {context_size}")
+    enhanced = []
+    for index, chunk in enumerate(chunks):
+        metadata = dict(chunk.metadata)
+        if index > 0:
+            first = chunks[max(0, index - context_size)]
+            if (isinstance(first, ChunkView) and isinstance(chunk, ChunkView)
+                    and first.source is chunk.source):
+                start = max(first.start, chunk.start - max_context_chars)
+                metadata["prev_context"] = chunk.source[start:max(start, chunk.start)]
+            else:
+                text = " ".join(c.page_content for c in chunks[max(0, index - context_size):index])
+                metadata["prev_context"] = text[-max_context_chars:]
+        if index < len(chunks) - 1:
+            last = chunks[min(len(chunks), index + context_size + 1) - 1]
+            if (isinstance(chunk, ChunkView) and isinstance(last, ChunkView)
+                    and chunk.source is last.source):
+                end = min(last.end, chunk.end + max_context_chars)
+                metadata["next_context"] = chunk.source[chunk.end:max(end, chunk.end)]
+            else:
+                text = " ".join(c.page_content for c in chunks[index + 1:index + context_size + 1])
+                metadata["next_context"] = text[:max_context_chars]
+        enhanced.append(_with_metadata(chunk, metadata))
+    return enhanced
 
 
 def calculate_chunk_statistics(
     chunks: List[Document]
 ) -> Dict[str, Any]:
     """
-    TODO: Calculate statistics about chunking results.
+    Calculate statistics about chunking results.
     
-    Requirements:
-    - Count total chunks
-    - Calculate size distribution (min, max, avg, median)
-    - Identify potential issues (very small/large chunks)
-    - Measure overlap effectiveness
+    Besides the size distribution, reports possible issues: empty chunks,
+    chunks under a quarter of the median size and chunks over twice the
+    median. Overlap is measured for consecutive chunk views of the same
+    source, from their offsets; it is None when no such pairs exist.
     
     Args:
         chunks: List of chunks to analyze
@@ -328,30 +1569,128 @@ def calculate_chunk_statistics(
             "size_std": 156
         }
     """
-    pass
+    sizes = np.array([len(chunk.page_content) for chunk in chunks], dtype=np.int64)
+    if not len(sizes):
+        return {
+            "count": 0, "total_chars": 0, "avg_size": 0.0, "median_size": 0.0,
+            "min_size": 0, "max_size": 0, "size_std": 0.0, "percentiles": {},
+            "empty_chunks": 0, "small_chunks": 0, "large_chunks": 0,
+            "avg_overlap": None, "overlap_ratio": None,
+        }
+    median = float(np.median(sizes))
+    p10, p25, p75, p90, p99 = np.percentile(sizes, [10, 25, 75, 90, 99])
+    overlaps = [
+        max(0, min(previous.end, chunk.end) - chunk.start)
+        for previous, chunk in zip(chunks, chunks[1:])
+        if isinstance(previous, ChunkView) and isinstance(chunk, ChunkView)
+        and previous.source is chunk.source
+    ]
+    return {
+        "count": int(len(sizes)),
+        "total_chars": int(sizes.sum()),
+        "avg_size": float(sizes.mean()),
+        "median_size": median,
+        "min_size": int(sizes.min()),
+        "max_size": int(sizes.max()),
+        "size_std": float(sizes.std()),
+        "percentiles": {
+            "p10": float(p10), "p25": float(p25), "p75": float(p75),
+            "p90": float(p90), "p99": float(p99),
+        },
+        "empty_chunks": int((sizes == 0).sum()),
+        "small_chunks": int((sizes < median / 4).sum()),
+        "large_chunks": int((sizes > median * 2).sum()),
+        "avg_overlap": float(np.mean(overlaps)) if overlaps else None,
+        "overlap_ratio": float(sum(overlaps) / sizes.sum()) if overlaps and sizes.sum() else None,
+    }
+
+
+def _strategy_name(strategy: Callable[..., Any]) -> str:
+    name = getattr(strategy, "__name__", None)
+    return name or getattr(getattr(strategy, "func", None), "__name__", repr(strategy))
+
+
+def _query_coverage(chunks: List[Document], queries: List[str]) -> float:
+    """Mean over queries of the best fraction of query words found in one chunk."""
+    chunk_words = [set(chunk.page_content.lower().split()) for chunk in chunks]
+    scores = []
+    for query in queries:
+        words = set(query.lower().split())
+        if words:
+            overlaps = (len(words & found) / len(words) for found in chunk_words)
+            scores.append(max(overlaps, default=0.0))
+    return float(np.mean(scores)) if scores else 0.0
+
+
+def _measure_strategy(
+    strategy: Callable[..., List[Document]],
+    document: Document,
+    repeat: int = 1,
+    test_queries: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Time a strategy on one document, then rerun it under tracemalloc for
+    peak memory, so tracing overhead does not distort the timings.
+    
+    If the caller is already tracing, its peak is left alone and the
+    reported peak is an upper bound (it may include the caller's own).
+    """
+    try:
+        timings = []
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            chunks = strategy(document)
+            timings.append(time.perf_counter() - started)
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        try:
+            baseline = tracemalloc.get_traced_memory()[0]
+            strategy(document)
+            peak = tracemalloc.get_traced_memory()[1] - baseline
+        finally:
+            if not tracing:
+                tracemalloc.stop()
+    except Exception as error:
+        return {"error": f"{type(error).__name__}: {error}"}
+    seconds = min(timings)
+    result = calculate_chunk_statistics(chunks)
+    result.update({
+        "seconds": seconds,
+        "seconds_median": float(np.median(timings)),
+        "chars_per_sec": len(document.page_content) / seconds if seconds > 0 else float("inf"),
+        "peak_memory_bytes": int(peak),
+    })
+    if test_queries:
+        result["query_coverage"] = _query_coverage(chunks, test_queries)
+    return result
 
 
 def evaluate_chunking_strategy(
     document: Document,
     strategies: List[Callable],
-    test_queries: List[str] = None
+    test_queries: List[str] = None,
+    repeat: int = 1
 ) -> Dict[str, Any]:
     """
-    TODO: Compare different chunking strategies.
+    Compare different chunking strategies.
     
-    Requirements:
-    - Apply each strategy to the document
-    - Calculate statistics for each
-    - Optionally test retrieval quality
-    - Return comparison results
+    Each strategy is timed (best of ``repeat`` runs) and rerun under
+    tracemalloc for its peak memory. Results combine calculate_chunk_statistics
+    with ``seconds``, ``chars_per_sec`` and ``peak_memory_bytes``. With
+    test_queries, ``query_coverage`` is the mean best fraction of each
+    query's words found in a single chunk. A strategy that raises (e.g.
+    semantic_chunk without an embedding model) gets an ``error`` entry
+    instead. Use functools.partial to pass strategy arguments.
     
     Args:
         document: Document to chunk
         strategies: List of chunking functions to compare
         test_queries: Optional queries to test retrieval
+        repeat: Timed runs per strategy
         
     Returns:
-        Comparison results for each strategy
+        Comparison results for each strategy, keyed by function name
         
     Example:
         >>> results = evaluate_chunking_strategy(
@@ -361,25 +1700,190 @@ def evaluate_chunking_strategy(
         >>> results["recursive_chunk"]["avg_size"]
         856
     """
-    pass
+    return {
+        _strategy_name(strategy): _measure_strategy(strategy, document, repeat, test_queries)
+        for strategy in strategies
+    }
+
+
+BENCHMARK_CORPORA = ("prose", "markdown", "code", "logs")
+
+_BENCHMARK_WORDS = (
+    "the system query vector chunk document retrieval model index token latency memory "
+    "context answer source metadata pipeline embedding search result score overlap section "
+    "data user request response cache batch worker process stream value table field"
+).split()
+
+
+def _benchmark_sentence(rng: random.Random) -> str:
+    words = rng.choices(_BENCHMARK_WORDS, k=rng.randint(6, 24))
+    return " ".join(words).capitalize() + rng.choice([".", ".", ".", "?", "!"])
+
+
+def _benchmark_prose(rng: random.Random) -> str:
+    return " ".join(_benchmark_sentence(rng) for _ in range(rng.randint(2, 9))) + "\n\n"
+
+
+def _benchmark_markdown(rng: random.Random) -> str:
+    block = f"{'#' * rng.randint(1, 3)} {_benchmark_sentence(rng)[:-1]}\n\n"
+    for _ in range(rng.randint(1, 4)):
+        if rng.random() < 0.3:
+            items = range(rng.randint(2, 6))
+            block += "".join(f"- {_benchmark_sentence(rng)}\n" for _ in items) + "\n"
+        else:
+            block += _benchmark_prose(rng)
+    return block
+
+
+def _benchmark_code(rng: random.Random) -> str:
+    name = "_".join(rng.choices(_BENCHMARK_WORDS, k=2))
+    lines = [f"def {name}({', '.join(rng.sample(_BENCHMARK_WORDS, rng.randint(1, 4)))}):"]
+    lines.append(f'    """{_benchmark_sentence(rng)}"""')
+    for _ in range(rng.randint(3, 20)):
+        indent = "    " * rng.randint(1, 3)
+        left, right = rng.sample(_BENCHMARK_WORDS, 2)
+        call = f"{rng.choice(_BENCHMARK_WORDS)}({rng.randint(0, 999)})"
+        lines.append(f"{indent}{left} = {right}.{call}")
+    lines.append(f"    return {rng.choice(_BENCHMARK_WORDS)}")
+    return "\n".join(lines) + "\n\n\n"
+
+
+def _benchmark_logs(rng: random.Random) -> str:
+    seconds = rng.randint(0, 86_399)
+    level = rng.choice(["INFO", "INFO", "INFO", "DEBUG", "WARNING", "ERROR"])
+    return (
+        f"2024-01-01T{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}Z {level} "
+        f"{rng.choice(_BENCHMARK_WORDS)}.{rng.choice(_BENCHMARK_WORDS)} "
+        f"request_id={rng.getrandbits(32):08x} latency_ms={rng.randint(1, 2000)} "
+        f"{' '.join(rng.choices(_BENCHMARK_WORDS, k=rng.randint(2, 10)))}\n"
+    )
+
+
+_BENCHMARK_GENERATORS = {
+    "prose": _benchmark_prose,
+    "markdown": _benchmark_markdown,
+    "code": _benchmark_code,
+    "logs": _benchmark_logs,
+}
+
+
+def generate_benchmark_corpus(kind: str, size_chars: int = 200_000, seed: int = 0) -> Document:
+    """
+    Generate a reproducible synthetic document of a given structure.
+    
+    ``prose`` is paragraphs of sentences, ``markdown`` adds headers and
+    bullet lists, ``code`` is Python-like functions, and ``logs`` is one
+    timestamped line per event with no blank lines. The same kind, size
+    and seed always give the same text.
+    
+    Args:
+        kind: One of BENCHMARK_CORPORA
+        size_chars: Length of the generated text
+        seed: Random seed
+        
+    Returns:
+        Document of exactly size_chars characters
+    """
+    if kind not in _BENCHMARK_GENERATORS:
+        raise ValueError(f"Unknown corpus kind {kind!r}; expected one of {BENCHMARK_CORPORA}")
+    rng = random.Random(f"{kind}:{seed}")
+    parts, length = [], 0
+    while length < size_chars:
+        part = _BENCHMARK_GENERATORS[kind](rng)
+        parts.append(part)
+        length += len(part)
+    text = "".join(parts)[:size_chars]
+    return Document(page_content=text, metadata={"source": f"benchmark:{kind}", "seed": seed})
+
+
+def default_benchmark_strategies() -> List[Callable[[Document], List[Document]]]:
+    """Every chunking strategy that runs without external models."""
+    return [
+        chunk_by_character,
+        chunk_by_separator,
+        recursive_chunk,
+        chunk_by_tokens,
+        chunk_with_headers,
+    ]
+
+
+def run_chunking_benchmark(
+    strategies: Optional[List[Callable]] = None,
+    kinds: Iterable[str] = BENCHMARK_CORPORA,
+    size_chars: int = 200_000,
+    repeat: int = 3,
+    seed: int = 0
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Benchmark chunking strategies on synthetic corpora.
+    
+    Every strategy runs on a generated corpus of each kind, through
+    evaluate_chunking_strategy, so each entry reports chars/sec, peak
+    memory and the chunk-size distribution. Add semantic_chunk with
+    functools.partial and an embedding model to include it.
+    
+    Args:
+        strategies: Chunking functions; defaults to default_benchmark_strategies()
+        kinds: Corpus kinds to generate
+        size_chars: Characters per corpus
+        repeat: Timed runs per strategy and corpus
+        seed: Corpus seed
+        
+    Returns:
+        Results keyed by corpus kind, then strategy name
+        
+    Example:
+        >>> results = run_chunking_benchmark(size_chars=1_000_000)
+        >>> print(format_benchmark_report(results))
+    """
+    strategies = strategies or default_benchmark_strategies()
+    return {
+        kind: evaluate_chunking_strategy(
+            generate_benchmark_corpus(kind, size_chars, seed), strategies, repeat=repeat
+        )
+        for kind in kinds
+    }
+
+
+def format_benchmark_report(results: Dict[str, Dict[str, Any]]) -> str:
+    """Render run_chunking_benchmark results as a fixed-width table."""
+    lines = [
+        f"{'corpus':<10} {'strategy':<20} {'chars/s':>12} {'peak KiB':>10} "
+        f"{'chunks':>7} {'avg':>7} {'p10':>6} {'p90':>6} {'std':>7}"
+    ]
+    for kind, by_strategy in results.items():
+        for name, result in by_strategy.items():
+            if "error" in result:
+                lines.append(f"{kind:<10} {name:<20} {result['error']}")
+                continue
+            lines.append(
+                f"{kind:<10} {name:<20} {result['chars_per_sec']:>12,.0f} "
+                f"{result['peak_memory_bytes'] / 1024:>10,.0f} {result['count']:>7} "
+                f"{result['avg_size']:>7.0f} {result['percentiles'].get('p10', 0):>6.0f} "
+                f"{result['percentiles'].get('p90', 0):>6.0f} {result['size_std']:>7.0f}"
+            )
+    return "\n".join(lines)
 
 
 def create_parent_child_chunks(
     document: Document,
     parent_chunk_size: int = 2000,
     child_chunk_size: int = 500
-) -> Tuple[List[Document], List[Document]]:
+) -> Tuple[List[ChunkView], List[ChunkView]]:
     """
-    TODO: Create hierarchical parent-child chunks.
+    Create hierarchical parent-child chunks.
     
     This is an advanced RAG technique where:
     - Small chunks are used for precise retrieval
     - Parent chunks are returned for more context
     
-    Requirements:
-    - Create large parent chunks
-    - Create smaller child chunks within parents
-    - Link children to parents via metadata
+    Parents are recursive chunks without overlap; children are recursive
+    chunks of each parent with 10% overlap, so a child never crosses its
+    parent's boundary. Both are views into the document text, produced in
+    one pass over the parent offsets. Links are integer indexes rather
+    than copies of parent text: a child's ``parent_index`` is its parent's
+    position in parent_chunks, and a parent's children are
+    ``child_chunks[child_start:child_end]``.
     
     Args:
         document: Document to chunk
@@ -391,7 +1895,180 @@ def create_parent_child_chunks(
         
     Example:
         >>> parents, children = create_parent_child_chunks(doc)
-        >>> children[0].metadata["parent_id"]
-        "parent_0"
+        >>> parents[children[0].metadata["parent_index"]]
+        ChunkView(start=0, end=1987, metadata={...})
+    """
+    if child_chunk_size > parent_chunk_size:
+        raise ValueError(
+            f"child_chunk_size ({child_chunk_size}) must not exceed "
+            f"parent_chunk_size ({parent_chunk_size})"
+        )
+    parent_config = ChunkingConfig(chunk_size=parent_chunk_size, chunk_overlap=0)
+    child_config = ChunkingConfig(chunk_size=child_chunk_size, chunk_overlap=child_chunk_size // 10)
+    _validate_chunk_params(parent_config.chunk_size, parent_config.chunk_overlap)
+    _validate_chunk_params(child_config.chunk_size, child_config.chunk_overlap)
+    text = document.page_content
+    parent_spans = _recursive_spans(text, 0, len(text), parent_config.separators, parent_config)
+    parents = []
+    child_spans: List[Tuple[Span, int]] = []
+    for index, (start, end) in enumerate(parent_spans):
+        child_start = len(child_spans)
+        for span in _recursive_spans(text, start, end, child_config.separators, child_config):
+            child_spans.append((span, index))
+        parents.append(ChunkView(text, start, end, {
+            **document.metadata,
+            "chunk_index": index,
+            "total_chunks": len(parent_spans),
+            "child_start": child_start,
+            "child_end": len(child_spans),
+        }))
+    children = [
+        ChunkView(text, start, end, {
+            **document.metadata,
+            "parent_index": parent_index,
+            "chunk_index": index,
+            "total_chunks": len(child_spans),
+        })
+        for index, ((start, end), parent_index) in enumerate(child_spans)
+    ]
+    return parents, children
+
+
+def _strategy_arguments(
+    strategy: Callable[..., List[Document]], config: ChunkingConfig
+) -> Dict[str, Any]:
+    """Keyword arguments that pass config to a chunking strategy."""
+    parameters = inspect.signature(strategy).parameters
+    if "config" in parameters:
+        return {"config": config}
+    if "max_tokens" in parameters:
+        arguments: Dict[str, Any] = {
+            "max_tokens": config.chunk_size, "overlap_tokens": config.chunk_overlap
+        }
+        if isinstance(config.length_function, TokenCounter):
+            arguments["encoding_name"] = config.length_function.encoding_name
+        return arguments
+    if "chunk_size" in parameters:
+        return {"chunk_size": config.chunk_size, "chunk_overlap": config.chunk_overlap}
+    return {}
+
+
+def _chunk_batch(
+    strategy: Callable[..., List[Document]],
+    documents: List[Document],
+    arguments: Dict[str, Any]
+) -> Tuple[List[Document], float]:
+    """Worker task: chunk a batch of documents, timing the work."""
+    started = time.perf_counter()
+    chunks = [chunk for document in documents for chunk in strategy(document, **arguments)]
+    return chunks, time.perf_counter() - started
+
+
+class _BatchSizer:
+    """
+    Adapt the characters per worker task so each takes about target_seconds.
+    
+    Tasks much shorter than that are dominated by pickling and IPC; much
+    longer ones balance poorly across workers. Each finished task updates
+    the estimate of characters per second, with the step clamped to 4x.
     """
-    pass
+
+    min_chars = 16_384
+    max_chars = 16_777_216
+
+    def __init__(self, initial_chars: int = 262_144, target_seconds: float = 0.05):
+        self.chars = initial_chars
+        self.target_seconds = target_seconds
+
+    def update(self, chars: int, seconds: float) -> None:
+        if chars <= 0:
+            return
+        wanted = chars * self.target_seconds / max(seconds, 1e-6)
+        wanted = min(max(wanted, self.chars / 4), self.chars * 4)
+        self.chars = int(min(max(wanted, self.min_chars), self.max_chars))
+
+
+def _next_batch(
+    documents: Iterator[Document], max_chars: int, max_documents: int = 4096
+) -> Tuple[List[Document], int]:
+    batch, chars = [], 0
+    for document in documents:
+        batch.append(document)
+        chars += len(document.page_content)
+        if chars >= max_chars or len(batch) >= max_documents:
+            break
+    return batch, chars
+
+
+def chunk_documents(
+    documents: Iterable[Document],
+    strategy: Callable[..., List[Document]] = recursive_chunk,
+    config: Optional[ChunkingConfig] = None,
+    max_workers: Optional[int] = None,
+    executor: Optional[Executor] = None
+) -> Iterator[Document]:
+    """
+    Chunk many documents in parallel across a process pool.
+    
+    Documents are pulled lazily from ``documents`` (a list or any stream)
+    and grouped into worker tasks by total characters. The task size adapts
+    to the measured chunking speed so that each task runs for tens of
+    milliseconds and pickling overhead stays small. A bounded number of
+    tasks is in flight at a time, and chunks are yielded in input order.
+    
+    config reaches the strategy as ``config`` (recursive_chunk,
+    chunk_with_headers), as max_tokens / overlap_tokens and the
+    TokenCounter's encoding (chunk_by_tokens), or as chunk_size /
+    chunk_overlap (chunk_by_character, chunk_by_separator). Each strategy
+    copies the source document's metadata into its chunks. The strategy
+    must be a module-level function so worker processes can unpickle it.
+    
+    Args:
+        documents: Documents to chunk
+        strategy: Chunking function applied to every document
+        config: Chunking configuration passed to the strategy
+        max_workers: Worker processes (default: CPU count); 1 chunks in this
+            process. Also bounds the tasks in flight on a given executor
+        executor: Optional existing executor to submit tasks to
+        
+    Yields:
+        Chunks of all documents, in input order
+        
+    Example:
+        >>> config = ChunkingConfig(chunk_size=800)
+        >>> for chunk in chunk_documents(load_corpus(), chunk_with_headers, config):
+        ...     index(chunk)
+    """
+    config = config or ChunkingConfig()
+    arguments = _strategy_arguments(strategy, config)
+    if max_workers is not None and max_workers < 1:
+        raise ValueError(f"max_workers must be positive, got {max_workers}")
+    documents = iter(documents)
+    if executor is None and (max_workers or os.cpu_count() or 1) == 1:
+        for document in documents:
+            yield from strategy(document, **arguments)
+        return
+    owned = executor is None
+    pool: Executor = ProcessPoolExecutor(max_workers=max_workers) if executor is None else executor
+    workers = max_workers or os.cpu_count() or 1
+    sizer = _BatchSizer()
+    in_flight: deque = deque()
+    try:
+        while True:
+            while len(in_flight) < 2 * workers:
+                batch, chars = _next_batch(documents, sizer.chars)
+                if not batch:
+                    break
+                in_flight.append((pool.submit(_chunk_batch, strategy, batch, arguments), chars))
+            if not in_flight:
+                return
+            future, chars = in_flight.popleft()
+            chunks, seconds = future.result()
+            sizer.update(chars, seconds)
+            yield from chunks
+    finally:
+        for future, _ in in_flight:
+            future.cancel()
+        if owned:
+            pool.shutdown(wait=True)
+
@@ -34,8 +34,31 @@ HINTS:
 - Metadata filtering narrows search space before similarity
 """
 
-from typing import Any, Callable, Dict, List, Optional, Tuple
-from dataclasses import dataclass, field
+from typing import (
+    Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional,
+    Protocol, Sequence, Tuple, Union, cast,
+)
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field, fields, replace
+import asyncio
+import contextlib
+import hashlib
+import heapq
+import itertools
+import json
+import mmap
+import operator
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+import uuid
+import zlib
 import numpy as np
 
 
@@ -54,6 +77,17 @@ class SearchResult:
     rank: int
 
 
+@dataclass
+class IngestProgress:
+    """Progress record yielded after each micro-batch of a streaming ingest."""
+    batch: int  # 0-based micro-batch number
+    batch_documents: int
+    total_documents: int  # documents added so far
+    ids: List[str]  # ids of this micro-batch
+    elapsed_seconds: float
+    documents_per_second: float
+
+
 @dataclass
 class VectorStoreConfig:
     """Configuration for vector store."""
@@ -61,6 +95,2373 @@ class VectorStoreConfig:
     embedding_dimension: int = 1536  # OpenAI ada-002 dimension
     distance_metric: str = "cosine"  # cosine, euclidean, dot_product
     index_type: str = "flat"  # flat, ivf, hnsw
+    hnsw_m: int = 16  # graph degree (layer 0 keeps 2 * M links)
+    hnsw_ef_construction: int = 200  # beam width while inserting
+    hnsw_ef_search: int = 50  # beam width while querying
+    ivf_nlist: int = 100  # number of k-means posting lists
+    ivf_nprobe: int = 8  # posting lists scanned per query
+    quantization: str = "none"  # none, pq, float16, int8
+    pq_subvectors: int = 48  # uint8 codes per vector; must divide embedding_dimension
+    # >0 keeps float32 originals to re-score k * factor quantized candidates
+    rerank_factor: int = 0
+    compaction_threshold: float = 0.3  # deleted fraction that triggers compaction (0 disables)
+    delta_max_rows: int = 10000  # delta segment size that triggers compaction
+    background_compaction: bool = True  # compact on a background thread
+    num_shards: int = 1  # >1 splits the collection over independently indexed shards
+    shard_processes: int = 0  # >0 searches persisted shards in a process pool of this size
+    query_cache_size: int = 1024  # cached query embeddings (0 disables the cache)
+    query_cache_ttl: Optional[float] = None  # seconds; None keeps entries until evicted
+    latency_window: int = 1024  # recent operations kept for latency percentiles
+
+
+@dataclass
+class EmbeddingConfig:
+    """Configuration for the batched embedding pipeline."""
+    max_batch_tokens: int = 8000  # token budget per embedding call
+    max_batch_size: int = 512  # texts per embedding call
+    max_concurrency: int = 4  # embedding calls in flight at once
+    max_retries: int = 6  # attempts per batch after rate-limit errors
+    initial_backoff: float = 1.0  # seconds
+    max_backoff: float = 60.0  # seconds
+    cache_path: Optional[str] = None  # SQLite embedding cache; None disables it
+    token_counter: Optional[Callable[[str], int]] = None  # default: ~4 characters per token
+
+
+SUPPORTED_METRICS = ("cosine", "euclidean", "dot_product")
+SUPPORTED_STORE_TYPES = ("faiss", "memory")
+SUPPORTED_INDEX_TYPES = ("flat", "hnsw", "ivf")
+SUPPORTED_QUANTIZATIONS = ("none", "pq", "float16", "int8")
+
+STORE_FORMAT = "langchain-exercise-vector-store"
+STORE_FORMAT_VERSION = 1
+
+# Guards cosine similarity against zero-length vectors.
+_EPS = 1e-12
+# Upper bound on the (queries x rows) score block materialized by batch search.
+_SCORE_BLOCK_ELEMENTS = 1 << 24
+
+
+def _as_matrix(vectors: Any, dimension: Optional[int] = None) -> np.ndarray:
+    """Convert embeddings to a C-contiguous float32 matrix of shape (n, dim)."""
+    matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    if matrix.ndim != 2:
+        raise ValueError(f"Expected a 2-D array of embeddings, got shape {matrix.shape}")
+    if dimension is not None and matrix.shape[0] and matrix.shape[1] != dimension:
+        raise ValueError(
+            f"Embedding dimension {matrix.shape[1]} does not match "
+            f"store dimension {dimension}"
+        )
+    return matrix
+
+
+def _similarity_from_dots(
+    dots: np.ndarray,
+    norms: np.ndarray,
+    query_norm: Union[float, np.ndarray],
+    metric: str
+) -> np.ndarray:
+    """
+    Turn raw inner products into similarity scores (higher = more similar).
+
+    Works for a single query (``query_norm`` scalar) and for a batch of
+    queries (``dots`` of shape (q, n) and ``query_norm`` of shape (q, 1)).
+    """
+    if metric == "cosine":
+        return dots / np.maximum(norms * query_norm, _EPS)
+    if metric == "euclidean":
+        squared = norms * norms + query_norm * query_norm - 2.0 * dots
+        return 1.0 / (1.0 + np.sqrt(np.maximum(squared, 0.0)))
+    return dots
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first, using argpartition."""
+    n = scores.shape[0]
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64)
+    if k >= n:
+        return np.argsort(-scores, kind="stable")
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def _top_k_rows(scores: np.ndarray, k: int) -> np.ndarray:
+    """Row-wise top-k column indices of a (q, n) score matrix, best first."""
+    n = scores.shape[1]
+    if k <= 0 or n == 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    if k >= n:
+        return np.argsort(-scores, axis=1, kind="stable")
+    candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+def _maximal_marginal_relevance(
+    query: np.ndarray,
+    candidates: np.ndarray,
+    k: int,
+    lambda_mult: float
+) -> np.ndarray:
+    """
+    Greedy MMR selection over candidate vectors; returns candidate indices.
+    
+    Cosine similarities between all candidates are computed once as one
+    (n x n) product. Each step then scores every candidate at once against
+    a running max-similarity-to-selected array, updated with one row of
+    that matrix, so a step costs O(n) vector work instead of O(n * selected)
+    similarity calls.
+    """
+    n = candidates.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    unit = candidates / np.maximum(np.linalg.norm(candidates, axis=1, keepdims=True), _EPS)
+    relevance = unit @ (query / max(float(np.linalg.norm(query)), _EPS))
+    similarity = unit @ unit.T
+    selected = np.empty(k, dtype=np.int64)
+    available = np.ones(n, dtype=bool)
+    selected[0] = int(np.argmax(relevance))
+    available[selected[0]] = False
+    max_similarity = similarity[selected[0]].copy()
+    for step in range(1, k):
+        scores = lambda_mult * relevance - (1.0 - lambda_mult) * max_similarity
+        scores[~available] = -np.inf
+        selected[step] = int(np.argmax(scores))
+        available[selected[step]] = False
+        np.maximum(max_similarity, similarity[selected[step]], out=max_similarity)
+    return selected
+
+
+def _grow(array: np.ndarray, size: int, fill: Any = 0) -> np.ndarray:
+    """Return ``array`` with room for at least ``size`` rows (doubling growth)."""
+    if size <= array.shape[0]:
+        return array
+    capacity = max(size, 2 * array.shape[0], 64)
+    grown = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+    grown[:array.shape[0]] = array
+    return grown
+
+
+_FILTER_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "$eq": operator.eq,
+    "$ne": operator.ne,
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+    "$lt": operator.lt,
+    "$lte": operator.le,
+    "$in": lambda value, target: value in target,
+    "$nin": lambda value, target: value not in target,
+}
+
+
+def _matches_filter(metadata: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    """
+    Check document metadata against a filter dict.
+    
+    A plain value means equality, a list means "one of", and a dict applies
+    operators such as {"$gte": 2023}. A missing field only matches the
+    negative operators ($ne, $nin).
+    """
+    for key, condition in filters.items():
+        value = metadata.get(key)
+        if isinstance(condition, dict):
+            for op, target in condition.items():
+                if op not in _FILTER_OPERATORS:
+                    raise ValueError(f"Unsupported filter operator '{op}'")
+                if key not in metadata:
+                    if op in ("$ne", "$nin"):
+                        continue
+                    return False
+                try:
+                    if not _FILTER_OPERATORS[op](value, target):
+                        return False
+                except TypeError:
+                    return False
+        elif isinstance(condition, (list, tuple, set)):
+            if key not in metadata or value not in condition:
+                return False
+        elif key not in metadata or value != condition:
+            return False
+    return True
+
+
+def _is_hashable(value: Any) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+class MetadataIndex:
+    """
+    Inverted index from metadata (field, value) to the rows holding it.
+    
+    Each pair owns a growable array of row numbers, so high-cardinality
+    fields such as dates cost O(rows) memory instead of one dense bitmap per
+    value. A filter is compiled into a single boolean row mask with set
+    algebra - union for lists, $in and ranges, complement for $ne/$nin,
+    intersection across fields - before any vector is scored. It matches
+    exactly what _matches_filter accepts. Unhashable values (lists, dicts)
+    are checked row by row.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[Any, np.ndarray]] = {}
+        self._sizes: Dict[str, Dict[Any, int]] = {}
+        self._unhashable: Dict[str, List[int]] = {}
+
+    def add(self, start: int, metadatas: Sequence[Optional[Dict[str, Any]]]) -> None:
+        """Index the metadata of rows start, start + 1, ... (None skips a row)."""
+        for row, metadata in enumerate(metadatas, start=start):
+            for key, value in (metadata or {}).items():
+                if not _is_hashable(value):
+                    self._unhashable.setdefault(key, []).append(row)
+                    continue
+                postings = self._postings.setdefault(key, {})
+                sizes = self._sizes.setdefault(key, {})
+                size = sizes.get(value, 0)
+                rows = _grow(postings.get(value, np.empty(0, dtype=np.int64)), size + 1)
+                rows[size] = row
+                postings[value], sizes[value] = rows, size + 1
+
+    def nbytes(self) -> int:
+        """Approximate bytes held by the posting arrays and row lists."""
+        postings = sum(rows.nbytes for field in self._postings.values() for rows in field.values())
+        return postings + sum(8 * len(rows) for rows in self._unhashable.values())
+
+    def values(self, key: str) -> Dict[Any, np.ndarray]:
+        """Distinct values of a field mapped to the rows holding them."""
+        sizes = self._sizes.get(key, {})
+        return {value: rows[:sizes[value]] for value, rows in self._postings.get(key, {}).items()}
+
+    def _operator_mask(self, key: str, op: str, target: Any, n: int) -> np.ndarray:
+        if op not in _FILTER_OPERATORS:
+            raise ValueError(f"Unsupported filter operator '{op}'")
+        if op in ("$ne", "$nin"):
+            return ~self._operator_mask(key, "$eq" if op == "$ne" else "$in", target, n)
+        postings = self.values(key)
+        if op == "$eq":
+            matches = [target] if _is_hashable(target) and target in postings else []
+        elif op == "$in":
+            matches = [value for value in target if _is_hashable(value) and value in postings]
+        else:
+            compare, matches = _FILTER_OPERATORS[op], []
+            for value in postings:
+                try:
+                    if compare(value, target):
+                        matches.append(value)
+                except TypeError:
+                    pass
+        mask = np.zeros(n, dtype=bool)
+        for value in matches:
+            mask[postings[value]] = True
+        return mask
+
+    def mask(
+        self,
+        filters: Dict[str, Any],
+        n: int,
+        metadata_of: Callable[[int], Optional[Dict[str, Any]]]
+    ) -> np.ndarray:
+        """Boolean mask over n rows of those matching ``filters``."""
+        mask = np.ones(n, dtype=bool)
+        for key, condition in filters.items():
+            if isinstance(condition, dict):
+                field_mask = np.ones(n, dtype=bool)
+                for op, target in condition.items():
+                    field_mask &= self._operator_mask(key, op, target, n)
+            elif isinstance(condition, (list, tuple, set)):
+                field_mask = self._operator_mask(key, "$in", condition, n)
+            else:
+                field_mask = self._operator_mask(key, "$eq", condition, n)
+            for row in self._unhashable.get(key, ()):
+                if row < n:
+                    field_mask[row] = _matches_filter(metadata_of(row) or {}, {key: condition})
+            mask &= field_mask
+        return mask
+
+
+class Quantizer(Protocol):
+    """Compressed vector codes used by FlatIndex (ProductQuantizer, ScalarQuantizer)."""
+
+    min_training_vectors: int
+
+    @property
+    def is_trained(self) -> bool: ...
+
+    @property
+    def code_size(self) -> int: ...
+
+    def train(self, vectors: np.ndarray) -> None: ...
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray: ...
+
+    def decode(self, codes: np.ndarray) -> np.ndarray: ...
+
+    def lookup_table(self, query: np.ndarray) -> Any: ...
+
+    def inner_products(self, table: Any, codes: np.ndarray) -> np.ndarray: ...
+
+    def describe(self) -> Dict[str, Any]: ...
+
+    def state(self) -> Dict[str, np.ndarray]: ...
+
+    def restore(self, arrays: Dict[str, np.ndarray]) -> None: ...
+
+
+class FlatIndex:
+    """
+    Exact (brute-force) index over one contiguous float32 matrix.
+
+    Vector norms are computed once at insertion time, so a query costs a
+    single matrix-vector product plus an argpartition top-k.
+
+    With a ``quantizer`` (ProductQuantizer or ScalarQuantizer) the vectors
+    are additionally stored as codes once enough of them exist to train it.
+    Searches then score the codes, and the float32 originals are dropped
+    unless ``rerank_factor`` asks for exact re-scoring of a shortlist.
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        metric: str = "cosine",
+        quantizer: Optional[Quantizer] = None,
+        rerank_factor: int = 0
+    ):
+        if metric not in SUPPORTED_METRICS:
+            raise ValueError(
+                f"Unsupported distance metric '{metric}'. "
+                f"Expected one of {SUPPORTED_METRICS}"
+            )
+        self.dimension = dimension
+        self.metric = metric
+        self.quantizer = quantizer
+        self.rerank_factor = rerank_factor
+        self._vectors: Optional[np.ndarray] = np.empty((0, dimension), dtype=np.float32)
+        self._codes: Optional[np.ndarray] = None
+        self._norms = np.empty(0, dtype=np.float32)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """
+        Stored vectors, shape (len(self), dimension).
+        
+        A view of the float32 matrix, or an approximate reconstruction from
+        the codes when the originals have been dropped.
+        """
+        if self._vectors is None:
+            quantizer, codes = self._quantized()
+            return quantizer.decode(codes[:self._count])
+        return self._vectors[:self._count]
+
+    @property
+    def norms(self) -> np.ndarray:
+        """View of the precomputed L2 norms of the stored vectors."""
+        return self._norms[:self._count]
+
+    def reconstruct(self, rows: Any) -> np.ndarray:
+        """Vectors for the given rows (decoded from codes if needed)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        if self._vectors is None:
+            quantizer, codes = self._quantized()
+            return quantizer.decode(codes[rows])
+        return self._vectors[rows]
+
+    def _quantized(self) -> Tuple[Quantizer, np.ndarray]:
+        """The quantizer and its codes; only valid once the vectors are encoded."""
+        quantizer, codes = self.quantizer, self._codes
+        assert quantizer is not None and codes is not None
+        return quantizer, codes
+
+    def _reserve(self, capacity: int) -> None:
+        """Grow the backing arrays geometrically so appends stay amortized O(1)."""
+        if capacity <= self._norms.shape[0]:
+            return
+        capacity = max(capacity, 2 * self._norms.shape[0], 64)
+        self._norms = _grow(self._norms, capacity)
+        if self._vectors is not None:
+            self._vectors = _grow(self._vectors, capacity)
+        if self._codes is not None:
+            self._codes = _grow(self._codes, capacity)
+
+    def add(self, vectors: Any) -> np.ndarray:
+        """Append vectors and return their row numbers."""
+        matrix = _as_matrix(vectors, self.dimension)
+        start, end = self._count, self._count + matrix.shape[0]
+        self._reserve(end)
+        self._norms[start:end] = np.linalg.norm(matrix, axis=1)
+        if self._vectors is not None:
+            self._vectors[start:end] = matrix
+        if self._codes is not None:
+            quantizer, codes = self._quantized()
+            codes[start:end] = quantizer.encode(matrix)
+        self._count = end
+        if (self.quantizer is not None and self._codes is None
+                and end >= self.quantizer.min_training_vectors):
+            self.train_quantizer()
+        return np.arange(start, end)
+
+    def train_quantizer(self) -> None:
+        """Train the quantizer on the stored vectors and encode all of them."""
+        quantizer = self.quantizer
+        assert quantizer is not None
+        vectors = self.vectors
+        quantizer.train(vectors)
+        self._codes = _grow(quantizer.encode(vectors), self._norms.shape[0])
+        if not self.rerank_factor:
+            self._vectors = None
+
+    def _inner_products(self, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Exact dot products, or estimates from the quantized codes once they exist."""
+        if self._codes is None:
+            vectors = self._vectors
+            assert vectors is not None
+            selected = vectors[:self._count] if rows is None else vectors[rows]
+            return selected @ query
+        quantizer, codes = self._quantized()
+        selected = codes[:self._count] if rows is None else codes[rows]
+        return quantizer.inner_products(quantizer.lookup_table(query), selected)
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        """Similarity of ``query`` to every stored vector."""
+        dots = self._inner_products(query)
+        return _similarity_from_dots(dots, self.norms, float(np.linalg.norm(query)), self.metric)
+
+    def _score_rows(self, query: np.ndarray, query_norm: float, rows: Any) -> np.ndarray:
+        """Similarity of ``query`` to the given rows only."""
+        rows = np.asarray(rows, dtype=np.int64)
+        dots = self._inner_products(query, rows)
+        return _similarity_from_dots(dots, self._norms[rows], query_norm, self.metric)
+
+    def _shortlist_size(self, k: int) -> int:
+        """How many candidates to keep before exact re-scoring."""
+        if self._codes is not None and self._vectors is not None:
+            return k * max(self.rerank_factor, 1)
+        return k
+
+    def _rerank(
+        self,
+        query: np.ndarray,
+        query_norm: float,
+        rows: np.ndarray,
+        scores: np.ndarray,
+        k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Re-score a quantized shortlist with the float32 originals, when they are kept."""
+        if self._codes is None or self._vectors is None:
+            return rows[:k], scores[:k]
+        exact = _similarity_from_dots(
+            self._vectors[rows] @ query, self._norms[rows], query_norm, self.metric
+        )
+        top = _top_k(exact, k)
+        return rows[top], exact[top]
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Allocated bytes per component (memory maps count their mapped size)."""
+        usage = {
+            "vectors": 0 if self._vectors is None else self._vectors.nbytes,
+            "codes": 0 if self._codes is None else self._codes.nbytes,
+            "norms": self._norms.nbytes,
+        }
+        if self.quantizer is not None:
+            usage["quantizer"] = sum(
+                array.nbytes for array in self.quantizer.state().values() if array is not None
+            )
+        return usage
+
+    def describe(self) -> Dict[str, Any]:
+        """Index type and parameters."""
+        info: Dict[str, Any] = {"type": "flat", "metric": self.metric, "count": self._count}
+        if self.quantizer is not None:
+            info["quantizer"] = self.quantizer.describe()
+            info["encoded"] = self._codes is not None
+            info["rerank_factor"] = self.rerank_factor
+        return info
+
+    def state(self) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        """Scalar parameters and arrays needed to persist this index."""
+        arrays = {"norms": self.norms}
+        if self._vectors is not None:
+            arrays["vectors"] = self._vectors[:self._count]
+        if self._codes is not None:
+            quantizer, codes = self._quantized()
+            arrays["codes"] = codes[:self._count]
+            arrays.update(quantizer.state())
+        return {"count": self._count}, arrays
+
+    def restore(self, params: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> None:
+        """Adopt previously persisted state; arrays may be read-only memory maps."""
+        self._count = params["count"]
+        self._norms = arrays["norms"]
+        self._vectors = arrays.get("vectors")
+        self._codes = arrays.get("codes")
+        if self._codes is not None:
+            quantizer, _ = self._quantized()
+            quantizer.restore(arrays)
+
+    def exact_search(
+        self,
+        query: Any,
+        k: int,
+        mask: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return (rows, scores) of the k most similar vectors, best first.
+        
+        ``mask`` is an optional boolean array over rows; only rows where it
+        is True can be returned.
+        """
+        query = _as_matrix(query, self.dimension)[0]
+        query_norm = float(np.linalg.norm(query))
+        if mask is not None:
+            candidates = np.flatnonzero(mask[:self._count])
+            if 2 * len(candidates) < self._count:
+                # Selective mask: score only the surviving rows.
+                scores = self._score_rows(query, query_norm, candidates)
+                top = _top_k(scores, self._shortlist_size(k))
+                return self._rerank(query, query_norm, candidates[top], scores[top], k)
+        scores = self.scores(query)
+        if mask is not None:
+            scores = np.where(mask[:self._count], scores, -np.inf)
+        rows = _top_k(scores, self._shortlist_size(k))
+        if mask is not None:
+            rows = rows[np.isfinite(scores[rows])]
+        return self._rerank(query, query_norm, rows, scores[rows], k)
+
+    def search(
+        self,
+        query: Any,
+        k: int,
+        mask: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (rows, scores) of the k most similar vectors, best first."""
+        return self.exact_search(query, k, mask)
+
+    def batch_search(
+        self,
+        queries: Any,
+        k: int,
+        mask: Optional[np.ndarray] = None,
+        chunk_size: Optional[int] = None
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Search many queries at once; one (rows, scores) pair per query.
+        
+        Float32 vectors are scored with one matrix-matrix product per chunk
+        of queries. ``chunk_size`` bounds the (chunk x rows) score block and
+        defaults to keeping it near _SCORE_BLOCK_ELEMENTS floats. Scalar
+        codes are decoded block by block into the same product; PQ codes and
+        re-ranked shortlists have no GEMM form, so they are searched query
+        by query.
+        """
+        queries = _as_matrix(queries, self.dimension)
+        scalar = self.quantizer if isinstance(self.quantizer, ScalarQuantizer) else None
+        if self._codes is not None and (self._vectors is not None or scalar is None):
+            return [self.search(query, k, mask) for query in queries]
+        if chunk_size is None:
+            chunk_size = max(1, _SCORE_BLOCK_ELEMENTS // max(self._count, 1))
+        norms = self.norms
+        vectors, codes = self._vectors, self._codes
+        results: List[Tuple[np.ndarray, np.ndarray]] = []
+        for start in range(0, queries.shape[0], chunk_size):
+            chunk = queries[start:start + chunk_size]
+            if codes is not None and scalar is not None:
+                dots = scalar.batch_inner_products(chunk, codes[:self._count])
+            else:
+                assert vectors is not None
+                dots = chunk @ vectors[:self._count].T
+            scores = _similarity_from_dots(
+                dots,
+                norms[None, :],
+                np.linalg.norm(chunk, axis=1)[:, None],
+                self.metric,
+            )
+            if mask is not None:
+                scores[:, ~mask[:self._count]] = -np.inf
+            top = _top_k_rows(scores, k)
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            for rows, row_scores in zip(top, top_scores):
+                keep = np.isfinite(row_scores)
+                results.append((rows[keep], row_scores[keep]))
+        return results
+
+
+class HNSWIndex(FlatIndex):
+    """
+    Hierarchical Navigable Small World graph over the flat vector matrix.
+    
+    Vectors are stored exactly as in FlatIndex; the graph only decides which
+    rows get scored, giving sub-linear query cost. Layer 0 adjacency lives in
+    a fixed-width int32 array (2 * M slots per node); upper layers are sparse
+    dicts since only a few nodes reach them. Masked-out (deleted or
+    filtered) nodes stay in the graph for routing but are never returned;
+    masks that leave only a small fraction of rows are scanned exactly.
+    
+    Nodes are inserted one at a time from Python, a few hundred per second
+    at the default M and ef_construction, so building beyond about
+    ``practical_max_vectors`` rows takes many minutes (1M rows take over an
+    hour). Larger collections should use index_type="ivf", whose build is
+    a handful of matrix products.
+    """
+
+    brute_force_fraction = 0.05
+    practical_max_vectors = 100_000
+    frontier = 32  # candidates expanded per beam-search step
+
+    def __init__(
+        self,
+        dimension: int,
+        metric: str = "cosine",
+        m: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 50,
+        seed: int = 0
+    ):
+        super().__init__(dimension, metric)
+        if m < 2:
+            raise ValueError(f"HNSW M must be at least 2, got {m}")
+        self.m = m
+        self.m0 = 2 * m
+        self.ef_construction = max(ef_construction, m)
+        self.ef_search = ef_search
+        self._level_mult = 1.0 / np.log(m)
+        self._rng = np.random.default_rng(seed)
+        self._levels = np.empty(0, dtype=np.int8)
+        self._neighbors0 = np.full((0, self.m0), -1, dtype=np.int32)
+        self._degree0 = np.zeros(0, dtype=np.int32)
+        self._upper: List[Dict[int, List[int]]] = []  # _upper[l - 1] is layer l
+        self.entry_point = -1
+        self.max_level = -1
+
+    def _reserve(self, capacity: int) -> None:
+        super()._reserve(capacity)
+        capacity = self._norms.shape[0]
+        self._levels = _grow(self._levels, capacity)
+        self._neighbors0 = _grow(self._neighbors0, capacity, fill=-1)
+        self._degree0 = _grow(self._degree0, capacity)
+
+    def add(self, vectors: Any) -> np.ndarray:
+        rows = super().add(vectors)
+        for row in rows:
+            self._insert(int(row))
+        return rows
+
+    def state(self) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        params, arrays = super().state()
+        params.update(
+            entry_point=self.entry_point,
+            max_level=self.max_level,
+            upper_layers=[
+                {str(node): links for node, links in layer.items()} for layer in self._upper
+            ],
+        )
+        arrays.update(
+            hnsw_levels=self._levels[:self._count],
+            hnsw_neighbors0=self._neighbors0[:self._count],
+            hnsw_degree0=self._degree0[:self._count],
+        )
+        return params, arrays
+
+    def memory_usage(self) -> Dict[str, int]:
+        usage = super().memory_usage()
+        upper = sum(
+            sys.getsizeof(layer) + sum(sys.getsizeof(links) for links in layer.values())
+            for layer in self._upper
+        )
+        usage["graph"] = (
+            self._levels.nbytes + self._neighbors0.nbytes + self._degree0.nbytes + upper
+        )
+        return usage
+
+    def describe(self) -> Dict[str, Any]:
+        info = super().describe()
+        info.update(
+            type="hnsw",
+            m=self.m,
+            ef_construction=self.ef_construction,
+            ef_search=self.ef_search,
+            max_level=self.max_level,
+            practical_max_vectors=self.practical_max_vectors,
+            mean_degree0=float(self._degree0[:self._count].mean()) if self._count else 0.0,
+        )
+        return info
+
+    def restore(self, params: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> None:
+        super().restore(params, arrays)
+        self.entry_point = params["entry_point"]
+        self.max_level = params["max_level"]
+        self._upper = [
+            {int(node): links for node, links in layer.items()} for layer in params["upper_layers"]
+        ]
+        self._levels = arrays["hnsw_levels"]
+        self._neighbors0 = arrays["hnsw_neighbors0"]
+        self._degree0 = arrays["hnsw_degree0"]
+
+    def _neighbors(self, node: int, level: int) -> List[int]:
+        if level == 0:
+            return self._neighbors0[node, :self._degree0[node]].tolist()
+        return self._upper[level - 1].get(node, [])
+
+    def _neighbor_rows(self, nodes: List[int], level: int) -> np.ndarray:
+        """Neighbors of all of nodes on one layer, possibly repeated."""
+        if level == 0:
+            block = self._neighbors0[nodes]
+            return block[block >= 0]
+        layer = self._upper[level - 1]
+        return np.array(
+            [neighbor for node in nodes for neighbor in layer.get(node, [])], dtype=np.int64
+        )
+
+    def _set_neighbors(self, node: int, level: int, neighbors: List[int]) -> None:
+        if level == 0:
+            self._neighbors0[node, :len(neighbors)] = neighbors
+            self._neighbors0[node, len(neighbors):] = -1
+            self._degree0[node] = len(neighbors)
+        else:
+            self._upper[level - 1][node] = list(neighbors)
+
+    def _search_layer(
+        self,
+        query: np.ndarray,
+        query_norm: float,
+        entry_points: List[Tuple[float, int]],
+        ef: int,
+        level: int,
+        mask: Optional[np.ndarray] = None
+    ) -> List[Tuple[float, int]]:
+        """
+        Beam search on one layer; returns up to ef (score, node) pairs, best first.
+        
+        Each step expands up to ``frontier`` of the best open candidates at
+        once and scores all of their unvisited neighbors in one call, so the
+        per-step NumPy overhead is shared by a whole frontier.
+        """
+        # Nonzero once a node is scored; the stamps also drop duplicate neighbors.
+        visited = np.zeros(self._count, dtype=np.int32)
+        visited[[node for _, node in entry_points]] = -1
+        candidates = [(-score, node) for score, node in entry_points]
+        heapq.heapify(candidates)
+        results = [(score, node) for score, node in entry_points if mask is None or mask[node]]
+        heapq.heapify(results)
+        while candidates:
+            bound = results[0][0] if len(results) >= ef else -np.inf
+            expand: List[int] = []
+            while candidates and len(expand) < self.frontier and -candidates[0][0] >= bound:
+                expand.append(heapq.heappop(candidates)[1])
+            if not expand:
+                break
+            fresh = self._neighbor_rows(expand, level)
+            fresh = fresh[visited[fresh] == 0]
+            if not len(fresh):
+                continue
+            stamps = np.arange(1, len(fresh) + 1, dtype=np.int32)
+            visited[fresh] = stamps
+            fresh = fresh[visited[fresh] == stamps]
+            scores = self._score_rows(query, query_norm, fresh)
+            if len(results) >= ef:
+                better = scores > results[0][0]
+                fresh, scores = fresh[better], scores[better]
+            for score, neighbor in zip(scores.tolist(), fresh.tolist()):
+                if len(results) < ef or score > results[0][0]:
+                    heapq.heappush(candidates, (-score, neighbor))
+                    if mask is None or mask[neighbor]:
+                        heapq.heappush(results, (score, neighbor))
+                        if len(results) > ef:
+                            heapq.heappop(results)
+        return sorted(results, reverse=True)
+
+    def _select_neighbors(self, candidates: List[Tuple[float, int]], m: int) -> List[int]:
+        """
+        Diversity heuristic from the HNSW paper: keep a candidate only if it
+        is closer to the base node than to any neighbor kept so far, then
+        top up with the best pruned candidates.
+        """
+        if len(candidates) <= m:
+            return [node for _, node in candidates]
+        nodes = np.array([node for _, node in candidates], dtype=np.int64)
+        vectors, norms = self.reconstruct(nodes), self._norms[nodes]
+        pairwise = _similarity_from_dots(
+            vectors @ vectors.T, norms[None, :], norms[:, None], self.metric
+        )
+        scores = [score for score, _ in candidates]
+        # closest[i] = highest similarity of candidate i to any kept neighbor
+        closest = np.full(len(nodes), -np.inf).tolist()
+        selected: List[int] = []
+        for i, score in enumerate(scores):
+            if closest[i] < score:
+                selected.append(i)
+                if len(selected) == m:
+                    break
+                closest = np.maximum(closest, pairwise[i]).tolist()
+        if len(selected) < m:
+            chosen = set(selected)
+            unchosen = [i for i in range(len(candidates)) if i not in chosen]
+            selected.extend(unchosen[:m - len(selected)])
+        return nodes[selected].tolist()
+
+    def _link(self, node: int, new_neighbor: int, level: int) -> None:
+        """Add a back-link, pruning the neighbor list if it is full."""
+        current = self._neighbors(node, level)
+        if new_neighbor in current:
+            return
+        max_degree = self.m0 if level == 0 else self.m
+        linked = current + [new_neighbor]
+        if len(linked) > max_degree:
+            scores = self._score_rows(self.reconstruct(node), float(self._norms[node]), linked)
+            ranked = [(float(scores[i]), linked[i]) for i in np.argsort(-scores, kind="stable")]
+            linked = self._select_neighbors(ranked, max_degree)
+        self._set_neighbors(node, level, linked)
+
+    def _descend(
+        self, query: np.ndarray, query_norm: float, target_level: int
+    ) -> List[Tuple[float, int]]:
+        """Greedy walk from the entry point down to ``target_level``."""
+        entry = [(float(self._score_rows(query, query_norm, [self.entry_point])[0]),
+                  self.entry_point)]
+        for level in range(self.max_level, target_level, -1):
+            entry = self._search_layer(query, query_norm, entry, 1, level)[:1]
+        return entry
+
+    def _insert(self, node: int) -> None:
+        level = min(int(-np.log(1.0 - self._rng.random()) * self._level_mult), 127)
+        self._levels[node] = level
+        while len(self._upper) < level:
+            self._upper.append({})
+        if self.entry_point < 0:
+            self.entry_point, self.max_level = node, level
+            return
+        query, query_norm = self.reconstruct(node), float(self._norms[node])
+        entry = self._descend(query, query_norm, level)
+        for lc in range(min(level, self.max_level), -1, -1):
+            found = self._search_layer(query, query_norm, entry, self.ef_construction, lc)
+            neighbors = self._select_neighbors(found, self.m)
+            self._set_neighbors(node, lc, neighbors)
+            for neighbor in neighbors:
+                self._link(neighbor, node, lc)
+            entry = found
+        if level > self.max_level:
+            self.entry_point, self.max_level = node, level
+
+    def search(
+        self,
+        query: Any,
+        k: int,
+        mask: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Approximate top-k via graph search with beam width max(ef_search, k)."""
+        ef = max(self.ef_search, k)
+        allowed = self._count if mask is None else int(mask[:self._count].sum())
+        if self.entry_point < 0 or k <= 0 or (
+                mask is not None and allowed <= max(ef, self.brute_force_fraction * self._count)):
+            # Small candidate sets are cheaper (and exact) to scan directly.
+            return self.exact_search(query, k, mask)
+        query = _as_matrix(query, self.dimension)[0]
+        query_norm = float(np.linalg.norm(query))
+        entry = self._descend(query, query_norm, 0)
+        found = self._search_layer(query, query_norm, entry, ef, 0, mask)[:k]
+        if len(found) < min(k, allowed):
+            # The mask cut the graph walk short; never return too few results.
+            return self.exact_search(query, k, mask)
+        rows = np.array([node for _, node in found], dtype=np.int64)
+        scores = np.array([score for score, _ in found], dtype=np.float32)
+        return rows, scores
+
+    def batch_search(
+        self,
+        queries: Any,
+        k: int,
+        mask: Optional[np.ndarray] = None,
+        chunk_size: Optional[int] = None
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Graph search has no matrix form; queries are answered one by one."""
+        return [self.search(query, k, mask) for query in _as_matrix(queries, self.dimension)]
+
+
+def _assign_nearest(
+    vectors: np.ndarray,
+    centroids: np.ndarray,
+    metric: str,
+    n: int = 1,
+    chunk_size: int = 65536
+) -> np.ndarray:
+    """Indices of the n most similar centroids for each vector, best first."""
+    centroid_norms = np.linalg.norm(centroids, axis=1)
+    nearest = np.empty((vectors.shape[0], n), dtype=np.int64)
+    for start in range(0, vectors.shape[0], chunk_size):
+        chunk = vectors[start:start + chunk_size]
+        scores = _similarity_from_dots(
+            chunk @ centroids.T,
+            centroid_norms[None, :],
+            np.linalg.norm(chunk, axis=1)[:, None],
+            metric,
+        )
+        if n == 1:
+            nearest[start:start + chunk_size, 0] = scores.argmax(axis=1)
+        else:
+            top = np.argpartition(-scores, n - 1, axis=1)[:, :n]
+            order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+            nearest[start:start + chunk_size] = np.take_along_axis(top, order, axis=1)
+    return nearest
+
+
+def _kmeans(
+    data: np.ndarray,
+    k: int,
+    metric: str = "euclidean",
+    iterations: int = 20,
+    seed: int = 0
+) -> np.ndarray:
+    """Lloyd's k-means; for cosine the data and centroids are kept on the unit sphere."""
+    rng = np.random.default_rng(seed)
+    if metric == "cosine":
+        data = data / np.maximum(np.linalg.norm(data, axis=1, keepdims=True), _EPS)
+    k = min(k, data.shape[0])
+    centroids = data[rng.choice(data.shape[0], k, replace=False)].astype(np.float32)
+    for _ in range(iterations):
+        assignment = _assign_nearest(data, centroids, metric)[:, 0]
+        counts = np.bincount(assignment, minlength=k)
+        order = np.argsort(assignment, kind="stable")
+        occupied = np.flatnonzero(counts)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[occupied]
+        sums = np.add.reduceat(data[order], starts, axis=0)
+        centroids[occupied] = sums / counts[occupied, None]
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            # Re-seed empty clusters with random points so every list is used.
+            centroids[empty] = data[rng.choice(data.shape[0], len(empty), replace=False)]
+        if metric == "cosine":
+            centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), _EPS)
+    return centroids
+
+
+class ProductQuantizer:
+    """
+    Product quantizer for compressed vector storage.
+    
+    Each vector is split into ``m`` sub-vectors and every sub-vector is
+    stored as the uint8 id of its nearest of 256 k-means centroids, so a
+    vector costs ``m`` bytes. Inner products with a query are estimated by
+    asymmetric distance computation: one (m, 256) lookup table per query,
+    then ``m`` table lookups per stored vector.
+    """
+
+    ksub = 256
+    min_training_vectors = 4 * ksub
+    max_training_vectors = 64 * ksub
+
+    def __init__(self, dimension: int, m: int = 48, seed: int = 0):
+        if m < 1 or dimension % m:
+            raise ValueError(
+                f"PQ sub-vector count {m} must divide the embedding dimension {dimension}"
+            )
+        self.dimension = dimension
+        self.m = m
+        self.dsub = dimension // m
+        self.seed = seed
+        self.codebooks: Optional[np.ndarray] = None  # (m, ksub, dsub)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.codebooks is not None
+
+    @property
+    def code_size(self) -> int:
+        """Bytes per encoded vector."""
+        return self.m
+
+    def _split(self, vectors: np.ndarray) -> np.ndarray:
+        """View vectors as (n, m, dsub) sub-vectors."""
+        return vectors.reshape(vectors.shape[0], self.m, self.dsub)
+
+    def train(self, vectors: np.ndarray) -> None:
+        """Learn one 256-centroid codebook per sub-space."""
+        if vectors.shape[0] < self.ksub:
+            raise ValueError(f"PQ training needs at least {self.ksub} vectors")
+        rng = np.random.default_rng(self.seed)
+        if vectors.shape[0] > self.max_training_vectors:
+            sample = rng.choice(vectors.shape[0], self.max_training_vectors, replace=False)
+            vectors = vectors[sample]
+        sub_vectors = self._split(np.ascontiguousarray(vectors, dtype=np.float32))
+        self.codebooks = np.stack([
+            _kmeans(
+                np.ascontiguousarray(sub_vectors[:, j]),
+                self.ksub,
+                iterations=10,
+                seed=self.seed + j,
+            )
+            for j in range(self.m)
+        ])
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Encode float vectors as (n, m) uint8 codes."""
+        codebooks = self.codebooks
+        assert codebooks is not None, "ProductQuantizer.encode() before train()"
+        sub_vectors = self._split(np.ascontiguousarray(vectors, dtype=np.float32))
+        codes = np.empty((vectors.shape[0], self.m), dtype=np.uint8)
+        for j in range(self.m):
+            codes[:, j] = _assign_nearest(
+                np.ascontiguousarray(sub_vectors[:, j]), codebooks[j], "euclidean"
+            )[:, 0]
+        return codes
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Approximate reconstruction of the vectors behind ``codes``."""
+        codebooks = self.codebooks
+        assert codebooks is not None, "ProductQuantizer.decode() before train()"
+        parts = codebooks[np.arange(self.m), codes]  # (n, m, dsub)
+        return parts.reshape(codes.shape[0], self.dimension)
+
+    def lookup_table(self, query: np.ndarray) -> np.ndarray:
+        """(m, ksub) table of inner products between query sub-vectors and centroids."""
+        codebooks = self.codebooks
+        assert codebooks is not None, "ProductQuantizer.lookup_table() before train()"
+        return np.einsum("mkd,md->mk", codebooks, query.reshape(self.m, self.dsub))
+
+    def inner_products(self, table: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Estimated inner products for every code row, via table lookups."""
+        dots = np.zeros(codes.shape[0], dtype=np.float32)
+        for j in range(self.m):
+            dots += table[j, codes[:, j]]
+        return dots
+
+    def describe(self) -> Dict[str, Any]:
+        return {"type": "pq", "m": self.m, "ksub": self.ksub, "trained": self.is_trained}
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {} if self.codebooks is None else {"pq_codebooks": self.codebooks}
+
+    def restore(self, arrays: Dict[str, np.ndarray]) -> None:
+        self.codebooks = np.asarray(arrays["pq_codebooks"])
+
+
+class ScalarQuantizer:
+    """
+    Scalar quantizer: every coordinate stored as float16 or as an 8-bit code.
+    
+    ``float16`` halves the bytes per vector and needs no training. ``int8``
+    quarters them: each dimension gets its own affine scale
+    ``x ~ offset + scale * code`` (code in 0..255), learned from the min and
+    max of the training vectors; later values outside that range are
+    clipped. Inner products are computed on blocks of decoded rows, so only
+    one block is ever held as float32.
+    """
+
+    block_rows = 1024  # decoded block stays cache-resident
+    max_training_vectors = 65536
+
+    def __init__(self, dimension: int, kind: str = "int8"):
+        if kind not in ("float16", "int8"):
+            raise ValueError(f"Unsupported scalar quantization '{kind}'")
+        self.dimension = dimension
+        self.kind = kind
+        self.min_training_vectors = 1 if kind == "float16" else 256
+        self.offset: Optional[np.ndarray] = None
+        self.scale: Optional[np.ndarray] = None
+
+    @property
+    def is_trained(self) -> bool:
+        return self.kind == "float16" or self.scale is not None
+
+    @property
+    def code_size(self) -> int:
+        """Bytes per encoded vector."""
+        return self.dimension * (2 if self.kind == "float16" else 1)
+
+    def train(self, vectors: np.ndarray) -> None:
+        """Learn the per-dimension offset and scale (no-op for float16)."""
+        if self.kind == "float16":
+            return
+        if vectors.shape[0] > self.max_training_vectors:
+            rng = np.random.default_rng(0)
+            sample = rng.choice(vectors.shape[0], self.max_training_vectors, replace=False)
+            vectors = vectors[sample]
+        low, high = vectors.min(axis=0), vectors.max(axis=0)
+        self.offset = low.astype(np.float32)
+        self.scale = np.maximum((high - low) / 255.0, _EPS).astype(np.float32)
+
+    def _affine(self) -> Tuple[np.ndarray, np.ndarray]:
+        """The int8 (offset, scale); only valid once trained."""
+        offset, scale = self.offset, self.scale
+        assert offset is not None and scale is not None
+        return offset, scale
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Encode float vectors as (n, dimension) float16 or uint8 codes."""
+        if self.kind == "float16":
+            return np.asarray(vectors, dtype=np.float16)
+        offset, scale = self._affine()
+        codes = np.rint((vectors - offset) / scale)
+        return np.clip(codes, 0, 255).astype(np.uint8)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Float32 reconstruction of the vectors behind ``codes``."""
+        if self.kind == "float16":
+            return codes.astype(np.float32)
+        offset, scale = self._affine()
+        return codes.astype(np.float32) * scale + offset
+
+    def lookup_table(self, query: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Per-query (weights, bias) so that q . x ~ codes @ weights + bias."""
+        if self.kind == "float16":
+            return query.astype(np.float32), 0.0
+        offset, scale = self._affine()
+        return query * scale, float(query @ offset)
+
+    def inner_products(self, table: Tuple[np.ndarray, float], codes: np.ndarray) -> np.ndarray:
+        """Estimated inner products for every code row, one block at a time."""
+        weights, bias = table
+        dots = np.empty(codes.shape[0], dtype=np.float32)
+        for start in range(0, codes.shape[0], self.block_rows):
+            dots[start:start + self.block_rows] = (
+                codes[start:start + self.block_rows].astype(np.float32) @ weights
+            )
+        return dots + bias
+
+    def batch_inner_products(self, queries: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """(queries x rows) estimated inner products, decoding one block at a time."""
+        dots = np.empty((queries.shape[0], codes.shape[0]), dtype=np.float32)
+        for start in range(0, codes.shape[0], self.block_rows):
+            block = self.decode(codes[start:start + self.block_rows])
+            dots[:, start:start + self.block_rows] = queries @ block.T
+        return dots
+
+    def describe(self) -> Dict[str, Any]:
+        return {"type": self.kind, "trained": self.is_trained}
+
+    def state(self) -> Dict[str, np.ndarray]:
+        if not self.is_trained or self.kind == "float16":
+            return {}
+        offset, scale = self._affine()
+        return {"sq_offset": offset, "sq_scale": scale}
+
+    def restore(self, arrays: Dict[str, np.ndarray]) -> None:
+        if self.kind == "int8":
+            self.offset = np.asarray(arrays["sq_offset"])
+            self.scale = np.asarray(arrays["sq_scale"])
+
+
+class IVFIndex(FlatIndex):
+    """
+    Inverted-file index over the flat vector matrix.
+    
+    k-means centroids partition the rows into ``nlist`` posting lists and a
+    query scores only the rows of its ``nprobe`` nearest lists. The index
+    trains itself once it holds ``min_points_per_list`` vectors per list;
+    until then searches are exact scans. Call ``train()`` again after the
+    store has grown to refresh the centroids.
+    """
+
+    min_points_per_list = 39
+    max_points_per_list = 256  # k-means sample size cap, per list
+
+    def __init__(
+        self,
+        dimension: int,
+        metric: str = "cosine",
+        nlist: int = 100,
+        nprobe: int = 8,
+        seed: int = 0,
+        quantizer: Optional[Quantizer] = None,
+        rerank_factor: int = 0
+    ):
+        super().__init__(dimension, metric, quantizer, rerank_factor)
+        if nlist < 1:
+            raise ValueError(f"IVF nlist must be at least 1, got {nlist}")
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        self.trained_size = 0
+        self._lists: List[np.ndarray] = []
+        self._list_sizes = np.zeros(0, dtype=np.int64)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self, nlist: Optional[int] = None) -> None:
+        """(Re)train centroids on the stored vectors and rebuild the posting lists."""
+        if nlist is not None:
+            self.nlist = nlist
+        if not self._count:
+            raise ValueError("Cannot train an IVF index without vectors")
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(self._count, self.nlist * self.max_points_per_list)
+        sample = self.vectors
+        if sample_size < self._count:
+            sample = sample[np.sort(rng.choice(self._count, sample_size, replace=False))]
+        centroids = _kmeans(sample, self.nlist, self.metric, seed=self.seed)
+        self.centroids = centroids
+        self.trained_size = self._count
+        self._lists = [np.empty(0, dtype=np.int64) for _ in range(len(centroids))]
+        self._list_sizes = np.zeros(len(centroids), dtype=np.int64)
+        self._append_to_lists(np.arange(self._count), self.vectors)
+
+    def _append_to_lists(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        centroids = self.centroids
+        assert centroids is not None
+        assignment = _assign_nearest(vectors, centroids, self.metric)[:, 0]
+        for list_id in np.unique(assignment):
+            members = rows[assignment == list_id]
+            size = self._list_sizes[list_id]
+            self._lists[list_id] = _grow(self._lists[list_id], size + len(members))
+            self._lists[list_id][size:size + len(members)] = members
+            self._list_sizes[list_id] = size + len(members)
+
+    def add(self, vectors: Any) -> np.ndarray:
+        matrix = _as_matrix(vectors, self.dimension)
+        rows = super().add(matrix)
+        if self.is_trained:
+            self._append_to_lists(rows, matrix)
+        elif self._count >= self.nlist * self.min_points_per_list:
+            self.train()
+        return rows
+
+    def state(self) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        params, arrays = super().state()
+        params.update(nlist=self.nlist, trained_size=self.trained_size)
+        if self.centroids is not None:
+            arrays["ivf_centroids"] = self.centroids
+            arrays["ivf_offsets"] = np.concatenate(([0], np.cumsum(self._list_sizes)))
+            arrays["ivf_lists"] = np.concatenate(
+                [self.posting_list(i) for i in range(len(self._lists))]
+            )
+        return params, arrays
+
+    def restore(self, params: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> None:
+        super().restore(params, arrays)
+        self.nlist = params["nlist"]
+        self.trained_size = params["trained_size"]
+        if "ivf_centroids" in arrays:
+            self.centroids = np.asarray(arrays["ivf_centroids"])
+            offsets = np.asarray(arrays["ivf_offsets"])
+            members = arrays["ivf_lists"]
+            self._lists = [members[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+            self._list_sizes = np.diff(offsets)
+
+    def memory_usage(self) -> Dict[str, int]:
+        usage = super().memory_usage()
+        usage["posting_lists"] = (
+            sum(postings.nbytes for postings in self._lists) + self._list_sizes.nbytes
+            + (0 if self.centroids is None else self.centroids.nbytes)
+        )
+        return usage
+
+    def describe(self) -> Dict[str, Any]:
+        info = super().describe()
+        info.update(type="ivf", nlist=self.nlist, nprobe=self.nprobe, trained=self.is_trained)
+        if self.is_trained:
+            info.update(
+                trained_size=self.trained_size,
+                min_list_size=int(self._list_sizes.min()),
+                max_list_size=int(self._list_sizes.max()),
+                mean_list_size=float(self._list_sizes.mean()),
+            )
+        return info
+
+    def posting_list(self, list_id: int) -> np.ndarray:
+        """Rows assigned to one posting list."""
+        return self._lists[list_id][:self._list_sizes[list_id]]
+
+    def search(
+        self,
+        query: Any,
+        k: int,
+        mask: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Approximate top-k over the rows of the ``nprobe`` nearest posting lists."""
+        centroids = self.centroids
+        if centroids is None or k <= 0:
+            return self.exact_search(query, k, mask)
+        query = _as_matrix(query, self.dimension)[0]
+        nprobe = min(self.nprobe, len(centroids))
+        probed = _assign_nearest(query[None, :], centroids, self.metric, n=nprobe)[0]
+        rows = np.concatenate([self.posting_list(list_id) for list_id in probed])
+        if mask is not None:
+            rows = rows[mask[rows]]
+            if len(rows) < k and mask[:self._count].sum() > len(rows):
+                # A selective filter left the probed lists short; scan exactly instead.
+                return self.exact_search(query, k, mask)
+        query_norm = float(np.linalg.norm(query))
+        scores = self._score_rows(query, query_norm, rows)
+        top = _top_k(scores, self._shortlist_size(k))
+        return self._rerank(query, query_norm, rows[top], scores[top], k)
+
+    def batch_search(
+        self,
+        queries: Any,
+        k: int,
+        mask: Optional[np.ndarray] = None,
+        chunk_size: Optional[int] = None
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Each query probes its own posting lists, so queries are answered one by one."""
+        if not self.is_trained:
+            return super().batch_search(queries, k, mask, chunk_size)
+        return [self.search(query, k, mask) for query in _as_matrix(queries, self.dimension)]
+
+
+def _create_index(config: VectorStoreConfig) -> FlatIndex:
+    """Build the index described by ``config.index_type`` and ``config.quantization``."""
+    if config.quantization not in SUPPORTED_QUANTIZATIONS:
+        raise ValueError(
+            f"Unsupported quantization '{config.quantization}'. "
+            f"Expected one of {SUPPORTED_QUANTIZATIONS}"
+        )
+    quantizer: Optional[Quantizer] = None
+    if config.quantization != "none" and config.index_type == "hnsw":
+        raise ValueError("Quantized storage is supported with the flat and ivf indexes, not hnsw")
+    if config.quantization == "pq":
+        quantizer = ProductQuantizer(config.embedding_dimension, config.pq_subvectors)
+    elif config.quantization in ("float16", "int8"):
+        quantizer = ScalarQuantizer(config.embedding_dimension, config.quantization)
+    if config.index_type == "flat":
+        return FlatIndex(
+            config.embedding_dimension,
+            config.distance_metric,
+            quantizer=quantizer,
+            rerank_factor=config.rerank_factor,
+        )
+    if config.index_type == "hnsw":
+        return HNSWIndex(
+            config.embedding_dimension,
+            config.distance_metric,
+            m=config.hnsw_m,
+            ef_construction=config.hnsw_ef_construction,
+            ef_search=config.hnsw_ef_search,
+        )
+    if config.index_type == "ivf":
+        return IVFIndex(
+            config.embedding_dimension,
+            config.distance_metric,
+            nlist=config.ivf_nlist,
+            nprobe=config.ivf_nprobe,
+            quantizer=quantizer,
+            rerank_factor=config.rerank_factor,
+        )
+    raise ValueError(
+        f"Unsupported index type '{config.index_type}'. "
+        f"Expected one of {SUPPORTED_INDEX_TYPES}"
+    )
+
+
+class _DocumentTable:
+    """
+    Row-indexed documents backed by a JSON-lines side file.
+    
+    The file is memory-mapped and a row is parsed only when it is read, so
+    loading a store does not deserialize every document. Documents added
+    after loading are kept in memory. The map is opened immediately so the
+    table keeps reading the same file even if the store is re-persisted.
+    """
+
+    def __init__(self, path: str, offsets: np.ndarray):
+        self.path = path
+        self._offsets = offsets
+        self._persisted = len(offsets) - 1
+        self._appended: List[Optional[Document]] = []
+        self._overrides: Dict[int, Optional[Document]] = {}
+        self._mmap: Optional[mmap.mmap] = None
+        if offsets[-1] > 0:
+            with open(path, "rb") as handle:
+                self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return self._persisted + len(self._appended)
+
+    def __iter__(self):
+        return (self[row] for row in range(len(self)))
+
+    def __getitem__(self, row: int) -> Optional[Document]:
+        if row < 0:
+            row += len(self)
+        if row >= self._persisted:
+            return self._appended[row - self._persisted]
+        if row in self._overrides:
+            return self._overrides[row]
+        # Every persisted row holds at least "null", so the file is non-empty and mapped.
+        assert self._mmap is not None
+        record = json.loads(self._mmap[self._offsets[row]:self._offsets[row + 1]])
+        return None if record is None else Document(**record)
+
+    def __setitem__(self, row: int, document: Optional[Document]) -> None:
+        if row >= self._persisted:
+            self._appended[row - self._persisted] = document
+        else:
+            self._overrides[row] = document
+
+    def append(self, document: Optional[Document]) -> None:
+        self._appended.append(document)
+
+
+def _document_nbytes(document: Document) -> int:
+    """Approximate in-memory size of a document: UTF-8 content plus JSON metadata."""
+    metadata = json.dumps(document.metadata, ensure_ascii=False, default=str)
+    return len(document.page_content.encode("utf-8")) + len(metadata.encode("utf-8"))
+
+
+class _LatencyWindow:
+    """Rolling window of operation latencies with percentile summaries."""
+
+    def __init__(self, size: int = 1024):
+        self.count = 0
+        self._samples: deque = deque(maxlen=max(size, 1))
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def timer(self):
+        start = time.perf_counter()
+        yield
+        self.record(time.perf_counter() - start)
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+
+    def summary(self) -> Dict[str, Any]:
+        """Total count plus mean/p50/p95/p99 in milliseconds over the window."""
+        with self._lock:
+            samples = np.array(self._samples, dtype=np.float64) * 1000.0
+        if not len(samples):
+            return {"count": self.count, "window": 0}
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+        return {
+            "count": self.count,
+            "window": len(samples),
+            "mean_ms": float(samples.mean()),
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+        }
+
+
+def _latency_windows(config: VectorStoreConfig) -> Dict[str, _LatencyWindow]:
+    return {
+        name: _LatencyWindow(config.latency_window) for name in ("add", "search", "batch_search")
+    }
+
+
+class VectorStore:
+    """
+    In-process vector store.
+    
+    Every document version is a row in one global, append-only row space:
+    ``documents[i]``, ``ids[i]`` and the tombstone ``_deleted[i]`` describe
+    row ``i``. The rows are split over two segments:
+    
+    - ``index``: the main index (flat, HNSW or IVF) holding rows
+      [0, len(index))
+    - ``delta``: a small exact flat segment holding the rows after that
+    
+    Deletes only set tombstones. Updates tombstone the old row and append
+    the new version to the delta segment, and while the delta segment is
+    non-empty every new row goes there, so no write ever rebuilds the main
+    index. Once the deleted fraction reaches ``compaction_threshold`` (or
+    the delta outgrows ``delta_max_rows``) compaction rebuilds the main
+    index from the live rows, by default on a background thread.
+    """
+
+    compaction_retries = 2  # fresh snapshots taken when writes race a compaction
+
+    def __init__(self, config: VectorStoreConfig, store_type: str = "memory"):
+        self.config = config
+        self.store_type = store_type
+        self.index = _create_index(config)
+        self.delta = FlatIndex(config.embedding_dimension, config.distance_metric)
+        self.documents: List[Document] = []
+        self.ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._deleted = np.zeros(0, dtype=bool)
+        self.deleted_count = 0
+        self.embedding_model: Any = None
+        self._metadata_index: Optional[MetadataIndex] = None
+        self.lock = threading.RLock()
+        self._compaction_lock = threading.Lock()  # held for a whole compaction
+        self._compaction_thread: Optional[threading.Thread] = None
+        self.version = 0  # bumped by every change that can alter search results
+        self.query_cache = QueryEmbeddingCache.from_config(config)
+        self.latencies = _latency_windows(config)
+        self.document_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self.documents) - self.deleted_count
+
+    @property
+    def metadata_index(self) -> MetadataIndex:
+        """Metadata inverted index, built on first use (e.g. after load_store)."""
+        with self.lock:
+            if self._metadata_index is None:
+                index = MetadataIndex()
+                index.add(0, [
+                    None if self._deleted[row] else self.documents[row].metadata
+                    for row in range(len(self.documents))
+                ])
+                self._metadata_index = index
+            return self._metadata_index
+
+    def filter_mask(self, filters: Dict[str, Any]) -> np.ndarray:
+        """Boolean mask of live rows whose metadata matches ``filters``."""
+        with self.lock:
+            rows = len(self.documents)
+            mask = self.metadata_index.mask(
+                filters, rows, lambda row: self.documents[row].metadata
+            )
+            if self.deleted_count:
+                mask &= ~self._deleted[:rows]
+            return mask
+
+    def live_mask(self) -> Optional[np.ndarray]:
+        """Boolean mask of non-deleted rows, or None when nothing is deleted."""
+        if not self.deleted_count:
+            return None
+        return ~self._deleted[:len(self.documents)]
+
+    def deleted_fraction(self) -> float:
+        return self.deleted_count / len(self.documents) if len(self.documents) else 0.0
+
+    def delete_rows(self, rows: Sequence[int]) -> int:
+        """Tombstone rows; returns how many were newly deleted."""
+        with self.lock:
+            deleted = 0
+            for row in rows:
+                if self._deleted[row]:
+                    continue
+                self._deleted[row] = True
+                del self._rows[self.ids[row]]
+                deleted += 1
+            self.deleted_count += deleted
+            self.version += bool(deleted)
+        if deleted:
+            self.maybe_compact()
+        return deleted
+
+    def add(
+        self,
+        documents: Sequence[Document],
+        embeddings: Any,
+        ids: Optional[Sequence[str]] = None,
+        to_delta: bool = False
+    ) -> List[str]:
+        """
+        Store documents with their precomputed embeddings and return their ids.
+        
+        Rows go to the main index unless ``to_delta`` is set or the delta
+        segment already holds rows (rows must stay contiguous per segment).
+        """
+        with self.latencies["add"].timer():
+            ids = self._add(documents, embeddings, ids, to_delta)
+        if len(self.delta):
+            self.maybe_compact()
+        return ids
+
+    def _add(
+        self,
+        documents: Sequence[Document],
+        embeddings: Any,
+        ids: Optional[Sequence[str]],
+        to_delta: bool
+    ) -> List[str]:
+        matrix = _as_matrix(embeddings, self.config.embedding_dimension)
+        if matrix.shape[0] != len(documents):
+            raise ValueError(
+                f"Got {matrix.shape[0]} embeddings for {len(documents)} documents"
+            )
+        if ids is None:
+            ids = [doc.metadata.get("id") or uuid.uuid4().hex for doc in documents]
+        ids = [str(doc_id) for doc_id in ids]
+        with self.lock:
+            duplicates = [doc_id for doc_id in ids if doc_id in self._rows]
+            if duplicates or len(set(ids)) != len(ids):
+                raise ValueError(f"Duplicate document ids: {duplicates or ids}")
+            start = len(self.documents)
+            if to_delta or len(self.delta):
+                self.delta.add(matrix)
+            else:
+                self.index.add(matrix)
+            self._deleted = _grow(self._deleted, start + len(ids), fill=False)
+            if self._metadata_index is not None:
+                self._metadata_index.add(start, [doc.metadata for doc in documents])
+            for row, (doc_id, doc) in enumerate(zip(ids, documents), start=start):
+                self._rows[doc_id] = row
+                self.ids.append(doc_id)
+                self.documents.append(doc)
+                self.document_bytes += _document_nbytes(doc)
+            self.version += 1
+        return ids
+
+    def vectors_for(self, rows: Any) -> np.ndarray:
+        """Stored vectors of the given rows, from whichever segment holds them."""
+        rows = np.asarray(rows, dtype=np.int64)
+        base = len(self.index)
+        vectors = np.empty((len(rows), self.config.embedding_dimension), dtype=np.float32)
+        in_main = rows < base
+        if in_main.any():
+            vectors[in_main] = self.index.reconstruct(rows[in_main])
+        if not in_main.all():
+            vectors[~in_main] = self.delta.reconstruct(rows[~in_main] - base)
+        return vectors
+
+    def _results(self, rows: np.ndarray, scores: np.ndarray) -> List[SearchResult]:
+        return [
+            SearchResult(document=self.documents[row], score=float(score), rank=rank)
+            for rank, (row, score) in enumerate(zip(rows, scores), start=1)
+        ]
+
+    def _merge_delta(
+        self,
+        main: Tuple[np.ndarray, np.ndarray],
+        delta: Tuple[np.ndarray, np.ndarray],
+        k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        rows = np.concatenate([main[0], delta[0] + len(self.index)])
+        scores = np.concatenate([main[1], delta[1]])
+        top = _top_k(scores, k)
+        return rows[top], scores[top]
+
+    def search_rows(
+        self,
+        query_vector: Any,
+        k: int,
+        mask: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """(rows, scores) of the top k over both segments; ``mask`` is over global rows."""
+        with self.lock, self.latencies["search"].timer():
+            if mask is None:
+                mask = self.live_mask()
+            base = len(self.index)
+            found = self.index.search(query_vector, k, None if mask is None else mask[:base])
+            if len(self.delta):
+                found = self._merge_delta(
+                    found,
+                    self.delta.search(query_vector, k, None if mask is None else mask[base:]),
+                    k,
+                )
+            return found
+
+    def search(
+        self,
+        query_vector: Any,
+        k: int,
+        mask: Optional[np.ndarray] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[SearchResult]:
+        """
+        Return the k documents most similar to ``query_vector``.
+        
+        ``mask`` and/or metadata ``filters`` restrict the candidate rows (see
+        filter_mask); without them every live row is a candidate.
+        """
+        with self.lock:
+            if filters:
+                allowed = self.filter_mask(filters)
+                mask = allowed if mask is None else mask & allowed
+            return self._results(*self.search_rows(query_vector, k, mask))
+
+    def batch_search_rows(
+        self,
+        query_vectors: Any,
+        k: int,
+        mask: Optional[np.ndarray] = None
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """(rows, scores) of the top k for each query, over both segments."""
+        with self.lock, self.latencies["batch_search"].timer():
+            if mask is None:
+                mask = self.live_mask()
+            base = len(self.index)
+            found = self.index.batch_search(query_vectors, k, None if mask is None else mask[:base])
+            if len(self.delta):
+                delta_found = self.delta.batch_search(
+                    query_vectors, k, None if mask is None else mask[base:]
+                )
+                found = [self._merge_delta(m, d, k) for m, d in zip(found, delta_found)]
+            return found
+
+    def batch_search(
+        self,
+        query_vectors: Any,
+        k: int,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[SearchResult]]:
+        """Return the k most similar documents for each row of ``query_vectors``."""
+        with self.lock:
+            mask = self.filter_mask(filters) if filters else None
+            return [
+                self._results(rows, scores)
+                for rows, scores in self.batch_search_rows(query_vectors, k, mask)
+            ]
+
+    def search_with_vectors(
+        self,
+        query_vector: Any,
+        k: int
+    ) -> Tuple[List[SearchResult], np.ndarray]:
+        """Top-k results together with their stored vectors (one row per result)."""
+        with self.lock:
+            rows, scores = self.search_rows(query_vector, k)
+            return self._results(rows, scores), self.vectors_for(rows)
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Bytes per component across both segments, documents and metadata."""
+        usage: Dict[str, int] = {}
+        with self.lock:
+            for segment in (self.index, self.delta):
+                for component, size in segment.memory_usage().items():
+                    usage[component] = usage.get(component, 0) + size
+            usage["documents"] = self.document_bytes
+            usage["metadata_index"] = (
+                0 if self._metadata_index is None else self._metadata_index.nbytes()
+            )
+            usage["tombstones"] = self._deleted.nbytes
+        return usage
+
+    def needs_compaction(self) -> bool:
+        threshold = self.config.compaction_threshold
+        return bool(threshold) and (
+            self.deleted_fraction() >= threshold or len(self.delta) >= self.config.delta_max_rows
+        )
+
+    def maybe_compact(self) -> None:
+        """Start compaction if a threshold is crossed and none is running."""
+        if not self.needs_compaction():
+            return
+        if not self.config.background_compaction:
+            # Callers may hold self.lock, which a running compaction needs to
+            # swap, so never wait for one here; it is already doing the work.
+            if self._compaction_lock.acquire(blocking=False):
+                try:
+                    self._compact()
+                finally:
+                    self._compaction_lock.release()
+            return
+        with self.lock:
+            if self._compaction_thread is not None and self._compaction_thread.is_alive():
+                return
+            self._compaction_thread = threading.Thread(
+                target=self._compact_while_needed, name="vector-store-compaction", daemon=True
+            )
+            self._compaction_thread.start()
+
+    def _compact_while_needed(self) -> None:
+        # Writes made during a pass can cross a threshold again.
+        while self.needs_compaction():
+            self.compact()
+
+    def wait_for_compaction(self, timeout: Optional[float] = None) -> None:
+        thread = self._compaction_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def compact(self) -> Dict[str, int]:
+        """
+        Merge both segments into a new main index that holds only live rows.
+        
+        The new index is built without holding the lock, so searches and
+        writes continue meanwhile. Compactions never overlap: each one holds
+        a dedicated compaction lock from snapshot to swap. If writes land
+        during the build the pass is retried from a fresh snapshot, up to
+        ``compaction_retries`` times; after that they are replayed at swap
+        time instead: later tombstones carry over and later rows are appended
+        to the fresh delta segment. Row numbers change; ids do not.
+        """
+        with self._compaction_lock:
+            return self._compact()
+
+    def _compact(self) -> Dict[str, int]:
+        attempt = 0
+        while True:
+            with self.lock:
+                snapshot_version = self.version
+                snapshot_rows = len(self.documents)
+                snapshot_documents = self.documents
+                live = np.flatnonzero(~self._deleted[:snapshot_rows])
+                vectors = self.vectors_for(live)
+            index = _create_index(self.config)
+            if len(live):
+                index.add(vectors)
+            live_documents = [snapshot_documents[row] for row in live]
+            live_bytes = sum(_document_nbytes(doc) for doc in live_documents)
+            with self.lock:
+                if self.version != snapshot_version and attempt < self.compaction_retries:
+                    attempt += 1
+                    continue
+                total = len(self.documents)
+                later = np.arange(snapshot_rows, total)
+                delta = FlatIndex(self.config.embedding_dimension, self.config.distance_metric)
+                if len(later):
+                    delta.add(self.vectors_for(later))
+                kept = np.concatenate([live, later])
+                later_documents = [self.documents[row] for row in later]
+                self.documents = live_documents + later_documents
+                self.document_bytes = live_bytes + sum(
+                    _document_nbytes(doc) for doc in later_documents
+                )
+                self.ids = [self.ids[row] for row in kept]
+                self._deleted = self._deleted[kept].copy()
+                self.deleted_count = int(self._deleted.sum())
+                self._rows = {
+                    doc_id: row for row, doc_id in enumerate(self.ids) if not self._deleted[row]
+                }
+                self.index, self.delta = index, delta
+                self._metadata_index = None
+                self.version += 1
+                return {"removed_rows": total - len(kept), "rows": len(kept)}
+
+
+_WORKER_SHARDS: Dict[str, Tuple[str, "VectorStore"]] = {}
+
+
+def _search_shard(
+    path: str,
+    generation: str,
+    query_vectors: np.ndarray,
+    k: int,
+    filters: Optional[Dict[str, Any]]
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Process-pool task: search one persisted shard, returning (rows, scores) per query.
+    
+    Each worker memory-maps a shard the first time it is asked for it and
+    keeps it until the store is persisted again (a new ``generation``).
+    """
+    cached = _WORKER_SHARDS.get(path)
+    if cached is None or cached[0] != generation:
+        cached = _WORKER_SHARDS[path] = (generation, load_store(path))
+    shard = cached[1]
+    mask = shard.filter_mask(filters) if filters else None
+    return shard.batch_search_rows(query_vectors, k, mask)
+
+
+def _merge_shard_results(
+    per_shard: Sequence[Tuple[np.ndarray, np.ndarray]],
+    k: int
+) -> List[Tuple[float, int, int]]:
+    """Heap-merge per-shard top-k lists into the global top k as (score, shard, row)."""
+    merged = heapq.merge(*[
+        [(-float(score), shard, int(row)) for row, score in zip(rows, scores)]
+        for shard, (rows, scores) in enumerate(per_shard)
+    ])
+    return [(-neg_score, shard, row) for neg_score, shard, row in itertools.islice(merged, k)]
+
+
+class ShardedVectorStore:
+    """
+    A collection split over ``num_shards`` independent VectorStores.
+    
+    Documents are routed to a shard by a stable hash of their id, so every
+    shard holds, indexes and compacts its own slice. Searches scatter to all
+    shards and heap-merge the per-shard top-k lists.
+    
+    After persist_store/load_store, and with ``shard_processes > 0``,
+    searches run in a process pool: each worker memory-maps the persisted
+    shard segments (sharing the OS page cache) so scoring scales across
+    cores instead of contending for the GIL. Writes made since the last
+    persist/load are not on disk, so until the next persist searches run
+    in-process against the live shards.
+    """
+
+    def __init__(self, config: VectorStoreConfig, store_type: str = "memory"):
+        if config.num_shards < 2:
+            raise ValueError(f"A sharded store needs num_shards >= 2, got {config.num_shards}")
+        self.config = config
+        self.store_type = store_type
+        self.shards = [
+            VectorStore(self.shard_config(config, shard), store_type)
+            for shard in range(config.num_shards)
+        ]
+        self.embedding_model: Any = None
+        self.query_cache = QueryEmbeddingCache.from_config(config)
+        self.latencies = _latency_windows(config)
+        self.lock = threading.RLock()
+        self.path: Optional[str] = None
+        self.generation: Optional[str] = None
+        self._persisted_versions: Optional[Tuple[int, ...]] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @staticmethod
+    def shard_config(config: VectorStoreConfig, shard: int) -> VectorStoreConfig:
+        return replace(
+            config, collection_name=f"{config.collection_name}-{shard}", num_shards=1,
+            shard_processes=0, query_cache_size=0,
+        )
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self.shards)
+
+    def __enter__(self) -> "ShardedVectorStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the search process pool, if one was started."""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def shard_of(self, doc_id: str) -> int:
+        # crc32 rather than hash(): routing must agree across processes and runs.
+        return zlib.crc32(str(doc_id).encode("utf-8")) % len(self.shards)
+
+    def mark_persisted(self, path: str, generation: str, versions: Tuple[int, ...]) -> None:
+        """Record that the shards at ``versions`` are on disk under ``path``."""
+        self.path, self.generation, self._persisted_versions = path, generation, versions
+
+    def add(
+        self,
+        documents: Sequence[Document],
+        embeddings: Any,
+        ids: Optional[Sequence[str]] = None
+    ) -> List[str]:
+        """Route documents to their shards and return their ids in input order."""
+        matrix = _as_matrix(embeddings, self.config.embedding_dimension)
+        if matrix.shape[0] != len(documents):
+            raise ValueError(
+                f"Got {matrix.shape[0]} embeddings for {len(documents)} documents"
+            )
+        if ids is None:
+            ids = [doc.metadata.get("id") or uuid.uuid4().hex for doc in documents]
+        ids = [str(doc_id) for doc_id in ids]
+        if len(set(ids)) != len(ids):
+            raise ValueError(f"Duplicate document ids: {ids}")
+        routed: Dict[int, List[int]] = {}
+        for position, doc_id in enumerate(ids):
+            routed.setdefault(self.shard_of(doc_id), []).append(position)
+        with self.lock, self.latencies["add"].timer():
+            for shard, positions in routed.items():
+                self.shards[shard].add(
+                    [documents[i] for i in positions],
+                    matrix[positions],
+                    [ids[i] for i in positions],
+                )
+        return ids
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Bytes per component, summed over all shards."""
+        usage: Dict[str, int] = {}
+        for shard in self.shards:
+            for component, size in shard.memory_usage().items():
+                usage[component] = usage.get(component, 0) + size
+        return usage
+
+    def _use_pool(self) -> bool:
+        return (
+            self.config.shard_processes > 0
+            and self.path is not None
+            and self._persisted_versions == tuple(shard.version for shard in self.shards)
+        )
+
+    def _scatter(
+        self,
+        query_vectors: np.ndarray,
+        k: int,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[Tuple[float, int, int]]]:
+        """Global top k as (score, shard, row) for each query."""
+        if self._use_pool():
+            path, generation = self.path, self.generation
+            assert path is not None and generation is not None  # set by persist/load
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.config.shard_processes)
+            futures = [
+                self._executor.submit(
+                    _search_shard, os.path.join(path, _shard_directory(shard)),
+                    generation, query_vectors, k, filters,
+                )
+                for shard in range(len(self.shards))
+            ]
+            per_shard = [future.result() for future in futures]
+        else:
+            per_shard = [
+                shard.batch_search_rows(
+                    query_vectors, k, shard.filter_mask(filters) if filters else None
+                )
+                for shard in self.shards
+            ]
+        return [_merge_shard_results(found, k) for found in zip(*per_shard)]
+
+    def _results(self, merged: List[Tuple[float, int, int]]) -> List[SearchResult]:
+        return [
+            SearchResult(document=self.shards[shard].documents[row], score=score, rank=rank)
+            for rank, (score, shard, row) in enumerate(merged, start=1)
+        ]
+
+    def search(
+        self,
+        query_vector: Any,
+        k: int,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[SearchResult]:
+        """Return the k documents most similar to ``query_vector`` across all shards."""
+        query = _as_matrix(query_vector, self.config.embedding_dimension)
+        with self.latencies["search"].timer():
+            merged = self._scatter(query, k, filters)[0]
+        return self._results(merged)
+
+    def batch_search(
+        self,
+        query_vectors: Any,
+        k: int,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[SearchResult]]:
+        """Return the k most similar documents for each row of ``query_vectors``."""
+        queries = _as_matrix(query_vectors, self.config.embedding_dimension)
+        with self.latencies["batch_search"].timer():
+            found = self._scatter(queries, k, filters)
+        return [self._results(merged) for merged in found]
+
+    def search_with_vectors(
+        self,
+        query_vector: Any,
+        k: int
+    ) -> Tuple[List[SearchResult], np.ndarray]:
+        """Top-k results together with their stored vectors (one row per result)."""
+        query = _as_matrix(query_vector, self.config.embedding_dimension)
+        with self.latencies["search"].timer():
+            merged = self._scatter(query, k)[0]
+        vectors = np.empty((len(merged), self.config.embedding_dimension), dtype=np.float32)
+        for i, (_, shard, row) in enumerate(merged):
+            vectors[i] = self.shards[shard].vectors_for([row])[0]
+        return self._results(merged), vectors
+
+
+def _shard_directory(shard: int) -> str:
+    return f"shard-{shard:05d}"
+
+
+def _embed_query(
+    store: Union[VectorStore, ShardedVectorStore],
+    query: Any,
+    embedding_model: Any = None
+) -> np.ndarray:
+    """
+    Embed a text query, or pass through a query that is already a vector.
+    
+    Text queries are looked up in the store's query cache first.
+    """
+    if not isinstance(query, str):
+        return _as_matrix(query, store.config.embedding_dimension)[0]
+    return _embed_queries(store, [query], embedding_model)[0]
+
+
+def _embed_queries(
+    store: Union[VectorStore, ShardedVectorStore],
+    queries: Sequence[str],
+    embedding_model: Any = None,
+    config: Optional[EmbeddingConfig] = None
+) -> np.ndarray:
+    """
+    Embed text queries with the model's embed_query, skipping cache hits.
+    
+    Asymmetric models embed queries and documents differently, so queries
+    never go through embed_documents, even in a batch. The misses are
+    embedded concurrently on a pool of ``config.max_concurrency`` threads,
+    with the same rate-limit retries and shared backoff as
+    create_embeddings.
+    """
+    model = embedding_model or store.embedding_model
+    if model is None:
+        raise ValueError("An embedding model is required to embed a text query")
+    dimension = store.config.embedding_dimension
+    cache, name = store.query_cache, _model_name(model)
+    vectors = np.empty((len(queries), dimension), dtype=np.float32)
+    missing = []
+    for i, query in enumerate(queries):
+        cached = None if cache is None else cache.get(name, query)
+        if cached is None:
+            missing.append(i)
+        else:
+            vectors[i] = cached
+    if not missing:
+        return vectors
+    texts = [queries[i] for i in missing]
+    config = config or EmbeddingConfig()
+    backoff = _AdaptiveBackoff(config.initial_backoff, config.max_backoff)
+
+    def embed(text: str) -> List[float]:
+        return _call_with_backoff(lambda: model.embed_query(text), backoff, config.max_retries)
+
+    if len(texts) == 1 or config.max_concurrency <= 1:
+        embedded = _as_matrix([embed(text) for text in texts], dimension)
+    else:
+        workers = min(config.max_concurrency, len(texts))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            embedded = _as_matrix(list(executor.map(embed, texts)), dimension)
+    vectors[missing] = embedded
+    if cache is not None:
+        for text, vector in zip(texts, embedded):
+            cache.put(name, text, vector)
+    return vectors
+
+
+def _approximate_token_count(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)."""
+    return len(text) // 4 + 1
+
+
+def _model_name(model: Any) -> str:
+    """Best-effort identifier of an embedding model, used in cache keys."""
+    for attribute in ("model", "model_name", "model_id"):
+        name = getattr(model, attribute, None)
+        if isinstance(name, str) and name:
+            return name
+    return type(model).__name__
+
+
+# Message fallback for errors without a status: rate-limit wording, or a
+# standalone 429 next to it ("429 Too Many Requests"), never a bare number.
+_RATE_LIMIT_MESSAGE = re.compile(
+    r"\brate[ _-]?limit|\btoo many requests\b|\b429\b\W+(?:rate|quota)", re.IGNORECASE
+)
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    """Recognize provider rate-limit errors (HTTP 429) without importing SDKs."""
+    for attribute in ("status_code", "http_status"):
+        status = getattr(error, attribute, None)
+        if status is not None:
+            return bool(status == 429)
+    if "ratelimit" in type(error).__name__.lower():
+        return True
+    return _RATE_LIMIT_MESSAGE.search(str(error)) is not None
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache in a SQLite file.
+    
+    Entries are keyed by a SHA-256 of the model name and the exact text, so
+    unchanged chunks are never re-embedded and a model change never serves
+    stale vectors. Vectors are stored as float32 blobs.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._connection.commit()
+
+    @staticmethod
+    def key(model_name: str, text: str) -> str:
+        return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        """Return cached vectors for the keys that are present."""
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = list(keys[start:start + 500])
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._connection.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                )
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: Dict[str, Sequence[float]]) -> None:
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [
+                    (key, np.asarray(vector, dtype=np.float32).tobytes())
+                    for key, vector in items.items()
+                ],
+            )
+            self._connection.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> "EmbeddingCache":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class QueryEmbeddingCache:
+    """
+    In-memory LRU cache of query embeddings with an optional time-to-live.
+    
+    Keys are the model name plus the normalized query text (Unicode NFKC,
+    whitespace collapsed), so repeated queries skip the embedding round trip
+    and a model change never serves another model's vectors. Case is kept:
+    embedding models are case-sensitive. Only embed_query outputs are
+    stored, so batched and single searches share entries safely.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None):
+        if max_size < 1:
+            raise ValueError(f"Query cache size must be positive, got {max_size}")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: VectorStoreConfig) -> Optional["QueryEmbeddingCache"]:
+        if not config.query_cache_size:
+            return None
+        return cls(config.query_cache_size, config.query_cache_ttl)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(unicodedata.normalize("NFKC", text).split())
+
+    def get(self, model_name: str, query: str) -> Optional[np.ndarray]:
+        """Cached (read-only) embedding of ``query``, or None."""
+        key = (model_name, self.normalize(query))
+        with self._lock:
+            entry = self._entries.get(key)
+            if (entry is not None and self.ttl is not None
+                    and time.monotonic() - entry[0] > self.ttl):
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, model_name: str, query: str, vector: np.ndarray) -> None:
+        key = (model_name, self.normalize(query))
+        vector = np.array(vector, dtype=np.float32)
+        vector.setflags(write=False)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def statistics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class _AdaptiveBackoff:
+    """
+    Backoff shared by all embedding workers.
+    
+    A rate-limit error doubles the delay and pauses every worker until it
+    has elapsed; each success halves it again, so throughput recovers once
+    the provider stops pushing back.
+    """
+
+    def __init__(self, initial: float, maximum: float):
+        self.initial = initial
+        self.maximum = maximum
+        self.delay = 0.0
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            pause = self._resume_at - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+
+    def rate_limited(self, retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            self.delay = min(self.maximum, max(self.initial, self.delay * 2))
+            pause = max(self.delay, retry_after or 0.0)
+            self._resume_at = max(self._resume_at, time.monotonic() + pause)
+
+    def succeeded(self) -> None:
+        with self._lock:
+            self.delay = self.delay / 2 if self.delay > self.initial else 0.0
+
+
+def _token_batches(
+    texts: Sequence[str],
+    config: EmbeddingConfig
+) -> List[List[int]]:
+    """Group text positions into batches under the token and size budgets."""
+    count_tokens = config.token_counter or _approximate_token_count
+    batches: List[List[int]] = []
+    current: List[int] = []
+    budget = 0
+    for position, text in enumerate(texts):
+        tokens = count_tokens(text)
+        if current and (budget + tokens > config.max_batch_tokens
+                        or len(current) >= config.max_batch_size):
+            batches.append(current)
+            current, budget = [], 0
+        current.append(position)
+        budget += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _call_with_backoff(call: Callable[[], Any], backoff: _AdaptiveBackoff, max_retries: int) -> Any:
+    """Run one embedding call, retrying rate-limit errors with the shared backoff."""
+    retries = 0
+    while True:
+        backoff.wait()
+        try:
+            result = call()
+        except Exception as error:
+            if not _is_rate_limit_error(error) or retries >= max_retries:
+                raise
+            retries += 1
+            backoff.rate_limited(getattr(error, "retry_after", None))
+            continue
+        backoff.succeeded()
+        return result
+
+
+def _embed_batch(
+    model: Any,
+    texts: List[str],
+    backoff: _AdaptiveBackoff,
+    max_retries: int
+) -> List[List[float]]:
+    """Embed one batch, retrying rate-limit errors with the shared backoff."""
+    vectors = _call_with_backoff(lambda: model.embed_documents(texts), backoff, max_retries)
+    if len(vectors) != len(texts):
+        raise ValueError(
+            f"Embedding model returned {len(vectors)} vectors for a batch of "
+            f"{len(texts)} texts"
+        )
+    return [list(vector) for vector in vectors]
 
 
 def create_embedding_model(
@@ -91,19 +2492,23 @@ def create_embedding_model(
 
 def create_embeddings(
     texts: List[str],
-    model: Any = None
+    model: Any = None,
+    config: Optional[EmbeddingConfig] = None
 ) -> List[List[float]]:
     """
-    TODO: Convert texts to embedding vectors.
+    Convert texts to embedding vectors through a batched, cached pipeline.
     
-    Requirements:
-    - Batch texts for efficient API calls
-    - Handle rate limiting
-    - Return list of embedding vectors
+    - Identical texts are embedded once
+    - With ``config.cache_path`` set, vectors are looked up in (and written
+      to) a persistent cache keyed by model name + text hash
+    - Remaining texts are packed into batches under a token budget
+    - Batches run on a bounded thread pool (``max_concurrency``)
+    - Rate-limit errors trigger a shared, adaptive backoff and a retry
     
     Args:
         texts: List of texts to embed
         model: Embedding model to use
+        config: Batching, concurrency, retry and cache settings
         
     Returns:
         List of embedding vectors (each is List[float])
@@ -115,7 +2520,41 @@ def create_embeddings(
         >>> len(embeddings[0])
         1536  # dimension depends on model
     """
-    pass
+    if model is None:
+        raise ValueError("An embedding model is required to create embeddings")
+    if not texts:
+        return []
+    config = config or EmbeddingConfig()
+    unique = list(dict.fromkeys(texts))
+    vectors: Dict[str, List[float]] = {}
+
+    cache = EmbeddingCache(config.cache_path) if config.cache_path else None
+    try:
+        keys: Dict[str, str] = {}
+        if cache is not None:
+            name = _model_name(model)
+            keys = {text: EmbeddingCache.key(name, text) for text in unique}
+            cached = cache.get_many(list(keys.values()))
+            vectors = {text: cached[key] for text, key in keys.items() if key in cached}
+        pending = [text for text in unique if text not in vectors]
+
+        backoff = _AdaptiveBackoff(config.initial_backoff, config.max_backoff)
+        batches = [[pending[i] for i in batch] for batch in _token_batches(pending, config)]
+        with ThreadPoolExecutor(max_workers=max(1, config.max_concurrency)) as executor:
+            futures = {
+                executor.submit(_embed_batch, model, batch, backoff, config.max_retries): batch
+                for batch in batches
+            }
+            for future in as_completed(futures):
+                batch = futures[future]
+                embedded = dict(zip(batch, future.result()))
+                vectors.update(embedded)
+                if cache is not None:
+                    cache.put_many({keys[text]: vector for text, vector in embedded.items()})
+    finally:
+        if cache is not None:
+            cache.close()
+    return [vectors[text] for text in texts]
 
 
 def calculate_similarity(
@@ -124,12 +2563,9 @@ def calculate_similarity(
     metric: str = "cosine"
 ) -> float:
     """
-    TODO: Calculate similarity between two embeddings.
+    Calculate similarity between two embeddings.
     
-    Requirements:
-    - Support cosine similarity
-    - Support euclidean distance (converted to similarity)
-    - Support dot product
+    Euclidean distance d is converted to a similarity as 1 / (1 + d).
     
     Args:
         embedding1: First embedding vector
@@ -144,7 +2580,20 @@ def calculate_similarity(
         >>> sim
         1.0  # identical vectors
     """
-    pass
+    if metric not in SUPPORTED_METRICS:
+        raise ValueError(
+            f"Unsupported distance metric '{metric}'. Expected one of {SUPPORTED_METRICS}"
+        )
+    vector1 = np.asarray(embedding1, dtype=np.float64)
+    vector2 = np.asarray(embedding2, dtype=np.float64)
+    if vector1.shape != vector2.shape:
+        raise ValueError(f"Shape mismatch: {vector1.shape} vs {vector2.shape}")
+    return float(_similarity_from_dots(
+        np.dot(vector1, vector2),
+        np.linalg.norm(vector2),
+        np.linalg.norm(vector1),
+        metric,
+    ))
 
 
 def create_vector_store(
@@ -152,16 +2601,17 @@ def create_vector_store(
     store_type: str = "faiss"
 ) -> Any:
     """
-    TODO: Initialize a vector store/database.
+    Initialize an in-process vector store.
     
-    Requirements:
-    - Support multiple backends (FAISS, Chroma, in-memory)
-    - Configure distance metric
-    - Set up collection/index
+    Both "faiss" and "memory" are served by the NumPy-backed VectorStore,
+    which keeps every embedding in one contiguous float32 matrix (the same
+    layout as a FAISS flat index). External databases such as Chroma are not
+    available in-process. With ``config.num_shards > 1`` a
+    ShardedVectorStore is returned instead.
     
     Args:
         config: Vector store configuration
-        store_type: Type of vector store (faiss, chroma, memory)
+        store_type: Type of vector store (faiss, memory)
         
     Returns:
         Initialized vector store
@@ -170,27 +2620,37 @@ def create_vector_store(
         >>> store = create_vector_store(store_type="faiss")
         >>> # store is ready to add documents
     """
-    pass
+    if store_type not in SUPPORTED_STORE_TYPES:
+        raise ValueError(
+            f"Unsupported store type '{store_type}'. Expected one of {SUPPORTED_STORE_TYPES}"
+        )
+    config = config or VectorStoreConfig()
+    if config.num_shards < 1:
+        raise ValueError(f"num_shards must be at least 1, got {config.num_shards}")
+    if config.num_shards > 1:
+        return ShardedVectorStore(config, store_type=store_type)
+    return VectorStore(config, store_type=store_type)
 
 
 def add_documents(
     store: Any,
     documents: List[Document],
-    embedding_model: Any = None
+    embedding_model: Any = None,
+    embedding_config: Optional[EmbeddingConfig] = None
 ) -> List[str]:
     """
-    TODO: Add documents to the vector store.
+    Embed documents and add them to the vector store.
     
-    Requirements:
-    - Create embeddings for documents
-    - Store documents with their vectors
-    - Store metadata for filtering
-    - Return document IDs
+    A document whose metadata has an "id" keeps that id; the others get a
+    generated one. The embedding model is remembered on the store so later
+    text queries can be embedded without passing it again. For corpora too
+    large to hold in memory use add_documents_stream.
     
     Args:
         store: Vector store instance
         documents: Documents to add
         embedding_model: Model to create embeddings
+        embedding_config: Optional batching/caching settings for create_embeddings
         
     Returns:
         List of document IDs in the store
@@ -200,7 +2660,123 @@ def add_documents(
         >>> len(ids)
         10  # 10 documents added
     """
-    pass
+    model = embedding_model or store.embedding_model
+    if model is None:
+        raise ValueError("An embedding model is required to add documents")
+    if not documents:
+        return []
+    embeddings = create_embeddings(
+        [doc.page_content for doc in documents], model, embedding_config
+    )
+    ids = store.add(documents, embeddings)
+    store.embedding_model = model
+    return ids
+
+
+def _ingest_progress(
+    batch: int,
+    ids: List[str],
+    total: int,
+    started: float
+) -> IngestProgress:
+    elapsed = time.perf_counter() - started
+    return IngestProgress(
+        batch=batch,
+        batch_documents=len(ids),
+        total_documents=total,
+        ids=ids,
+        elapsed_seconds=elapsed,
+        documents_per_second=total / elapsed if elapsed > 0 else 0.0,
+    )
+
+
+def add_documents_stream(
+    store: Any,
+    documents: Iterable[Document],
+    embedding_model: Any = None,
+    embedding_config: Optional[EmbeddingConfig] = None,
+    batch_size: int = 256
+) -> Iterator[IngestProgress]:
+    """
+    Embed and add documents lazily, in bounded micro-batches.
+    
+    ``documents`` may be any iterable, e.g. a generator reading from disk.
+    At most ``batch_size`` documents and their embeddings are held at a
+    time, and the next batch is only pulled from ``documents`` after the
+    caller consumes the previous progress record. Ingest memory therefore
+    stays constant regardless of corpus size, and a slow consumer applies
+    backpressure to the producer.
+    
+    Batches already yielded stay in the store if a later batch fails.
+    
+    Args:
+        store: Vector store instance
+        documents: Documents to add
+        embedding_model: Model to create embeddings
+        embedding_config: Optional batching/caching settings for create_embeddings
+        batch_size: Documents per micro-batch
+        
+    Yields:
+        One IngestProgress record per micro-batch
+        
+    Example:
+        >>> for progress in add_documents_stream(store, read_documents(path), model):
+        ...     print(progress.total_documents, progress.documents_per_second)
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be positive, got {batch_size}")
+    model = embedding_model or store.embedding_model
+    if model is None:
+        raise ValueError("An embedding model is required to add documents")
+    started, total = time.perf_counter(), 0
+    iterator = iter(documents)
+    for batch in itertools.count():
+        chunk = list(itertools.islice(iterator, batch_size))
+        if not chunk:
+            return
+        ids = add_documents(store, chunk, model, embedding_config)
+        total += len(ids)
+        yield _ingest_progress(batch, ids, total, started)
+
+
+async def aadd_documents_stream(
+    store: Any,
+    documents: Union[AsyncIterable[Document], Iterable[Document]],
+    embedding_model: Any = None,
+    embedding_config: Optional[EmbeddingConfig] = None,
+    batch_size: int = 256
+) -> AsyncIterator[IngestProgress]:
+    """
+    Async variant of add_documents_stream.
+    
+    Accepts an async or a plain iterable. Embedding and indexing of each
+    micro-batch run in a worker thread, so the event loop stays responsive.
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be positive, got {batch_size}")
+    model = embedding_model or store.embedding_model
+    if model is None:
+        raise ValueError("An embedding model is required to add documents")
+    if not hasattr(documents, "__aiter__"):
+        documents = _as_async_iterable(documents)
+    started, total, batch = time.perf_counter(), 0, 0
+    chunk: List[Document] = []
+    async for document in documents:
+        chunk.append(document)
+        if len(chunk) < batch_size:
+            continue
+        ids = await asyncio.to_thread(add_documents, store, chunk, model, embedding_config)
+        total += len(ids)
+        yield _ingest_progress(batch, ids, total, started)
+        batch, chunk = batch + 1, []
+    if chunk:
+        ids = await asyncio.to_thread(add_documents, store, chunk, model, embedding_config)
+        yield _ingest_progress(batch, ids, total + len(ids), started)
+
+
+async def _as_async_iterable(items: Iterable[Any]) -> AsyncIterator[Any]:
+    for item in items:
+        yield item
 
 
 def similarity_search(
@@ -210,17 +2786,17 @@ def similarity_search(
     embedding_model: Any = None
 ) -> List[SearchResult]:
     """
-    TODO: Search for similar documents using semantic similarity.
+    Search for similar documents using semantic similarity.
     
-    Requirements:
-    - Embed the query
-    - Find k most similar documents
-    - Return documents with similarity scores
-    - Order by relevance (most similar first)
+    The query is scored against all stored embeddings with one vectorized
+    matrix-vector product; the top k are selected with argpartition. Text
+    queries are embedded through the store's query cache (see
+    VectorStoreConfig.query_cache_size), so repeated queries skip the
+    embedding call.
     
     Args:
         store: Vector store to search
-        query: Search query text
+        query: Search query text (or an already computed query embedding)
         k: Number of results to return
         embedding_model: Model to embed query
         
@@ -234,7 +2810,7 @@ def similarity_search(
         >>> results[0].score
         0.92
     """
-    pass
+    return store.search(_embed_query(store, query, embedding_model), k)
 
 
 def search_with_filters(
@@ -245,12 +2821,15 @@ def search_with_filters(
     embedding_model: Any = None
 ) -> List[SearchResult]:
     """
-    TODO: Search with metadata filters.
+    Search with metadata filters applied before scoring.
     
-    Requirements:
-    - Apply metadata filters before/during search
-    - Support equality, range, and list filters
-    - Combine filtering with similarity search
+    The filter is evaluated against the store's metadata inverted index as
+    set algebra, producing a mask of candidate rows; only those rows are
+    scored. Selective filters therefore cost less than an unfiltered search
+    and still return k results whenever k documents match.
+    
+    Supported conditions: plain values (equality), lists (one of), and
+    dicts of operators ($eq, $ne, $gt, $gte, $lt, $lte, $in, $nin).
     
     Args:
         store: Vector store to search
@@ -270,7 +2849,7 @@ def search_with_filters(
         ...     k=5
         ... )
     """
-    pass
+    return store.search(_embed_query(store, query, embedding_model), k, filters=filters)
 
 
 def search_with_score_threshold(
@@ -306,17 +2885,18 @@ def mmr_search(
     query: str,
     k: int = 5,
     lambda_mult: float = 0.5,
-    embedding_model: Any = None
+    embedding_model: Any = None,
+    fetch_k: int = 20
 ) -> List[SearchResult]:
     """
-    TODO: Maximal Marginal Relevance search for diverse results.
+    Maximal Marginal Relevance search for diverse results.
     
-    MMR balances relevance and diversity to avoid redundant results.
-    
-    Requirements:
-    - Find relevant documents
-    - Penalize similarity to already selected docs
-    - Balance with lambda_mult parameter
+    MMR balances relevance and diversity to avoid redundant results. The
+    ``fetch_k`` nearest documents are fetched from the index, then k of
+    them are picked greedily, each maximising
+    ``lambda_mult * sim(query, doc) - (1 - lambda_mult) * max sim(doc, selected)``
+    (cosine similarities). The candidate-candidate similarity matrix is
+    computed once, so selection is vectorized per step.
     
     Args:
         store: Vector store to search
@@ -324,37 +2904,56 @@ def mmr_search(
         k: Number of results
         lambda_mult: Diversity factor (0=max diversity, 1=max relevance)
         embedding_model: Model to embed query
+        fetch_k: Number of nearest candidates to select from
         
     Returns:
-        Diverse yet relevant results
+        Diverse yet relevant results, in selection order, scored with the
+        store's distance metric
     """
-    pass
+    if not 0.0 <= lambda_mult <= 1.0:
+        raise ValueError(f"lambda_mult must be between 0 and 1, got {lambda_mult}")
+    query_vector = _embed_query(store, query, embedding_model)
+    results, candidates = store.search_with_vectors(query_vector, max(fetch_k, k))
+    picked = _maximal_marginal_relevance(query_vector, candidates, k, lambda_mult)
+    return [
+        SearchResult(document=results[i].document, score=results[i].score, rank=rank)
+        for rank, i in enumerate(picked, start=1)
+    ]
 
 
 def batch_search(
     store: Any,
     queries: List[str],
     k: int = 5,
-    embedding_model: Any = None
+    embedding_model: Any = None,
+    embedding_config: Optional[EmbeddingConfig] = None
 ) -> Dict[str, List[SearchResult]]:
     """
-    TODO: Search for multiple queries efficiently.
+    Search for multiple queries efficiently.
     
-    Requirements:
-    - Batch embed all queries
-    - Perform parallel searches
-    - Return results mapped by query
+    All distinct queries are embedded with embed_query, as in
+    similarity_search, and cached queries are not re-embedded. Uncached
+    queries are embedded concurrently under embedding_config's concurrency
+    limit and rate-limit backoff, as in create_embeddings. On a flat
+    index they are then scored together with a matrix-matrix product
+    (chunked to bound peak memory) and a row-wise argpartition top-k,
+    instead of one matrix-vector product per query.
     
     Args:
         store: Vector store to search
         queries: List of search queries
         k: Results per query
         embedding_model: Model to embed queries
+        embedding_config: Concurrency and retry settings for embedding queries
         
     Returns:
         Dictionary mapping query -> results
     """
-    pass
+    unique = list(dict.fromkeys(queries))
+    if not unique:
+        return {}
+    query_vectors = _embed_queries(store, unique, embedding_model, embedding_config)
+    return dict(zip(unique, store.batch_search(query_vectors, k)))
 
 
 def update_document(
@@ -365,12 +2964,13 @@ def update_document(
     embedding_model: Any = None
 ) -> bool:
     """
-    TODO: Update an existing document in the store.
+    Update an existing document in the store.
     
-    Requirements:
-    - Update content and/or metadata
-    - Re-embed if content changed
-    - Preserve document ID
+    The old version is tombstoned and the new one appended to the store's
+    delta segment under the same id, so the main index is never rebuilt and
+    searches never see both versions. The stored vector is reused unless
+    the content changed. ``new_metadata`` is merged into the existing
+    metadata.
     
     Args:
         store: Vector store
@@ -380,9 +2980,32 @@ def update_document(
         embedding_model: Model to embed updated content
         
     Returns:
-        True if update successful
+        True if update successful, False if ``doc_id`` is not in the store
     """
-    pass
+    doc_id = str(doc_id)
+    if isinstance(store, ShardedVectorStore):
+        shard = store.shards[store.shard_of(doc_id)]
+        return update_document(
+            shard, doc_id, new_content, new_metadata, embedding_model or store.embedding_model
+        )
+    with store.lock:
+        row = store._rows.get(doc_id)
+        if row is None:
+            return False
+        old = store.documents[row]
+        content = old.page_content if new_content is None else new_content
+        metadata = {**old.metadata, **(new_metadata or {})}
+        if content == old.page_content:
+            vector = store.vectors_for([row])
+        else:
+            model = embedding_model or store.embedding_model
+            if model is None:
+                raise ValueError("An embedding model is required to re-embed changed content")
+            vector = create_embeddings([content], model)
+        store.delete_rows([row])
+        store.add([Document(page_content=content, metadata=metadata)], vector, [doc_id],
+                  to_delta=True)
+    return True
 
 
 def delete_documents(
@@ -391,11 +3014,11 @@ def delete_documents(
     filter_dict: Optional[Dict[str, Any]] = None
 ) -> int:
     """
-    TODO: Delete documents from the store.
+    Delete documents from the store.
     
-    Requirements:
-    - Delete by IDs and/or filter
-    - Return count of deleted documents
+    Deletion is tombstone-based: rows are masked out of every search but
+    the index is not rebuilt. When both ``doc_ids`` and ``filter_dict`` are
+    given, documents matching either are deleted; with neither, nothing is.
     
     Args:
         store: Vector store
@@ -405,17 +3028,193 @@ def delete_documents(
     Returns:
         Number of documents deleted
     """
-    pass
+    if isinstance(store, ShardedVectorStore):
+        return sum(delete_documents(shard, doc_ids, filter_dict) for shard in store.shards)
+    with store.lock:
+        rows = {store._rows[str(doc_id)] for doc_id in doc_ids or [] if str(doc_id) in store._rows}
+        if filter_dict:
+            rows.update(np.flatnonzero(store.filter_mask(filter_dict)).tolist())
+        return store.delete_rows(sorted(rows))
+
+
+def compact_store(store: Any, wait: bool = True) -> Dict[str, int]:
+    """
+    Merge the delta segment into the main index and drop deleted rows.
+    
+    add_documents, update_document and delete_documents trigger this
+    automatically once ``compaction_threshold`` or ``delta_max_rows`` is
+    crossed; call it directly to compact at a convenient time, e.g. before
+    persist_store.
+    
+    Args:
+        store: Vector store to compact
+        wait: Run synchronously (True) or on a background thread (False)
+        
+    Returns:
+        Dictionary with the number of removed and remaining rows
+        (empty when running in the background)
+    """
+    if isinstance(store, ShardedVectorStore):
+        reports = [compact_store(shard, wait) for shard in store.shards]
+        return {key: sum(report[key] for report in reports) for key in reports[0]}
+    if not wait:
+        with store.lock:
+            if store._compaction_thread is None or not store._compaction_thread.is_alive():
+                store._compaction_thread = threading.Thread(
+                    target=store.compact, name="vector-store-compaction", daemon=True
+                )
+                store._compaction_thread.start()
+        return {}
+    # compact() queues behind any compaction already running, background or not.
+    return store.compact()
+
+
+def retrain_index(store: Any, nlist: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Retrain a trainable (IVF) index on everything currently in the store.
+    
+    Centroids trained on an early, small corpus drift away from the data as
+    add_documents grows the store; retraining rebalances the posting lists.
+    
+    Args:
+        store: Vector store whose index should be retrained
+        nlist: Optional new number of posting lists
+        
+    Returns:
+        Dictionary describing the retrained index (for a sharded store,
+        one such dictionary per shard under "shards")
+        
+    Example:
+        >>> retrain_index(store, nlist=1024)
+        {"nlist": 1024, "trained_size": 500000, "min_list_size": 310, ...}
+    """
+    if isinstance(store, ShardedVectorStore):
+        return {"shards": [retrain_index(shard, nlist) for shard in store.shards]}
+    if not hasattr(store.index, "train"):
+        raise ValueError(f"Index type '{store.config.index_type}' does not need training")
+    with store.lock:
+        store.index.train(nlist)
+        store.version += 1
+    sizes = store.index._list_sizes
+    return {
+        "nlist": len(sizes),
+        "trained_size": store.index.trained_size,
+        "min_list_size": int(sizes.min()),
+        "max_list_size": int(sizes.max()),
+        "mean_list_size": float(sizes.mean()),
+    }
+
+
+def evaluate_index_recall(
+    store: Any,
+    queries: List[Any],
+    k: int = 10,
+    embedding_model: Any = None,
+    reference_vectors: Any = None
+) -> Dict[str, Any]:
+    """
+    Measure recall@k of the store's index against exact float32 search.
+    
+    Approximate indexes (HNSW, IVF) and quantized storage trade accuracy
+    for speed and memory; this reports how many of the true top-k
+    neighbours a search actually returns. The truth is a brute-force scan
+    of the float32 vectors: the index's originals when it keeps them
+    (no quantization, or ``rerank_factor`` > 0), else ``reference_vectors``.
+    Without either, a quantized index is scored against its own decoded
+    codes, which measures only the index structure, not the quantization
+    error; ``ground_truth`` in the report says which was used. Only the
+    main index is evaluated; the delta segment is always searched exactly.
+    
+    Args:
+        store: Vector store to evaluate
+        queries: Query texts (or query embeddings)
+        k: Number of neighbours to compare
+        embedding_model: Model to embed text queries
+        reference_vectors: Optional float32 vectors of the main index rows,
+            in row order (e.g. the embeddings that were added); not
+            supported for sharded stores
+        
+    Returns:
+        Dictionary with mean recall@k, the per-query recalls and the
+        ground truth used ("float32", "reference" or "decoded")
+        
+    Example:
+        >>> report = evaluate_index_recall(store, ["refund", "shipping"], k=10)
+        >>> report["recall_at_k"]
+        0.98
+    """
+    if isinstance(store, ShardedVectorStore):
+        if reference_vectors is not None:
+            raise ValueError("reference_vectors is not supported for a sharded store")
+        # Each shard's index is evaluated on its own slice of the collection.
+        vectors = [_embed_query(store, query, embedding_model) for query in queries]
+        reports = [evaluate_index_recall(shard, vectors, k) for shard in store.shards]
+        recalls = [recall for report in reports for recall in report["per_query"]]
+        return {
+            "index_type": store.config.index_type,
+            "k": k,
+            "num_queries": len(recalls),
+            "recall_at_k": float(np.mean(recalls)) if recalls else 1.0,
+            "per_query": recalls,
+            "ground_truth": reports[0]["ground_truth"],
+        }
+    vectors = [_embed_query(store, query, embedding_model) for query in queries]
+    recalls = []
+    with store.lock:
+        index = store.index
+        mask = store.live_mask()
+        if mask is not None:
+            mask = mask[:len(index)]
+        if reference_vectors is not None:
+            reference = _as_matrix(reference_vectors, store.config.embedding_dimension)
+            if reference.shape[0] != len(index):
+                raise ValueError(
+                    f"Got {reference.shape[0]} reference vectors for {len(index)} index rows"
+                )
+            norms = np.linalg.norm(reference, axis=1)
+            ground_truth = "reference"
+        else:
+            # The originals when kept; otherwise the codes decoded once.
+            reference, norms = index.vectors, index.norms
+            ground_truth = "float32" if index._vectors is not None else "decoded"
+        metric = store.config.distance_metric
+        for vector in vectors:
+            scores = _similarity_from_dots(
+                reference @ vector, norms, float(np.linalg.norm(vector)), metric
+            )
+            if mask is not None:
+                scores = np.where(mask, scores, -np.inf)
+            exact_rows = _top_k(scores, k)
+            exact_rows = exact_rows[np.isfinite(scores[exact_rows])]
+            if not len(exact_rows):
+                continue
+            approx_rows, _ = index.search(vector, k, mask)
+            recalls.append(
+                len(set(exact_rows.tolist()) & set(approx_rows.tolist())) / len(exact_rows)
+            )
+    return {
+        "index_type": store.config.index_type,
+        "k": k,
+        "num_queries": len(recalls),
+        "recall_at_k": float(np.mean(recalls)) if recalls else 1.0,
+        "per_query": recalls,
+        "ground_truth": ground_truth,
+    }
 
 
 def get_store_statistics(store: Any) -> Dict[str, Any]:
     """
-    TODO: Get statistics about the vector store.
+    Get statistics about the vector store.
     
-    Requirements:
-    - Count total documents
-    - Get index size/memory usage
-    - Report configuration
+    Reports what is needed to size nodes and schedule compaction:
+    - memory_bytes: allocated bytes per component (vectors, codes, norms,
+      graph / posting lists, documents, metadata index, tombstones) and the
+      total. Memory-mapped arrays count their mapped size.
+    - index: index type and parameters (per shard for a sharded store)
+    - tombstone_ratio: deleted rows still occupying space until compaction
+    - latency_ms: count, mean and rolling p50/p95/p99 of the last
+      ``latency_window`` add, search and batch_search calls
+    - query_cache: query-embedding cache counters
     
     Args:
         store: Vector store to analyze
@@ -425,10 +3224,44 @@ def get_store_statistics(store: Any) -> Dict[str, Any]:
         
     Example:
         >>> stats = get_store_statistics(store)
-        >>> print(stats)
-        {"document_count": 1000, "index_size_mb": 50, "dimension": 1536}
+        >>> stats["memory_bytes"]["total"], stats["tombstone_ratio"]
+        (52428800, 0.12)
+        >>> stats["latency_ms"]["search"]["p99_ms"]
+        4.7
     """
-    pass
+    shards = store.shards if isinstance(store, ShardedVectorStore) else [store]
+    rows = sum(len(shard.documents) for shard in shards)
+    deleted = sum(shard.deleted_count for shard in shards)
+    memory = store.memory_usage()
+    memory["total"] = sum(memory.values())
+    if isinstance(store, ShardedVectorStore):
+        index = {"type": store.config.index_type, "num_shards": len(shards),
+                 "shards": [shard.index.describe() for shard in shards]}
+    else:
+        index = store.index.describe()
+    return {
+        "document_count": len(store),
+        "row_count": rows,
+        "deleted_count": deleted,
+        "tombstone_ratio": deleted / rows if rows else 0.0,
+        "delta_rows": sum(len(shard.delta) for shard in shards),
+        "dimension": store.config.embedding_dimension,
+        "distance_metric": store.config.distance_metric,
+        "index_type": store.config.index_type,
+        "quantization": store.config.quantization,
+        "index": index,
+        "memory_bytes": memory,
+        "memory_mb": memory["total"] / 2 ** 20,
+        "compaction": {
+            "threshold": store.config.compaction_threshold,
+            "running": any(
+                shard._compaction_thread is not None and shard._compaction_thread.is_alive()
+                for shard in shards
+            ),
+        },
+        "latency_ms": {name: window.summary() for name, window in store.latencies.items()},
+        "query_cache": None if store.query_cache is None else store.query_cache.statistics(),
+    }
 
 
 def persist_store(
@@ -436,12 +3269,22 @@ def persist_store(
     path: str
 ) -> bool:
     """
-    TODO: Persist vector store to disk.
+    Persist vector store to disk in a versioned, memory-mappable layout.
     
-    Requirements:
-    - Save index and metadata
-    - Support incremental updates
-    - Handle large stores efficiently
+    The directory holds:
+    - manifest.json: format version, config and dtype/shape of every array
+    - vectors.bin (raw float32 matrix) and/or codes.bin (PQ codes), plus
+      norms, tombstones and index structures as raw binary arrays
+    - documents.jsonl + documents.offsets.bin: one JSON record per row
+    - ids.json: the row -> document id map
+    - delta.*.bin: the delta segment's arrays, if it holds rows
+    
+    A sharded store writes one such directory per shard (shard-00000, ...)
+    next to a top-level manifest.json listing them.
+    
+    Files are written to a temporary sibling directory which then replaces
+    ``path``, so readers never see a half-written store. The embedding
+    model is not persisted.
     
     Args:
         store: Vector store to persist
@@ -450,7 +3293,108 @@ def persist_store(
     Returns:
         True if persistence successful
     """
-    pass
+    path = os.path.abspath(path)
+    staging = f"{path}.tmp-{uuid.uuid4().hex}"
+    os.makedirs(staging)
+    try:
+        if isinstance(store, ShardedVectorStore):
+            generation = uuid.uuid4().hex
+            versions = tuple(
+                _write_store(shard, os.path.join(staging, _shard_directory(i)))
+                for i, shard in enumerate(store.shards)
+            )
+            manifest = {
+                "format": STORE_FORMAT,
+                "version": STORE_FORMAT_VERSION,
+                "store_type": store.store_type,
+                "config": asdict(store.config),
+                "generation": generation,
+                "shards": [_shard_directory(i) for i in range(len(store.shards))],
+            }
+            with open(os.path.join(staging, "manifest.json"), "w", encoding="utf-8") as handle:
+                json.dump(manifest, handle, indent=2)
+        else:
+            _write_store(store, staging)
+        if os.path.exists(path):
+            retired = f"{path}.old-{uuid.uuid4().hex}"
+            os.rename(path, retired)
+            os.rename(staging, path)
+            shutil.rmtree(retired, ignore_errors=True)
+        else:
+            os.rename(staging, path)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    if isinstance(store, ShardedVectorStore):
+        store.mark_persisted(path, generation, versions)
+    return True
+
+
+def _write_store(store: VectorStore, directory: str) -> int:
+    """Write one unsharded store into ``directory``; returns the version written."""
+    os.makedirs(directory, exist_ok=True)
+    with store.lock:
+        index_params, arrays = store.index.state()
+        delta_params, delta_arrays = store.delta.state()
+        arrays.update((f"delta.{name}", array) for name, array in delta_arrays.items())
+        rows = len(store.documents)
+        arrays["deleted"] = store._deleted[:rows]
+        offsets = np.zeros(rows + 1, dtype=np.int64)
+        with open(os.path.join(directory, "documents.jsonl"), "wb") as handle:
+            for row in range(rows):
+                document = None if store._deleted[row] else store.documents[row]
+                record = None if document is None else {
+                    "page_content": document.page_content,
+                    "metadata": document.metadata,
+                }
+                line = json.dumps(record, ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+                handle.write(line)
+                offsets[row + 1] = offsets[row] + len(line)
+        arrays["documents.offsets"] = offsets
+        with open(os.path.join(directory, "ids.json"), "w", encoding="utf-8") as handle:
+            json.dump(list(store.ids), handle)
+        manifest = {
+            "format": STORE_FORMAT,
+            "version": STORE_FORMAT_VERSION,
+            "store_type": store.store_type,
+            "config": asdict(store.config),
+            "rows": rows,
+            "index": index_params,
+            "delta": delta_params,
+            "arrays": {
+                name: _write_array(directory, name, array) for name, array in arrays.items()
+            },
+        }
+        # The manifest is written last: a directory without one is incomplete.
+        with open(os.path.join(directory, "manifest.json"), "w", encoding="utf-8") as handle:
+            json.dump(manifest, handle, indent=2)
+        return store.version
+
+
+def _write_array(directory: str, name: str, array: np.ndarray) -> Dict[str, Any]:
+    """Write an array as raw C-order bytes; returns its manifest entry."""
+    array = np.ascontiguousarray(array)
+    filename = f"{name}.bin"
+    array.tofile(os.path.join(directory, filename))
+    return {"file": filename, "dtype": array.dtype.str, "shape": list(array.shape)}
+
+
+def _open_array(directory: str, spec: Dict[str, Any]) -> np.ndarray:
+    """
+    Memory-map an array written by _write_array.
+    
+    Copy-on-write mode lets worker processes share the page cache while
+    any later in-place update stays private to the process.
+    """
+    path = os.path.join(directory, spec["file"])
+    dtype, shape = np.dtype(spec["dtype"]), tuple(spec["shape"])
+    expected = int(np.prod(shape)) * dtype.itemsize
+    actual = os.path.getsize(path)
+    if actual != expected:
+        raise ValueError(f"{spec['file']} is {actual} bytes, expected {expected}")
+    if expected == 0:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="c", shape=shape)
 
 
 def load_store(
@@ -458,18 +3402,78 @@ def load_store(
     config: Optional[VectorStoreConfig] = None
 ) -> Any:
     """
-    TODO: Load vector store from disk.
+    Load a vector store written by persist_store.
     
-    Requirements:
-    - Load previously persisted store
-    - Validate integrity
-    - Ready for immediate queries
+    Vector, code and index arrays are memory-mapped rather than read, and
+    documents are parsed lazily, so loading time does not grow with the
+    corpus size. File sizes are checked against the manifest.
     
     Args:
         path: Directory path to load from
-        config: Optional configuration override
+        config: Optional configuration override. Layout fields (dimension,
+            metric, index type, quantization) must match the persisted
+            store; query-time fields such as hnsw_ef_search or ivf_nprobe
+            may differ.
         
     Returns:
         Loaded vector store
     """
-    pass
+    with open(os.path.join(path, "manifest.json"), encoding="utf-8") as handle:
+        manifest = json.load(handle)
+    if manifest.get("format") != STORE_FORMAT:
+        raise ValueError(f"{path} does not contain a persisted vector store")
+    if manifest.get("version") != STORE_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported store format version {manifest.get('version')}, "
+            f"expected {STORE_FORMAT_VERSION}"
+        )
+    known = {f.name for f in fields(VectorStoreConfig)}
+    persisted = VectorStoreConfig(**{k: v for k, v in manifest["config"].items() if k in known})
+    if config is None:
+        config = persisted
+    else:
+        for name in ("embedding_dimension", "distance_metric", "index_type", "quantization",
+                     "pq_subvectors", "num_shards"):
+            if getattr(config, name) != getattr(persisted, name):
+                raise ValueError(
+                    f"Config override changes '{name}' from {getattr(persisted, name)!r} "
+                    f"to {getattr(config, name)!r}; rebuild the store instead"
+                )
+    if "shards" in manifest:
+        sharded = ShardedVectorStore(config, store_type=manifest["store_type"])
+        sharded.shards = [
+            load_store(os.path.join(path, directory), ShardedVectorStore.shard_config(config, i))
+            for i, directory in enumerate(manifest["shards"])
+        ]
+        sharded.mark_persisted(
+            os.path.abspath(path), manifest["generation"],
+            tuple(shard.version for shard in sharded.shards),
+        )
+        return sharded
+    arrays = {name: _open_array(path, spec) for name, spec in manifest["arrays"].items()}
+    with open(os.path.join(path, "ids.json"), encoding="utf-8") as handle:
+        ids = json.load(handle)
+    rows = manifest["rows"]
+    delta = manifest.get("delta", {"count": 0})
+    indexed = manifest["index"]["count"] + delta["count"]
+    if len(ids) != rows or len(arrays["deleted"]) != rows or indexed != rows:
+        raise ValueError(f"{path} is inconsistent: manifest, ids and index row counts differ")
+
+    store = VectorStore(config, store_type=manifest["store_type"])
+    store.index.restore(manifest["index"], arrays)
+    if delta["count"]:
+        store.delta.restore(delta, {
+            name[len("delta."):]: array
+            for name, array in arrays.items()
+            if name.startswith("delta.")
+        })
+    # Deleted rows read back as None, but the store only ever reads live rows.
+    store.documents = cast(List[Document], _DocumentTable(
+        os.path.join(path, "documents.jsonl"), arrays["documents.offsets"]
+    ))
+    store.ids = ids
+    store.document_bytes = int(arrays["documents.offsets"][-1])
+    store._deleted = arrays["deleted"]
+    store.deleted_count = int(store._deleted.sum())
+    store._rows = {doc_id: row for row, doc_id in enumerate(ids) if not store._deleted[row]}
+    return store
@@ -2,6 +2,8 @@
 Test fixtures and utilities for pytest
 """
 import os
+import re
+import zlib
 from typing import Generator, Any
 from unittest.mock import Mock, AsyncMock, MagicMock
 
@@ -138,6 +140,51 @@ def mock_agent():
     return agent
 
 
+@pytest.fixture
+def mock_embedding_model():
+    """
+    Create a mock embedding model with deterministic vectors.
+    
+    Each word is hashed into one of 64 dimensions, so texts that share
+    words get similar vectors without any network calls.
+    
+    Returns:
+        Mock with embed_documents() and embed_query() methods
+    """
+    dimension = 64
+    
+    def embed(text):
+        vector = [0.0] * dimension
+        for word in text.lower().split():
+            vector[zlib.crc32(word.encode("utf-8")) % dimension] += 1.0
+        return vector
+    
+    model = Mock()
+    model.model = "mock-embedding"
+    model.dimension = dimension
+    model.embed_documents.side_effect = lambda texts: [embed(text) for text in texts]
+    model.embed_query.side_effect = embed
+    return model
+
+
+@pytest.fixture
+def mock_tokenizer():
+    """
+    Create a mock tokenizer where every whitespace-separated word is a token.
+    
+    Returns:
+        Mock with token_offsets() and count() methods
+    """
+    def token_offsets(text):
+        return [match.start() for match in re.finditer(r"\S+", text)]
+    
+    tokenizer = Mock()
+    tokenizer.name = "mock-tokenizer"
+    tokenizer.token_offsets.side_effect = token_offsets
+    tokenizer.count.side_effect = lambda text: len(token_offsets(text))
+    return tokenizer
+
+
 @pytest.fixture
 def env_setup(monkeypatch):
     """
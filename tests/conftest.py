@@ -12,6 +12,8 @@ from src.utils.test_fixtures import (
     mock_tool,
     mock_tools,
     mock_agent,
+    mock_embedding_model,
+    mock_tokenizer,
     env_setup,
     reset_mocks,
     sample_pydantic_model,
@@ -26,6 +28,8 @@ __all__ = [
     "mock_tool",
     "mock_tools",
     "mock_agent",
+    "mock_embedding_model",
+    "mock_tokenizer",
     "env_setup",
     "reset_mocks",
     "sample_pydantic_model",
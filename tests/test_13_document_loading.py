@@ -5,6 +5,8 @@ Tests for Exercise 13: Document Loading and Processing
 Run with: pytest tests/test_13_document_loading.py -v
 """
 
+import os
+
 import pytest
 from src.exercises.document_loading_13 import (
     Document,
@@ -14,6 +16,8 @@ from src.exercises.document_loading_13 import (
     load_csv_documents,
     load_text_file,
     load_directory,
+    load_directory_stream,
+    DirectoryLoadStats,
     extract_metadata,
     clean_document_text,
     validate_document,
@@ -63,7 +67,23 @@ class TestDocumentLoading:
         4. Verify content columns combined
         5. Verify metadata columns preserved
         """
-        pass
+        path = tmp_path / "products.csv"
+        path.write_text(
+            "name;description;category;price\n"
+            "Widget Pro;A professional-grade widget;tools;29.99\n"
+            "Gadget;;toys;\n"
+        )
+        
+        docs = load_csv_documents(str(path), ["name", "description"], ["category", "price"])
+        
+        assert len(docs) == 2
+        assert docs[0].page_content == "Widget Pro: A professional-grade widget"
+        assert docs[0].metadata == {
+            "source": str(path), "category": "tools", "price": "29.99", "row": 0
+        }
+        assert docs[1].page_content == "Gadget" and docs[1].metadata["price"] == ""
+        with pytest.raises(ValueError):
+            load_csv_documents(str(path), ["title"])
     
     @pytest.mark.unit
     def test_load_text_file(self, tmp_path):
@@ -76,7 +96,15 @@ class TestDocumentLoading:
         3. Verify content matches file
         4. Verify metadata includes file info
         """
-        pass
+        path = tmp_path / "readme.md"
+        path.write_bytes(b"# Title  \r\n\r\n\r\n\r\n    indented code\r\n")
+        
+        doc = load_text_file(str(path))
+        
+        assert doc.page_content == "# Title\n\n    indented code"
+        assert doc.metadata == {
+            "source": str(path), "size_bytes": path.stat().st_size, "encoding": "utf-8"
+        }
     
     @pytest.mark.integration
     def test_load_directory(self, tmp_path):
@@ -89,7 +117,51 @@ class TestDocumentLoading:
         3. Verify all supported files loaded
         4. Verify unsupported files skipped
         """
-        pass
+        (tmp_path / "nested" / "deeper").mkdir(parents=True)
+        (tmp_path / "a.txt").write_text("Alpha")
+        (tmp_path / "nested" / "b.md").write_text("# Beta")
+        (tmp_path / "nested" / "deeper" / "c.csv").write_text("x,y\n1,2\n3,4\n")
+        (tmp_path / "nested" / "image.png").write_bytes(b"\x89PNG")
+        (tmp_path / "page.html").write_text("<html><body><p>Markup</p></body></html>")
+        (tmp_path / "broken.txt").write_bytes(b"\xff\xfe\xfa not utf-8")
+        
+        stats = DirectoryLoadStats()
+        docs = load_directory(str(tmp_path), max_workers=2, stats=stats)
+        
+        assert sorted(d.page_content for d in docs) == ["# Beta", "1: 2", "3: 4", "Alpha"]
+        assert stats.files_found == 6 and stats.files_skipped == 2
+        assert stats.files_loaded == 3 and stats.documents == 4
+        assert [e.path for e in stats.errors] == [str(tmp_path / "broken.txt")]
+        assert stats.errors[0].error.startswith("UnicodeDecodeError")
+        
+        top_level = load_directory(str(tmp_path), "*.txt")
+        assert [d.page_content for d in top_level] == ["Alpha"]
+        markdown = list(load_directory_stream(str(tmp_path), "**/*.md"))
+        assert [d.metadata["source"] for d in markdown] == [str(tmp_path / "nested" / "b.md")]
+    
+    @pytest.mark.integration
+    def test_load_directory_unreadable_subdirectory(self, tmp_path, monkeypatch):
+        """A directory that cannot be scanned is recorded and the walk continues."""
+        (tmp_path / "locked").mkdir()
+        (tmp_path / "locked" / "secret.txt").write_text("Hidden")
+        (tmp_path / "open").mkdir()
+        (tmp_path / "open" / "a.txt").write_text("Alpha")
+        locked = str(tmp_path / "locked")
+        scandir = os.scandir
+        
+        def guarded_scandir(path):
+            if str(path) == locked:
+                raise PermissionError(13, "Permission denied", locked)
+            return scandir(path)
+        
+        monkeypatch.setattr(os, "scandir", guarded_scandir)
+        stats = DirectoryLoadStats()
+        docs = load_directory(str(tmp_path), stats=stats)
+        
+        assert [d.page_content for d in docs] == ["Alpha"]
+        assert stats.files_found == 1 and stats.files_loaded == 1
+        assert [e.path for e in stats.errors] == [locked]
+        assert stats.errors[0].error.startswith("PermissionError")
 
 
 @pytest.mark.intermediate
@@ -5,20 +5,34 @@ Tests for Exercise 14: Text Chunking Strategies
 Run with: pytest tests/test_14_text_chunking.py -v
 """
 
+import tracemalloc
+
 import pytest
 from src.exercises.text_chunking_14 import (
     Document,
+    ChunkView,
     ChunkingConfig,
+    TokenCounter,
+    register_tokenizer,
     chunk_by_character,
     chunk_by_separator,
     recursive_chunk,
+    chunk_by_character_stream,
+    chunk_by_separator_stream,
+    recursive_chunk_stream,
     chunk_by_tokens,
     semantic_chunk,
+    semantic_chunk_documents,
     chunk_with_headers,
+    chunk_incrementally,
     merge_small_chunks,
     add_chunk_context,
     calculate_chunk_statistics,
     create_parent_child_chunks,
+    chunk_documents,
+    evaluate_chunking_strategy,
+    generate_benchmark_corpus,
+    run_chunking_benchmark,
 )
 
 
@@ -38,7 +52,16 @@ class TestChunkingStrategies:
         4. Verify overlap applied
         5. Verify metadata propagated
         """
-        pass
+        text = "".join(chr(ord("a") + i % 26) for i in range(2500))
+        doc = Document(page_content=text, metadata={"source": "test"})
+        
+        chunks = chunk_by_character(doc, chunk_size=1000, chunk_overlap=200)
+        
+        assert len(chunks) == 3
+        assert [len(c.page_content) for c in chunks] == [1000, 1000, 900]
+        assert chunks[0].page_content[-200:] == chunks[1].page_content[:200]
+        assert chunks[0].metadata == {"source": "test", "chunk_index": 0, "total_chunks": 3}
+        assert chunks[2].metadata["chunk_index"] == 2
     
     @pytest.mark.unit
     def test_chunk_by_separator(self):
@@ -51,7 +74,16 @@ class TestChunkingStrategies:
         3. Verify splits at separators
         4. Verify respects size limits
         """
-        pass
+        doc = Document(page_content="Para 1.\n\nPara 2.\n\nPara 3.")
+        chunks = chunk_by_separator(doc, separators=["\n\n"])
+        assert [c.page_content for c in chunks] == ["Para 1.", "Para 2.", "Para 3."]
+        
+        long_paragraph = " ".join(f"Sentence number {i}." for i in range(20))
+        doc = Document(page_content="Short intro.\n\n" + long_paragraph)
+        chunks = chunk_by_separator(doc, chunk_size=100, chunk_overlap=0)
+        assert chunks[0].page_content == "Short intro."
+        assert all(len(c.page_content) <= 100 for c in chunks)
+        assert all(c.page_content.endswith(".") for c in chunks)
     
     @pytest.mark.unit
     def test_recursive_chunk(self):
@@ -64,7 +96,68 @@ class TestChunkingStrategies:
         3. Verify all chunks under size limit
         4. Verify natural breaks preserved
         """
-        pass
+        paragraphs = [
+            "Intro paragraph with a few words.",
+            "A much longer paragraph. " * 10,
+            "x" * 250,
+            "Closing line one.\nClosing line two.",
+        ]
+        doc = Document(page_content="\n\n".join(paragraphs), metadata={"source": "mixed"})
+        config = ChunkingConfig(chunk_size=100, chunk_overlap=20)
+        
+        chunks = recursive_chunk(doc, config)
+        
+        assert all(len(c.page_content) <= 100 for c in chunks)
+        assert chunks[0].page_content == paragraphs[0]
+        assert all(c.metadata["source"] == "mixed" for c in chunks)
+        assert "x" * 100 in [c.page_content for c in chunks]
+        assert chunks[-1].page_content == paragraphs[-1]
+    
+    @pytest.mark.unit
+    def test_recursive_chunk_without_paragraph_breaks(self):
+        """Log-like and separator-free text is packed greedily at the best break."""
+        log = "".join(f"2024-01-01 INFO request {i} handled\n" for i in range(2000))
+        config = ChunkingConfig(chunk_size=200, chunk_overlap=50)
+        
+        chunks = recursive_chunk(Document(page_content=log), config)
+        
+        assert all(len(c.page_content) <= 200 for c in chunks)
+        assert all(c.page_content.endswith("handled") for c in chunks)
+        assert all(log[c.end] == "\n" for c in chunks)
+        
+        blob = "x" * 10000
+        chunks = recursive_chunk(Document(page_content=blob), config)
+        windows = chunk_by_character(Document(page_content=blob), 200, 50)
+        assert [(c.start, c.end) for c in chunks] == [(w.start, w.end) for w in windows]
+    
+    @pytest.mark.unit
+    def test_streaming_chunkers_match_batch(self):
+        """Streaming chunkers yield the same chunks across piece boundaries."""
+        text = "\n\n".join(
+            f"Paragraph {i}. " + "word " * (i * 7 % 40) + "end.\nNext line."
+            for i in range(30)
+        )
+        pieces = [text[i:i + 37] for i in range(0, len(text), 37)]
+        config = ChunkingConfig(chunk_size=120, chunk_overlap=30)
+        doc = Document(page_content=text)
+        
+        def contents(chunks):
+            return [c.page_content for c in chunks]
+        
+        assert contents(recursive_chunk_stream(iter(pieces), config)) == contents(
+            recursive_chunk(doc, config)
+        )
+        dropped = ChunkingConfig(chunk_size=60, chunk_overlap=10, keep_separator=False)
+        assert contents(recursive_chunk_stream(iter(text), dropped)) == contents(
+            recursive_chunk(doc, dropped)
+        )
+        streamed = chunk_by_separator_stream(iter(pieces), chunk_size=120, chunk_overlap=30)
+        assert contents(streamed) == contents(
+            chunk_by_separator(doc, chunk_size=120, chunk_overlap=30)
+        )
+        streamed = list(chunk_by_character_stream(iter(pieces), 100, 25, metadata={"source": "s"}))
+        assert contents(streamed) == contents(chunk_by_character(doc, 100, 25))
+        assert streamed[1].metadata == {"source": "s", "chunk_index": 1}
     
     @pytest.mark.unit
     def test_chunk_by_tokens(self, mock_tokenizer):
@@ -76,7 +169,76 @@ class TestChunkingStrategies:
         2. Chunk with token limits
         3. Verify token count per chunk
         """
-        pass
+        register_tokenizer("mock-words", lambda: mock_tokenizer)
+        doc = Document(page_content=" ".join(f"w{i}" for i in range(95)), metadata={"source": "t"})
+        
+        chunks = chunk_by_tokens(doc, max_tokens=20, overlap_tokens=5, encoding_name="mock-words")
+        
+        assert len(chunks) == 6
+        assert all(mock_tokenizer.count(c.page_content) <= 20 for c in chunks)
+        assert [c.metadata["token_count"] for c in chunks] == [20, 20, 20, 20, 20, 20]
+        assert chunks[1].page_content.startswith("w15 ")
+        assert chunks[-1].page_content.endswith("w94")
+        assert chunks[0].metadata["source"] == "t"
+        assert mock_tokenizer.token_offsets.call_count == 1
+    
+    @pytest.mark.unit
+    def test_recursive_chunk_with_token_counter(self, mock_tokenizer):
+        """A TokenCounter length function tokenizes the document once."""
+        register_tokenizer("mock-words", lambda: mock_tokenizer)
+        text = "\n\n".join(" ".join(f"p{p}w{i}" for i in range(12 + p * 5)) for p in range(8))
+        config = ChunkingConfig(
+            chunk_size=30, chunk_overlap=5, length_function=TokenCounter("mock-words")
+        )
+        
+        chunks = recursive_chunk(Document(page_content=text), config)
+        
+        assert mock_tokenizer.token_offsets.call_count == 1
+        assert mock_tokenizer.count.call_count == 0
+        assert all(mock_tokenizer.count(c.page_content) <= 30 for c in chunks)
+        assert chunks[0].page_content.startswith("p0w0")
+        assert chunks[-1].page_content.endswith("p7w46")
+    
+    @pytest.mark.unit
+    def test_semantic_chunk(self, mock_embedding_model):
+        """Sentences are embedded in one call and split where similarity drops."""
+        cats = "Cats purr softly. Cats chase mice. Cats sleep often."
+        engines = "Engines burn fuel. Engines need oil. Engines run hot."
+        doc = Document(page_content=f"{cats} {engines}", metadata={"source": "topics"})
+        
+        chunks = semantic_chunk(doc, mock_embedding_model, similarity_threshold=0.2, buffer_size=0)
+        
+        assert [c.page_content for c in chunks] == [cats, engines]
+        assert chunks[0].metadata["source"] == "topics"
+        assert mock_embedding_model.embed_documents.call_count == 1
+        
+        small = semantic_chunk(
+            doc, mock_embedding_model, similarity_threshold=0.2, buffer_size=0, max_chunk_size=40
+        )
+        assert all(len(c.page_content) <= 40 for c in small)
+        with pytest.raises(ValueError):
+            semantic_chunk(doc)
+    
+    @pytest.mark.unit
+    def test_semantic_chunk_documents_batches_across_documents(self, mock_embedding_model):
+        """Cross-document mode pools embedding calls but chunks like semantic_chunk."""
+        docs = [
+            Document(
+                page_content=f"Topic {i} starts here. Topic {i} continues. Other words entirely."
+            )
+            for i in range(10)
+        ]
+        
+        chunks = semantic_chunk_documents(
+            docs, mock_embedding_model, similarity_threshold=0.3, batch_size=12
+        )
+        
+        assert mock_embedding_model.embed_documents.call_count == 3
+        expected = [
+            c for d in docs
+            for c in semantic_chunk(d, mock_embedding_model, similarity_threshold=0.3)
+        ]
+        assert chunks == expected
     
     @pytest.mark.unit
     def test_chunk_with_headers(self):
@@ -88,7 +250,79 @@ class TestChunkingStrategies:
         2. Chunk preserving headers
         3. Verify headers in metadata
         """
-        pass
+        doc = Document(page_content="# Main\n## Sub\nContent here")
+        assert chunk_with_headers(doc)[0].metadata["headers"] == ["Main", "Sub"]
+        
+        markdown = (
+            "Preface.\n# Guide\nOverview.\n## Install\n" + "step " * 60
+            + "\n## Usage\nRun it.\n# Appendix\nNotes."
+        )
+        doc = Document(page_content=markdown, metadata={"source": "guide.md"})
+        chunks = chunk_with_headers(doc, config=ChunkingConfig(chunk_size=100, chunk_overlap=10))
+        
+        headers = [c.metadata["headers"] for c in chunks]
+        assert headers[0] == [] and chunks[0].page_content == "Preface."
+        assert headers[1] == ["Guide"]
+        assert headers.count(["Guide", "Install"]) == 4
+        assert ["Guide", "Usage"] in headers
+        assert headers[-1] == ["Appendix"] and chunks[-1].page_content == "Notes."
+        assert all(len(c.page_content) <= 100 for c in chunks)
+        assert all(c.metadata["source"] == "guide.md" for c in chunks)
+    
+    @pytest.mark.unit
+    def test_chunk_incrementally(self):
+        """Only sections whose content changed are re-chunked and re-emitted."""
+        sections = [f"# Part {i}\n" + f"Body of part {i}. " * 20 for i in range(5)]
+        config = ChunkingConfig(chunk_size=100, chunk_overlap=10)
+        doc = Document(page_content="\n".join(sections), metadata={"source": "book.md"})
+        
+        first = chunk_incrementally(doc, config=config)
+        
+        expected = chunk_with_headers(doc, config=config)
+        assert [c.page_content for c in first.added] == [c.page_content for c in expected]
+        assert first.removed == [] and first.unchanged == []
+        assert all(c.metadata["source"] == "book.md" for c in first.added)
+        
+        sections[2] = sections[2].replace("Body", "Revised body")
+        edited = Document(page_content="\n".join(sections), metadata={"source": "book.md"})
+        second = chunk_incrementally(edited, previous=first.sections, config=config)
+        
+        assert {c.metadata["headers"][0] for c in second.added} == {"Part 2"}
+        old_ids = [
+            c.metadata["chunk_id"] for c in first.added if c.metadata["headers"] == ["Part 2"]
+        ]
+        assert second.removed == old_ids
+        assert len(second.unchanged) == len(first.added) - len(old_ids)
+        
+        third = chunk_incrementally(edited, previous=second.sections, config=config)
+        assert third.added == [] and third.removed == []
+
+
+    @pytest.mark.integration
+    def test_chunk_documents_in_parallel(self):
+        """Parallel chunking preserves input order and document metadata."""
+        docs = [
+            Document(
+                page_content=f"# Doc {i}\n" + f"Sentence {i} repeated. " * (i % 9 + 1) * 20,
+                metadata={"doc": i},
+            )
+            for i in range(40)
+        ]
+        config = ChunkingConfig(chunk_size=200, chunk_overlap=20)
+        
+        for strategy in (recursive_chunk, chunk_with_headers):
+            expected = [c for d in docs for c in strategy(d, config=config)]
+            assert list(chunk_documents(docs, strategy, config, max_workers=2)) == expected
+            assert list(chunk_documents(iter(docs), strategy, config, max_workers=1)) == expected
+        
+        tokens = ChunkingConfig(
+            chunk_size=50, chunk_overlap=5, length_function=TokenCounter("approximate")
+        )
+        chunks = list(chunk_documents(docs, chunk_by_tokens, tokens, max_workers=2))
+        assert [c.metadata["doc"] for c in chunks] == sorted(c.metadata["doc"] for c in chunks)
+        assert chunks == [
+            c for d in docs for c in chunk_by_tokens(d, 50, 5, encoding_name="approximate")
+        ]
 
 
 @pytest.mark.intermediate
@@ -106,7 +340,55 @@ class TestChunkPostProcessing:
         3. Verify no chunks below minimum
         4. Verify no chunks above maximum
         """
-        pass
+        paragraphs = ["Short one.", "Tiny.", "A" * 150, "Small again.", "B" * 300, "End."]
+        text = "\n\n".join(paragraphs)
+        chunks, start = [], 0
+        for index, paragraph in enumerate(paragraphs):
+            metadata = {"source": "doc", "chunk_index": index, "total_chunks": len(paragraphs)}
+            end = min(start + len(paragraph) + 2, len(text))
+            chunks.append(ChunkView(text, start, end, metadata))
+            start = end
+        
+        merged = merge_small_chunks(chunks, min_chunk_size=50, max_chunk_size=320)
+        
+        assert all(len(c.page_content) <= 320 for c in merged)
+        assert all(len(c.page_content) >= 50 for c in merged)
+        assert [c.page_content for c in merged] == [
+            "Short one.\n\nTiny.\n\n" + "A" * 150 + "\n\nSmall again.\n\n",
+            "B" * 300 + "\n\nEnd.",
+        ]
+        assert all(isinstance(c, ChunkView) and c.source is text for c in merged)
+        assert [c.metadata["chunk_index"] for c in merged] == list(range(len(merged)))
+        assert all(c.metadata["total_chunks"] == len(merged) for c in merged)
+        
+        gapped = [ChunkView(c.source, c.start, c.start + len(p), c.metadata)
+                  for c, p in zip(chunks, paragraphs)]
+        assert [c.page_content for c in merge_small_chunks(gapped, 50, 320)] == [
+            "Short one. Tiny. " + "A" * 150 + " Small again.",
+            "B" * 300 + " End.",
+        ]
+        
+        documents = [Document(page_content=t, metadata={"source": "a"}) for t in ("one", "two")]
+        assert merge_small_chunks(documents, min_chunk_size=10)[0].page_content == "one two"
+        mixed = [Document(page_content="one", metadata={"source": "a"}),
+                 Document(page_content="two", metadata={"source": "b"})]
+        assert len(merge_small_chunks(mixed, min_chunk_size=10)) == 2
+    
+    @pytest.mark.unit
+    def test_merge_small_chunks_between_sections(self):
+        """Merging sections under a header leaves out the header line between them."""
+        doc = Document(
+            page_content="# Guide\n\n## Setup\n\nInstall it.\n\n## Usage\n\nRun it.",
+            metadata={"source": "guide.md"},
+        )
+        chunks = chunk_with_headers(doc)
+        
+        merged = merge_small_chunks(chunks, min_chunk_size=50)
+        
+        assert [c.page_content for c in chunks] == ["Install it.", "Run it."]
+        assert [c.page_content for c in merged] == ["Install it. Run it."]
+        assert merged[0].metadata["headers"] == ["Guide", "Setup"]
+        assert merged[0].metadata["total_chunks"] == 1
     
     @pytest.mark.unit
     def test_add_chunk_context(self):
@@ -118,7 +400,22 @@ class TestChunkPostProcessing:
         2. Add context from neighbors
         3. Verify prev/next context in metadata
         """
-        pass
+        text = "".join(f"<{i:03d}>" for i in range(100))
+        chunks = chunk_by_character(Document(page_content=text), chunk_size=100, chunk_overlap=20)
+        
+        enhanced = add_chunk_context(chunks, context_size=1, max_context_chars=30)
+        
+        assert "prev_context" not in enhanced[0].metadata
+        assert "next_context" not in enhanced[-1].metadata
+        middle = enhanced[1]
+        assert middle.metadata["prev_context"] == text[middle.start - 30:middle.start]
+        assert middle.metadata["next_context"] == text[middle.end:middle.end + 30]
+        assert "prev_context" not in chunks[1].metadata
+        
+        plain = [Document(page_content="first chunk"), Document(page_content="second chunk")]
+        enhanced = add_chunk_context(plain)
+        assert enhanced[0].metadata["next_context"] == "second chunk"
+        assert enhanced[1].metadata["prev_context"] == "first chunk"
     
     @pytest.mark.unit
     def test_calculate_chunk_statistics(self):
@@ -130,7 +427,65 @@ class TestChunkPostProcessing:
         2. Calculate statistics
         3. Verify count, avg, min, max correct
         """
-        pass
+        chunks = [Document(page_content="a" * size) for size in (10, 20, 30, 40)]
+        
+        stats = calculate_chunk_statistics(chunks)
+        
+        assert stats["count"] == 4
+        assert stats["total_chars"] == 100
+        assert stats["avg_size"] == 25
+        assert stats["min_size"] == 10
+        assert stats["max_size"] == 40
+        assert stats["percentiles"]["p10"] <= stats["median_size"] <= stats["percentiles"]["p90"]
+        
+        doc = Document(page_content="word " * 200, metadata={"source": "s"})
+        views = chunk_by_character(doc, chunk_size=100, chunk_overlap=20)
+        assert calculate_chunk_statistics(views)["avg_overlap"] == 20
+        assert calculate_chunk_statistics([])["count"] == 0
+    
+    @pytest.mark.integration
+    def test_chunking_benchmark(self):
+        """Benchmarks report throughput, memory and size distribution per corpus."""
+        corpus = generate_benchmark_corpus("markdown", size_chars=5000, seed=3)
+        assert len(corpus.page_content) == 5000
+        assert corpus == generate_benchmark_corpus("markdown", size_chars=5000, seed=3)
+        
+        results = run_chunking_benchmark(kinds=["prose", "logs"], size_chars=5000, repeat=1)
+        
+        assert set(results) == {"prose", "logs"}
+        for by_strategy in results.values():
+            assert "recursive_chunk" in by_strategy and "chunk_with_headers" in by_strategy
+            for result in by_strategy.values():
+                assert result["chars_per_sec"] > 0
+                assert result["peak_memory_bytes"] > 0
+                assert result["count"] > 0 and "p90" in result["percentiles"]
+        
+        failing = evaluate_chunking_strategy(corpus, [semantic_chunk])
+        assert "error" in failing["semantic_chunk"]
+    
+    @pytest.mark.unit
+    def test_benchmark_leaves_tracemalloc_state(self):
+        """A strategy failing under tracemalloc does not leave tracing switched on."""
+        corpus = generate_benchmark_corpus("prose", size_chars=2000, seed=1)
+        calls = []
+        
+        def fails_when_traced(document):
+            calls.append(document)
+            if tracemalloc.is_tracing() and len(calls) > 1:
+                raise MemoryError("traced run")
+            return recursive_chunk(document)
+        
+        failing = evaluate_chunking_strategy(corpus, [fails_when_traced])
+        assert "error" in failing["fails_when_traced"]
+        assert not tracemalloc.is_tracing()
+        
+        tracemalloc.start()
+        try:
+            result = evaluate_chunking_strategy(corpus, [recursive_chunk])["recursive_chunk"]
+            assert result["peak_memory_bytes"] > 0
+            assert tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
     
     @pytest.mark.unit
     def test_create_parent_child_chunks(self):
@@ -143,4 +498,37 @@ class TestChunkPostProcessing:
         3. Verify children reference parents
         4. Verify size relationships
         """
-        pass
+        text = " ".join(f"Sentence {i} about topic {i % 7}." for i in range(400))
+        doc = Document(page_content=text, metadata={"source": "doc"})
+        
+        parents, children = create_parent_child_chunks(
+            doc, parent_chunk_size=1000, child_chunk_size=250
+        )
+        
+        assert len(children) > len(parents) > 1
+        assert children[0].metadata["parent_index"] == 0
+        assert all(len(p.page_content) <= 1000 for p in parents)
+        assert all(len(c.page_content) <= 250 for c in children)
+        for child in children:
+            parent = parents[child.metadata["parent_index"]]
+            assert child.page_content in parent.page_content
+            assert child.metadata["source"] == "doc"
+        for index, parent in enumerate(parents):
+            linked = children[parent.metadata["child_start"]:parent.metadata["child_end"]]
+            assert linked and all(c.metadata["parent_index"] == index for c in linked)
+        assert parents[-1].metadata["child_end"] == len(children)
+    
+    @pytest.mark.unit
+    def test_chunk_views_share_source(self):
+        """Chunks are offsets into the document text, materialized on access."""
+        text = "word " * 500
+        doc = Document(page_content=text, metadata={"source": "s"})
+        
+        chunks = recursive_chunk(doc, ChunkingConfig(chunk_size=100, chunk_overlap=20))
+        
+        assert all(isinstance(c, ChunkView) and c.source is text for c in chunks)
+        assert all(c.page_content == text[c.start:c.end] for c in chunks)
+        copy = Document(page_content=chunks[0].page_content, metadata=chunks[0].metadata)
+        assert chunks[0] == copy
+        standalone = chunks[0].materialize()
+        assert type(standalone) is Document and standalone == chunks[0]
@@ -5,27 +5,99 @@ Tests for Exercise 15: Embeddings and Vector Stores
 Run with: pytest tests/test_15_embeddings.py -v
 """
 
+import threading
+import time
+from unittest.mock import Mock
+
+import numpy as np
 import pytest
 from src.exercises.embeddings_vectorstores_15 import (
     Document,
     SearchResult,
     VectorStoreConfig,
+    EmbeddingConfig,
     create_embedding_model,
     create_embeddings,
     calculate_similarity,
     create_vector_store,
     add_documents,
+    add_documents_stream,
+    aadd_documents_stream,
     similarity_search,
     search_with_filters,
     search_with_score_threshold,
     mmr_search,
     batch_search,
+    update_document,
+    delete_documents,
+    compact_store,
+    evaluate_index_recall,
+    retrain_index,
     get_store_statistics,
     persist_store,
     load_store,
 )
 
 
+SAMPLE_TEXTS = [
+    "refund policy allows returns within 30 days",
+    "shipping takes three to five business days",
+    "our support team answers email within one day",
+    "returns require the original receipt",
+    "international shipping costs extra",
+    "premium members get free shipping",
+]
+
+
+@pytest.fixture
+def populated_store(mock_embedding_model):
+    """Vector store holding SAMPLE_TEXTS with alternating categories."""
+    store = create_vector_store(VectorStoreConfig(embedding_dimension=64))
+    docs = [
+        Document(page_content=text, metadata={"id": f"doc{i}", "category": "ab"[i % 2]})
+        for i, text in enumerate(SAMPLE_TEXTS)
+    ]
+    add_documents(store, docs, mock_embedding_model)
+    return store
+
+
+@pytest.fixture
+def asymmetric_model():
+    """
+    Model whose query and document spaces disagree: any text embedded as a
+    document lies near "docA", any text embedded as a query near "docB".
+    """
+    document_vectors = {"docA": [1.0, 0.0], "docB": [0.0, 1.0]}
+    model = Mock()
+    model.model = "asymmetric"
+    model.embed_documents.side_effect = lambda texts: [
+        document_vectors.get(text, [1.0, 0.1]) for text in texts
+    ]
+    model.embed_query.side_effect = lambda text: [0.1, 1.0]
+    return model
+
+
+def asymmetric_store(model):
+    store = create_vector_store(VectorStoreConfig(embedding_dimension=2))
+    add_documents(store, [Document(page_content="docA"), Document(page_content="docB")], model)
+    return store
+
+
+def random_store(index_type="flat", n=400, dim=16, seed=0, **config):
+    """Store of n random vectors whose page_content is the row number."""
+    rng = np.random.default_rng(seed)
+    store = create_vector_store(
+        VectorStoreConfig(embedding_dimension=dim, index_type=index_type, **config)
+    )
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    docs = [
+        Document(page_content=str(i), metadata={"id": f"doc{i}", "parity": i % 2})
+        for i in range(n)
+    ]
+    store.add(docs, vectors)
+    return store, rng.standard_normal((20, dim)).astype(np.float32)
+
+
 @pytest.mark.intermediate
 class TestEmbeddings:
     """Test embedding functions."""
@@ -33,7 +105,7 @@ class TestEmbeddings:
     @pytest.mark.unit
     def test_create_embeddings(self, mock_embedding_model):
         """
-        TODO: Test embedding creation.
+        Test embedding creation.
         
         Steps:
         1. Create embedding model
@@ -41,31 +113,87 @@ class TestEmbeddings:
         3. Verify vector dimensions
         4. Verify batch handling
         """
-        pass
+        embeddings = create_embeddings(["Hello", "World"], mock_embedding_model)
+        assert len(embeddings) == 2
+        assert all(len(vector) == 64 for vector in embeddings)
+        assert create_embeddings([], mock_embedding_model) == []
+    
+    @pytest.mark.unit
+    def test_create_embeddings_batches_and_caches(self, tmp_path, mock_embedding_model):
+        """Token-budgeted batches, deduplication and a persistent cache."""
+        texts = [f"text number {i}" for i in range(10)] + ["text number 0"]
+        config = EmbeddingConfig(
+            max_batch_tokens=12, max_concurrency=3, cache_path=str(tmp_path / "cache.db")
+        )
+        first = create_embeddings(texts, mock_embedding_model, config)
+        assert first == mock_embedding_model.embed_documents.side_effect(texts)
+        batch_sizes = [len(c.args[0]) for c in mock_embedding_model.embed_documents.call_args_list]
+        assert sum(batch_sizes) == 10
+        assert max(batch_sizes) == 3
+        
+        mock_embedding_model.embed_documents.reset_mock()
+        assert create_embeddings(texts, mock_embedding_model, config) == first
+        mock_embedding_model.embed_documents.assert_not_called()
+    
+    @pytest.mark.unit
+    def test_create_embeddings_retries_rate_limits(self, mock_embedding_model):
+        """Rate-limit errors are retried with backoff; other errors propagate."""
+        class RateLimitError(Exception):
+            status_code = 429
+        
+        embed = mock_embedding_model.embed_documents.side_effect
+        failures = [RateLimitError("slow down"), RateLimitError("slow down")]
+        
+        def flaky(texts):
+            if failures:
+                raise failures.pop()
+            return embed(texts)
+        
+        mock_embedding_model.embed_documents.side_effect = flaky
+        config = EmbeddingConfig(initial_backoff=0.001, max_backoff=0.01)
+        assert len(create_embeddings(["a", "b"], mock_embedding_model, config)) == 2
+        assert mock_embedding_model.embed_documents.call_count == 3
+        
+        mock_embedding_model.embed_documents.side_effect = KeyError("boom")
+        with pytest.raises(KeyError):
+            create_embeddings(["a"], mock_embedding_model, config)
+        
+        mock_embedding_model.embed_documents.reset_mock()
+        mock_embedding_model.embed_documents.side_effect = RuntimeError("request 14290 failed")
+        with pytest.raises(RuntimeError):
+            create_embeddings(["a"], mock_embedding_model, config)
+        assert mock_embedding_model.embed_documents.call_count == 1
+        
+        mock_embedding_model.embed_documents.side_effect = lambda texts: embed(texts)[:-1]
+        with pytest.raises(ValueError, match="returned 1 vectors for a batch of 2"):
+            create_embeddings(["a", "b"], mock_embedding_model, config)
     
     @pytest.mark.unit
     def test_calculate_similarity_cosine(self):
         """
-        TODO: Test cosine similarity.
+        Test cosine similarity.
         
         Steps:
         1. Create identical vectors → similarity = 1.0
         2. Create orthogonal vectors → similarity = 0.0
         3. Create opposite vectors → similarity = -1.0
         """
-        pass
+        assert calculate_similarity([1, 0, 0], [1, 0, 0]) == pytest.approx(1.0)
+        assert calculate_similarity([1, 0, 0], [0, 1, 0]) == pytest.approx(0.0)
+        assert calculate_similarity([1, 0, 0], [-1, 0, 0]) == pytest.approx(-1.0)
     
     @pytest.mark.unit
     def test_calculate_similarity_euclidean(self):
         """
-        TODO: Test euclidean distance to similarity.
+        Test euclidean distance to similarity.
         
         Steps:
         1. Create test vectors
         2. Calculate euclidean similarity
         3. Verify correct conversion
         """
-        pass
+        assert calculate_similarity([0, 0], [0, 0], "euclidean") == pytest.approx(1.0)
+        assert calculate_similarity([0, 0], [3, 4], "euclidean") == pytest.approx(1 / 6)
 
 
 @pytest.mark.intermediate
@@ -75,19 +203,23 @@ class TestVectorStore:
     @pytest.mark.unit
     def test_create_vector_store(self):
         """
-        TODO: Test vector store creation.
+        Test vector store creation.
         
         Steps:
         1. Create store with config
         2. Verify initialized correctly
         3. Verify empty initially
         """
-        pass
+        store = create_vector_store(VectorStoreConfig(embedding_dimension=64))
+        assert store.config.embedding_dimension == 64
+        assert len(store) == 0
+        with pytest.raises(ValueError):
+            create_vector_store(store_type="chroma")
     
     @pytest.mark.unit
     def test_add_documents(self, mock_embedding_model):
         """
-        TODO: Test adding documents.
+        Test adding documents.
         
         Steps:
         1. Create store
@@ -95,31 +227,97 @@ class TestVectorStore:
         3. Verify documents stored
         4. Verify IDs returned
         """
-        pass
+        store = create_vector_store(VectorStoreConfig(embedding_dimension=64))
+        docs = [Document(page_content=text) for text in SAMPLE_TEXTS]
+        ids = add_documents(store, docs, mock_embedding_model)
+        assert len(ids) == len(set(ids)) == len(SAMPLE_TEXTS)
+        assert len(store) == len(SAMPLE_TEXTS)
+        assert store.index.vectors.dtype == np.float32
+        assert store.index.vectors.flags["C_CONTIGUOUS"]
+    
+    @pytest.mark.unit
+    def test_add_documents_stream(self, mock_embedding_model):
+        """Streaming ingest pulls documents lazily and reports progress per batch."""
+        store = create_vector_store(VectorStoreConfig(embedding_dimension=64))
+        pulled = []
+        
+        def documents():
+            for i in range(25):
+                pulled.append(i)
+                yield Document(page_content=f"document number {i}", metadata={"id": f"doc{i}"})
+        
+        stream = add_documents_stream(store, documents(), mock_embedding_model, batch_size=10)
+        first = next(stream)
+        assert len(pulled) == 10 and len(store) == 10
+        assert (first.batch, first.batch_documents, first.total_documents) == (0, 10, 10)
+        assert first.ids == [f"doc{i}" for i in range(10)]
+        rest = list(stream)
+        assert [p.batch_documents for p in rest] == [10, 5]
+        assert rest[-1].total_documents == len(store) == 25
+        assert store.embedding_model is mock_embedding_model
+    
+    @pytest.mark.unit
+    async def test_aadd_documents_stream(self, mock_embedding_model):
+        """The async variant accepts async iterables."""
+        store = create_vector_store(VectorStoreConfig(embedding_dimension=64))
+        
+        async def documents():
+            for i in range(7):
+                yield Document(page_content=f"document number {i}")
+        
+        progress = [p async for p in aadd_documents_stream(
+            store, documents(), mock_embedding_model, batch_size=3
+        )]
+        assert [p.total_documents for p in progress] == [3, 6, 7]
+        assert len(store) == 7
     
     @pytest.mark.unit
     def test_similarity_search(self, mock_embedding_model, populated_store):
         """
-        TODO: Test similarity search.
+        Test similarity search.
         
         Steps:
         1. Search for query
         2. Verify k results returned
         3. Verify results ordered by similarity
         """
-        pass
+        results = similarity_search(populated_store, "refund policy returns", k=3)
+        assert len(results) == 3
+        assert results[0].document.page_content == SAMPLE_TEXTS[0]
+        assert [r.rank for r in results] == [1, 2, 3]
+        scores = [r.score for r in results]
+        assert scores == sorted(scores, reverse=True)
+        
+        query = mock_embedding_model.embed_query("refund policy returns")
+        expected = [calculate_similarity(query, v) for v in populated_store.index.vectors]
+        assert scores[0] == pytest.approx(max(expected), abs=1e-6)
     
     @pytest.mark.unit
     def test_search_with_filters(self, populated_store):
         """
-        TODO: Test filtered search.
+        Test filtered search.
         
         Steps:
         1. Add documents with metadata
         2. Search with filter
         3. Verify only matching docs returned
         """
-        pass
+        results = search_with_filters(populated_store, "shipping", {"category": "b"}, k=5)
+        assert len(results) == 3
+        assert all(r.document.metadata["category"] == "b" for r in results)
+        
+        store, queries = random_store("hnsw", n=400, hnsw_m=8, hnsw_ef_construction=64)
+        for doc in store.documents:
+            doc.metadata["year"] = 2000 + int(doc.page_content) % 25
+        filters = {"parity": 0, "year": {"$gte": 2020, "$nin": [2022]}}
+        matching = [
+            doc for doc in store.documents
+            if doc.metadata["parity"] == 0 and doc.metadata["year"] >= 2020
+            and doc.metadata["year"] != 2022
+        ]
+        results = search_with_filters(store, queries[0], filters, k=50)
+        assert len(results) == len(matching) == 32
+        assert {r.document.page_content for r in results} == {d.page_content for d in matching}
     
     @pytest.mark.unit
     def test_search_with_score_threshold(self, populated_store):
@@ -133,16 +331,430 @@ class TestVectorStore:
         pass
     
     @pytest.mark.unit
-    def test_mmr_search(self, populated_store):
+    def test_mmr_search(self, populated_store, mock_embedding_model):
         """
-        TODO: Test MMR for diversity.
+        Test MMR for diversity.
         
         Steps:
         1. Add similar documents
         2. Search with MMR
         3. Verify diverse results
         """
-        pass
+        duplicates = [
+            Document(page_content="free shipping on all orders", metadata={"id": f"dup{i}"})
+            for i in range(3)
+        ]
+        add_documents(populated_store, duplicates, mock_embedding_model)
+        query = "free shipping on orders over 50 dollars"
+        
+        relevant = mmr_search(populated_store, query, k=3, lambda_mult=1.0)
+        plain = similarity_search(populated_store, query, k=3)
+        assert [r.document for r in relevant] == [r.document for r in plain]
+        
+        diverse = mmr_search(populated_store, query, k=3, lambda_mult=0.5)
+        contents = [r.document.page_content for r in diverse]
+        assert len(diverse) == 3 and len(set(contents)) == 3
+        assert [r.rank for r in diverse] == [1, 2, 3]
+        
+        with pytest.raises(ValueError):
+            mmr_search(populated_store, query, lambda_mult=1.5)
+    
+    @pytest.mark.unit
+    def test_mmr_search_matches_reference(self):
+        """Vectorized selection picks the same documents as the textbook loop."""
+        store, queries = random_store()
+        for query in queries[:5]:
+            rows, _ = store.search_rows(query, 30)
+            vectors = store.vectors_for(rows)
+            selected = []
+            while len(selected) < 8:
+                best, best_score = None, -np.inf
+                for i in set(range(len(rows))) - set(selected):
+                    redundancy = max(
+                        (calculate_similarity(vectors[i], vectors[j]) for j in selected),
+                        default=0.0,
+                    )
+                    score = 0.3 * calculate_similarity(query, vectors[i]) - 0.7 * redundancy
+                    if score > best_score:
+                        best, best_score = i, score
+                selected.append(best)
+            results = mmr_search(store, query, k=8, lambda_mult=0.3, fetch_k=30)
+            assert [r.document.page_content for r in results] == [
+                str(rows[i]) for i in selected
+            ]
+    
+    @pytest.mark.unit
+    def test_query_embedding_cache(self, populated_store, mock_embedding_model, monkeypatch):
+        """Repeated queries are embedded once; counters show in the statistics."""
+        mock_embedding_model.embed_query.reset_mock()
+        first = similarity_search(populated_store, "refund  policy", k=2)
+        again = similarity_search(populated_store, " refund policy ", k=2)
+        assert [r.document for r in again] == [r.document for r in first]
+        assert mock_embedding_model.embed_query.call_count == 1
+        
+        batch_search(populated_store, ["refund policy", "support email"], k=2)
+        assert mock_embedding_model.embed_query.call_count == 2
+        cache = get_store_statistics(populated_store)["query_cache"]
+        assert (cache["hits"], cache["misses"], cache["size"]) == (2, 2, 2)
+        
+        other_model = Mock(wraps=mock_embedding_model, model="other-model")
+        similarity_search(populated_store, "refund policy", embedding_model=other_model)
+        assert other_model.embed_query.call_count == 1
+        
+        clock = [1000.0]
+        monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+        store = create_vector_store(VectorStoreConfig(
+            embedding_dimension=64, query_cache_size=1, query_cache_ttl=60
+        ))
+        store.embedding_model = mock_embedding_model
+        mock_embedding_model.embed_query.reset_mock()
+        for query in ("a", "a", "b", "a"):  # "b" evicts "a"
+            similarity_search(store, query)
+        clock[0] += 61
+        similarity_search(store, "a")
+        assert mock_embedding_model.embed_query.call_count == 4
+        assert get_store_statistics(store)["query_cache"]["hits"] == 1
+    
+    @pytest.mark.unit
+    def test_query_cache_shared_by_batch_and_single_search(self, asymmetric_model):
+        """Cached query vectors are query-space no matter which API filled them."""
+        store = asymmetric_store(asymmetric_model)
+        for _ in range(2):
+            batch = batch_search(store, ["q1", "q2", "q3"], k=1)
+            assert {r[0].document.page_content for r in batch.values()} == {"docB"}
+            for query in ("q1", "q2", "q4"):
+                assert similarity_search(store, query, k=1)[0].document.page_content == "docB"
+        assert asymmetric_model.embed_query.call_count == 4
+    
+    @pytest.mark.unit
+    def test_batch_search_matches_single_queries(self, populated_store):
+        """Batched GEMM scoring returns the same results as one-by-one search."""
+        queries = ["refund policy", "free shipping", "support email", "free shipping"]
+        results = batch_search(populated_store, queries, k=3)
+        assert list(results) == ["refund policy", "free shipping", "support email"]
+        for query, batch_results in results.items():
+            single = similarity_search(populated_store, query, k=3)
+            assert [r.document for r in batch_results] == [r.document for r in single]
+            assert [r.score for r in batch_results] == pytest.approx([r.score for r in single])
+        
+        store, vectors = random_store(compaction_threshold=0)
+        delete_documents(store, filter_dict={"parity": 0})
+        for chunk_size in (1, 7, None):
+            batched = store.index.batch_search(vectors, 5, store.live_mask(), chunk_size)
+            for query, (rows, _) in zip(vectors, batched):
+                assert rows.tolist() == store.index.search(query, 5, store.live_mask())[0].tolist()
+    
+    @pytest.mark.unit
+    def test_batch_search_embeds_queries_as_queries(self, asymmetric_model):
+        """batch_search uses embed_query, so it agrees with similarity_search."""
+        results = batch_search(asymmetric_store(asymmetric_model), ["q1", "q2"], k=1)
+        
+        single = similarity_search(asymmetric_store(asymmetric_model), "q1", k=1)
+        assert single[0].document.page_content == "docB"
+        assert [r[0].document.page_content for r in results.values()] == ["docB", "docB"]
+        assert asymmetric_model.embed_documents.call_count == 2  # only the documents
+    
+    @pytest.mark.unit
+    def test_batch_search_embeds_queries_concurrently(self, asymmetric_model):
+        """Uncached queries are embedded on a bounded pool that retries rate limits."""
+        class RateLimitError(Exception):
+            status_code = 429
+        
+        lock = threading.Lock()
+        active, peak, failures = [0], [0], [RateLimitError("slow down")]
+        
+        def slow_embed_query(text):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+                failure = failures.pop() if failures else None
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            if failure is not None:
+                raise failure
+            return [0.1, 1.0]
+        
+        store = asymmetric_store(asymmetric_model)
+        asymmetric_model.embed_query.side_effect = slow_embed_query
+        config = EmbeddingConfig(max_concurrency=3, initial_backoff=0.001, max_backoff=0.01)
+        queries = [f"q{i}" for i in range(12)]
+        
+        results = batch_search(store, queries, k=1, embedding_config=config)
+        
+        assert [r[0].document.page_content for r in results.values()] == ["docB"] * 12
+        assert asymmetric_model.embed_query.call_count == 13  # one retried rate limit
+        assert 1 < peak[0] <= 3
+
+
+@pytest.mark.intermediate
+class TestApproximateIndexes:
+    """Test approximate nearest neighbour indexes."""
+    
+    @pytest.mark.unit
+    def test_hnsw_recall_against_flat(self):
+        """HNSW should find nearly all of the exact top-k."""
+        store, queries = random_store("hnsw", hnsw_m=8, hnsw_ef_construction=64)
+        report = evaluate_index_recall(store, list(queries), k=10)
+        assert report["num_queries"] == len(queries)
+        assert report["recall_at_k"] >= 0.9
+    
+    @pytest.mark.unit
+    def test_ivf_trains_and_retrains(self):
+        """IVF trains once it has enough vectors and can be retrained later."""
+        store, queries = random_store("ivf", ivf_nlist=4, ivf_nprobe=2)
+        assert store.index.is_trained
+        assert store.index.trained_size == 400
+        assert evaluate_index_recall(store, list(queries), k=10)["recall_at_k"] >= 0.7
+        
+        report = retrain_index(store, nlist=8)
+        assert report["nlist"] == 8
+        assert sum(len(store.index.posting_list(i)) for i in range(8)) == 400
+        store.index.nprobe = 8
+        assert evaluate_index_recall(store, list(queries), k=10)["recall_at_k"] == 1.0
+    
+    @pytest.mark.unit
+    def test_pq_compressed_storage(self):
+        """PQ stores uint8 codes and re-scoring recovers exact neighbours."""
+        store, queries = random_store("flat", n=1100, quantization="pq", pq_subvectors=4)
+        assert store.index._vectors is None
+        assert store.index._codes.dtype == np.uint8
+        assert store.index._codes.shape[1] == 4
+        assert len(similarity_search(store, queries[0], k=10)) == 10
+        
+        reranked, _ = random_store(
+            "flat", n=1100, quantization="pq", pq_subvectors=4, rerank_factor=20
+        )
+        exact, _ = random_store("flat", n=1100)
+        hits = [
+            {r.document.page_content for r in similarity_search(reranked, q, k=10)}
+            & {r.document.page_content for r in similarity_search(exact, q, k=10)}
+            for q in queries
+        ]
+        assert np.mean([len(h) for h in hits]) >= 9
+        
+        with pytest.raises(ValueError):
+            create_vector_store(VectorStoreConfig(index_type="hnsw", quantization="pq"))
+    
+    @pytest.mark.unit
+    @pytest.mark.parametrize("quantization,dtype", [("float16", np.float16), ("int8", np.uint8)])
+    def test_scalar_quantized_storage(self, tmp_path, quantization, dtype):
+        """Scalar codes shrink storage while keeping search results close to exact."""
+        store, queries = random_store("flat", quantization=quantization)
+        exact, _ = random_store("flat")
+        assert store.index._vectors is None
+        assert store.index._codes.dtype == dtype
+        assert store.index._codes[:len(store.index)].nbytes * (4 // dtype().itemsize) == \
+            exact.index.vectors.nbytes
+        
+        approx = [[r.document.page_content for r in res] for res in store.batch_search(queries, 10)]
+        truth = [[r.document.page_content for r in res] for res in exact.batch_search(queries, 10)]
+        assert np.mean([len(set(a) & set(t)) for a, t in zip(approx, truth)]) >= 9
+        assert [r.document.page_content for r in similarity_search(store, queries[0], k=10)] == \
+            approx[0]
+        
+        reranked, _ = random_store("flat", quantization=quantization, rerank_factor=4)
+        assert [[r.document.page_content for r in res]
+                for res in reranked.batch_search(queries, 10)] == truth
+        
+        persist_store(store, str(tmp_path / "store"))
+        loaded = load_store(str(tmp_path / "store"))
+        assert [r.document.page_content for r in loaded.search(queries[0], 10)] == approx[0]
+    
+    @pytest.mark.unit
+    def test_quantized_recall_uses_float32_ground_truth(self):
+        """int8 codes without re-ranking lose some true neighbours; recall shows it."""
+        store, queries = random_store("flat", quantization="int8")
+        vectors = np.random.default_rng(0).standard_normal((400, 16)).astype(np.float32)
+        report = evaluate_index_recall(store, list(queries), k=10, reference_vectors=vectors)
+        assert report["ground_truth"] == "reference"
+        assert report["recall_at_k"] < 1.0
+        assert evaluate_index_recall(store, list(queries), k=10)["ground_truth"] == "decoded"
+        
+        reranked, _ = random_store("flat", quantization="int8", rerank_factor=4)
+        report = evaluate_index_recall(reranked, list(queries), k=10)
+        assert report["ground_truth"] == "float32"
+        assert report["recall_at_k"] == 1.0
+    
+    @pytest.mark.unit
+    @pytest.mark.parametrize("index_type,component", [
+        ("flat", None), ("hnsw", "graph"), ("ivf", "posting_lists"),
+    ])
+    def test_get_store_statistics(self, index_type, component):
+        """Statistics report memory per component, index parameters, tombstones and latency."""
+        store, queries = random_store(
+            index_type, hnsw_m=8, hnsw_ef_construction=64, ivf_nlist=4, compaction_threshold=0
+        )
+        for query in queries:
+            store.search(query, 5)
+        store.batch_search(queries, 5)
+        delete_documents(store, filter_dict={"parity": 1})
+        
+        stats = get_store_statistics(store)
+        assert stats["document_count"] == 200 and stats["row_count"] == 400
+        assert stats["tombstone_ratio"] == pytest.approx(0.5)
+        assert stats["index"]["type"] == index_type
+        memory = stats["memory_bytes"]
+        assert memory["vectors"] >= 400 * 16 * 4
+        assert memory["documents"] > 0 and memory["tombstones"] >= 400
+        assert memory["total"] == sum(v for name, v in memory.items() if name != "total")
+        if component:
+            assert memory[component] > 0
+        latency = stats["latency_ms"]
+        assert latency["add"]["count"] == 1
+        assert latency["search"]["count"] == 20
+        assert latency["batch_search"]["count"] == 1
+        assert 0 < latency["search"]["p50_ms"] <= latency["search"]["p95_ms"] <= \
+            latency["search"]["p99_ms"]
+        
+        compact_store(store)
+        stats = get_store_statistics(store)
+        assert stats["tombstone_ratio"] == 0 and stats["row_count"] == 200
+    
+    @pytest.mark.unit
+    @pytest.mark.parametrize("index_type", ["flat", "hnsw", "ivf"])
+    def test_delete_documents_tombstones(self, index_type):
+        """Deleted documents are never returned."""
+        store, queries = random_store(
+            index_type, hnsw_m=8, hnsw_ef_construction=64, ivf_nlist=4, ivf_nprobe=2
+        )
+        assert delete_documents(store, doc_ids=["doc0", "doc1", "missing"]) == 2
+        assert delete_documents(store, filter_dict={"parity": 1}) == 199
+        assert len(store) == 199
+        for query in queries:
+            results = similarity_search(store, query, k=10)
+            assert len(results) == 10
+            assert all(int(r.document.page_content) % 2 == 0 for r in results)
+            assert all(r.document.page_content != "0" for r in results)
+    
+    @pytest.mark.unit
+    @pytest.mark.parametrize("index_type", ["flat", "hnsw", "ivf"])
+    def test_update_document_uses_delta_segment(self, index_type):
+        """Updates land in the delta segment and old versions disappear."""
+        store, queries = random_store(
+            index_type, hnsw_m=8, hnsw_ef_construction=64, ivf_nlist=4, ivf_nprobe=2,
+            compaction_threshold=0,
+        )
+        assert update_document(store, "doc7", new_metadata={"parity": 0, "edited": True})
+        assert not update_document(store, "missing", new_metadata={"edited": True})
+        assert len(store) == 400 and len(store.delta) == 1
+        
+        vector = store.vectors_for([store._rows["doc7"]])
+        results = similarity_search(store, vector, k=3)
+        assert results[0].document.metadata == {"id": "doc7", "parity": 0, "edited": True}
+        assert results[0].score == pytest.approx(1.0, abs=1e-4)
+        assert sum(r.document.metadata["id"] == "doc7" for r in results) == 1
+        assert [r.document.metadata["id"] for r in search_with_filters(
+            store, vector, {"edited": True}, k=5)] == ["doc7"]
+        
+        before = [[r.document.page_content for r in similarity_search(store, q, k=10)]
+                  for q in queries]
+        assert compact_store(store) == {"removed_rows": 1, "rows": 400}
+        assert len(store.delta) == 0 and store.deleted_count == 0
+        after = [[r.document.page_content for r in similarity_search(store, q, k=10)]
+                 for q in queries]
+        if index_type == "flat":
+            assert after == before
+    
+    @pytest.mark.unit
+    def test_background_compaction_after_threshold(self):
+        """Crossing the deleted fraction compacts in the background."""
+        store, queries = random_store(compaction_threshold=0.25)
+        delete_documents(store, doc_ids=[f"doc{i}" for i in range(0, 400, 4)])
+        store.wait_for_compaction()
+        assert len(store.documents) == 300 and store.deleted_count == 0
+        for query in queries:
+            results = similarity_search(store, query, k=20)
+            assert all(int(r.document.page_content) % 4 for r in results)
+    
+    @pytest.mark.unit
+    def test_overlapping_compactions_are_serialized(self, monkeypatch):
+        """Concurrent compactions and deletes leave rows, ids and index aligned."""
+        store, queries = random_store(compaction_threshold=0.05)
+        flat_index = type(store.index)
+        original_add = flat_index.add
+        active, peak = [0], [0]
+        counter = threading.Lock()
+        
+        def slow_add(self, vectors):
+            with counter:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            try:
+                return original_add(self, vectors)
+            finally:
+                with counter:
+                    active[0] -= 1
+        
+        monkeypatch.setattr(flat_index, "add", slow_add)
+        
+        def delete_some():
+            for i in range(0, 400, 10):
+                delete_documents(store, doc_ids=[f"doc{i}"])
+        
+        compact_store(store, wait=False)
+        threads = [threading.Thread(target=compact_store, args=(store,)) for _ in range(3)]
+        threads.append(threading.Thread(target=delete_some))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        store.wait_for_compaction()
+        
+        assert peak[0] == 1
+        assert len(store) == 360
+        assert len(store.documents) == len(store.ids) == len(store.index) + len(store.delta)
+        assert all(store.ids[row] == doc_id for doc_id, row in store._rows.items())
+        for query in queries:
+            results = similarity_search(store, query, k=20)
+            assert len(results) == 20
+            assert all(int(r.document.page_content) % 10 for r in results)
+
+
+@pytest.mark.intermediate
+class TestShardedVectorStore:
+    """Test scatter-gather search over sharded stores."""
+    
+    @staticmethod
+    def contents(results):
+        return [r.document.page_content for r in results]
+    
+    @pytest.mark.unit
+    def test_sharded_search_matches_single_store(self):
+        """Merged per-shard top-k equals the top-k of one unsharded store."""
+        single, queries = random_store()
+        sharded, _ = random_store(num_shards=3)
+        assert len(sharded.shards) == 3 and len(sharded) == 400
+        assert all(len(shard) for shard in sharded.shards)
+        for query in queries[:5]:
+            expected = self.contents(single.search(query, 10))
+            assert self.contents(sharded.search(query, 10)) == expected
+            assert self.contents(search_with_filters(sharded, query, {"parity": 1}, k=5)) == \
+                self.contents(search_with_filters(single, query, {"parity": 1}, k=5))
+        assert [self.contents(r) for r in sharded.batch_search(queries, 5)] == \
+            [self.contents(r) for r in single.batch_search(queries, 5)]
+        
+        assert delete_documents(sharded, doc_ids=["doc0", "doc1"]) == 2
+        assert update_document(sharded, "doc2", new_metadata={"edited": True})
+        assert len(sharded) == 398
+        assert self.contents(search_with_filters(sharded, queries[0], {"edited": True})) == ["2"]
+    
+    @pytest.mark.integration
+    def test_sharded_persist_and_process_pool(self, tmp_path):
+        """Persisted shards are searched by worker processes."""
+        single, queries = random_store()
+        sharded, _ = random_store(num_shards=2, shard_processes=2)
+        expected = [self.contents(r) for r in single.batch_search(queries, 5)]
+        persist_store(sharded, str(tmp_path / "store"))
+        assert (tmp_path / "store" / "shard-00001" / "manifest.json").exists()
+        
+        with load_store(str(tmp_path / "store")) as loaded:
+            assert len(loaded) == 400
+            assert [self.contents(r) for r in loaded.batch_search(queries, 5)] == expected
+            assert loaded._executor is not None
+            delete_documents(loaded, doc_ids=[f"doc{expected[0][0]}"])
+            assert expected[0][0] not in self.contents(loaded.search(queries[0], 5))
 
 
 @pytest.mark.intermediate
@@ -150,9 +762,9 @@ class TestVectorStorePersistence:
     """Test vector store persistence."""
     
     @pytest.mark.integration
-    def test_persist_and_load(self, tmp_path, populated_store):
+    def test_persist_and_load(self, tmp_path, populated_store, mock_embedding_model):
         """
-        TODO: Test save and load.
+        Test save and load.
         
         Steps:
         1. Persist store to path
@@ -160,4 +772,22 @@ class TestVectorStorePersistence:
         3. Verify search still works
         4. Verify same results
         """
-        pass
+        populated_store.config.compaction_threshold = 0
+        delete_documents(populated_store, doc_ids=["doc1"])
+        update_document(populated_store, "doc2", new_metadata={"category": "c"})
+        path = tmp_path / "store"
+        assert persist_store(populated_store, str(path))
+        assert (path / "manifest.json").exists()
+        
+        loaded = load_store(str(path))
+        assert isinstance(loaded.index.vectors, np.memmap)
+        assert len(loaded) == len(populated_store)
+        assert len(loaded.delta) == 1
+        query = "shipping costs"
+        expected = similarity_search(populated_store, query, k=3)
+        actual = similarity_search(loaded, query, k=3, embedding_model=mock_embedding_model)
+        assert [r.document for r in actual] == [r.document for r in expected]
+        assert [r.score for r in actual] == pytest.approx([r.score for r in expected])
+        
+        with pytest.raises(ValueError):
+            load_store(str(path), VectorStoreConfig(embedding_dimension=32))